@@ -0,0 +1,892 @@
+# agent_engine.py
+# Streamlit과 분리된 에이전트 엔진 (웹 검색 + mem0 메모리 + DSPy 답변)
+# app.py 외에도 CLI, 벤치마크, HTTP 워커 등에서 명시적 설정으로 사용할 수 있습니다.
+
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Tuple
+
+from batch_runner import BatchResult, run_batch
+from context_budget import ContextBudgeter
+from document_cache import DocumentCache
+from document_ingest import DocumentIngestor
+from intent_router import IntentRouter, SEARCH_INTENT
+from memory_cache import MemorySearchCache, install_cached_embedder
+from memory_compaction import SEARCH_MEMORY_KIND
+from memory_stats import MemoryStats, iter_add_events
+from memory_writer import MemoryWriteQueue
+from request_coalescing import SingleFlight, TokenBucket, build_rate_limiters
+from response_cache import SemanticResponseCache, hashed_embedding
+from search_cache import SearchCache, normalize_query
+from tracing import Tracer, default_tracer
+
+# dspy, mem0, duckduckgo_search, wikipediaapi는 무거우므로 처음 사용할 때 import
+# (설치 여부만 모듈 로드 시 확인)
+WEB_SEARCH_AVAILABLE = all(
+    importlib.util.find_spec(name) is not None for name in ("duckduckgo_search", "wikipediaapi")
+)
+
+# 지원 모델 목록
+MODEL_OPTIONS = ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"]
+
+# 한 턴에서 동시에 실행하는 검색 소스 수 (Wikipedia, 웹, 메모리)
+RETRIEVAL_SOURCES = 3
+
+# 모델별 검색 컨텍스트 토큰 예산 (질문/지시문 토큰 제외)
+MODEL_CONTEXT_BUDGETS = {
+    "gpt-4o-mini": 3000,
+    "gpt-4o": 4000,
+    "gpt-3.5-turbo": 2000,
+}
+DEFAULT_CONTEXT_BUDGET = 2000
+
+class EngineConfig:
+    """에이전트 엔진 설정
+
+    Streamlit 세션 상태 대신 이 설정 객체로 모델, 사용자, 검색 동작을 전달합니다.
+    """
+    
+    def __init__(self, model: str = "gpt-4o-mini", user_id: str = "default",
+                 api_key: Optional[str] = None, retrieval_timeout: float = 8.0,
+                 search_enabled: bool = True, search_language: str = "ko",
+                 async_memory_writes: bool = True, context_budget: Optional[int] = None,
+                 search_threshold: float = 0.5, intent_rules_path: Optional[str] = None,
+                 vector_store: str = "default", vector_store_path: str = "vector_store",
+                 retrieval_workers: int = 4):
+        self.model = model
+        self.user_id = user_id
+        self.api_key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY")
+        # 소스별 응답 대기 시간 (초)
+        self.retrieval_timeout = retrieval_timeout
+        self.search_enabled = search_enabled
+        self.search_language = search_language
+        self.async_memory_writes = async_memory_writes
+        # 컨텍스트 토큰 예산 (None이면 MODEL_CONTEXT_BUDGETS 기준)
+        self.context_budget = context_budget or MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+        # 검색 의도 확신도가 이 값 이상일 때만 웹 검색 (규칙 파일이 없으면 기본 규칙)
+        self.search_threshold = search_threshold
+        self.intent_rules_path = intent_rules_path
+        # "numpy"면 mem0 기본 벡터 저장소 대신 로컬 NumpyVectorStore 사용
+        self.vector_store = vector_store
+        self.vector_store_path = vector_store_path
+        # 검색 소스 스레드 풀 크기 (턴당 최대 RETRIEVAL_SOURCES개 작업, 배치 실행은 전용 풀 사용)
+        self.retrieval_workers = retrieval_workers
+    
+    def cache_key(self) -> str:
+        """에이전트 풀 키 (user_id는 호출마다 넘기므로 제외, API 키는 해시로만 반영)"""
+        fields = {
+            'model': self.model,
+            'api_key': hashlib.sha256((self.api_key or "").encode("utf-8")).hexdigest(),
+            'retrieval_timeout': self.retrieval_timeout,
+            'search_enabled': self.search_enabled,
+            'search_language': self.search_language,
+            'async_memory_writes': self.async_memory_writes,
+            'context_budget': self.context_budget,
+            'search_threshold': self.search_threshold,
+            'intent_rules_path': self.intent_rules_path,
+            'vector_store': self.vector_store,
+            'vector_store_path': self.vector_store_path,
+            'retrieval_workers': self.retrieval_workers,
+        }
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    
+    def memory_config(self) -> Optional[Dict[str, Any]]:
+        """mem0 Memory.from_config 설정 (API 키가 없으면 None)"""
+        if not self.api_key:
+            return None
+        return {
+            "llm": {
+                "provider": "openai",
+                "config": {
+                    "model": self.model,
+                    "temperature": 0.1,
+                    "api_key": self.api_key
+                }
+            }
+        }
+
+# 웹 검색 도구 클래스
+class SimpleWebSearch:
+    def __init__(self, cache: SearchCache = None, language: str = 'ko', wiki=None, ddgs_factory=None,
+                 flight: SingleFlight = None, rate_limiters: Dict[str, TokenBucket] = None,
+                 max_rate_wait: float = 5.0):
+        # wiki / ddgs_factory를 넘기면 실제 패키지 대신 사용 (벤치마크용 대체 구현 등)
+        self.available = WEB_SEARCH_AVAILABLE or (wiki is not None and ddgs_factory is not None)
+        self.cache = cache
+        self.language = language
+        self.wiki = wiki
+        self.ddgs_factory = ddgs_factory
+        # 동시에 들어온 같은 검색은 요청 하나로 합치고, 백엔드별 속도 제한으로 차단/연쇄 지연 방지
+        # (여러 에이전트가 같은 flight/rate_limiters를 공유하면 프로세스 전체에 적용)
+        self.flight = flight or SingleFlight()
+        self.rate_limiters = rate_limiters or build_rate_limiters()
+        self.max_rate_wait = max_rate_wait
+        if self.available and self.wiki is None:
+            import wikipediaapi
+            self.wiki = wikipediaapi.Wikipedia(language=language, user_agent='DSPy-Agent/1.0')
+        if self.available and self.ddgs_factory is None:
+            from duckduckgo_search import DDGS
+            self.ddgs_factory = DDGS
+    
+    def _flight_key(self, source: str, query: str) -> str:
+        return f"{source}:{self.language}:{normalize_query(query)}"
+    
+    def _acquire(self, backend: str) -> bool:
+        limiter = self.rate_limiters.get(backend)
+        return limiter is None or limiter.acquire(timeout=self.max_rate_wait)
+    
+    def search_wikipedia(self, query: str) -> str:
+        if not self.available:
+            return "웹 검색 패키지가 설치되지 않았습니다. pip install duckduckgo-search wikipedia-api"
+        
+        if self.cache:
+            cached = self.cache.get('wikipedia', query, self.language)
+            if cached is not None:
+                return cached
+        
+        return self.flight.do(self._flight_key('wikipedia', query), self._fetch_wikipedia, query)
+    
+    def _fetch_wikipedia(self, query: str) -> str:
+        if not self._acquire('wikipedia'):
+            return "Wikipedia 검색 오류: 요청이 많아 잠시 후 다시 시도해주세요."
+        
+        try:
+            page = self.wiki.page(query)
+            if page.exists():
+                summary = page.summary
+                sentences = summary.split('.')[:3]
+                result = '. '.join(sentences) + '.'
+                result = f"Wikipedia 검색 '{query}':\n{result}"
+            else:
+                result = f"Wikipedia에서 '{query}' 정보를 찾을 수 없습니다."
+        except Exception as e:
+            # 오류는 캐시하지 않음
+            return f"Wikipedia 검색 오류: {str(e)}"
+        
+        if self.cache:
+            self.cache.set('wikipedia', query, result, self.language)
+        return result
+    
+    def search_web(self, query: str) -> str:
+        if not self.available:
+            return "웹 검색 패키지가 설치되지 않았습니다."
+        
+        if self.cache:
+            cached = self.cache.get('web', query, self.language)
+            if cached is not None:
+                return cached
+        
+        return self.flight.do(self._flight_key('web', query), self._fetch_web, query)
+    
+    def _fetch_web(self, query: str) -> str:
+        if not self._acquire('web'):
+            return "웹 검색 오류: 요청이 많아 잠시 후 다시 시도해주세요."
+        
+        try:
+            with self.ddgs_factory() as ddgs:
+                results = list(ddgs.text(query, max_results=3))
+            
+            if results:
+                search_result = f"웹 검색 '{query}':\n\n"
+                for i, result in enumerate(results, 1):
+                    search_result += f"{i}. {result['title']}\n{result['body'][:150]}...\n\n"
+            else:
+                search_result = f"'{query}'에 대한 검색 결과가 없습니다."
+        except Exception as e:
+            # 오류는 캐시하지 않음
+            return f"웹 검색 오류: {str(e)}"
+        
+        if self.cache:
+            self.cache.set('web', query, search_result, self.language)
+        return search_result
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """요청 합치기와 백엔드별 속도 제한 지표"""
+        return {
+            'flight': self.flight.stats(),
+            'rate_limits': {backend: limiter.stats() for backend, limiter in self.rate_limiters.items()},
+        }
+
+# 메모리 도구 클래스
+class SimpleMemoryTools:
+    def __init__(self, memory, stats: MemoryStats = None, async_writes: bool = True,
+                 search_cache: MemorySearchCache = None, document_cache: DocumentCache = None):
+        self.memory = memory
+        self.stats = stats or MemoryStats()
+        # 같은 사용자의 반복 검색은 캐시에서, 질문 임베딩은 mem0 검색과 응답 캐시가 공유
+        self.search_cache = search_cache or MemorySearchCache()
+        self.embedder = install_cached_embedder(memory)
+        # 같은 파일 재업로드 시 구간 임베딩 재사용
+        self.document_cache = document_cache
+        # 메모리를 저장한 적 있는 사용자 (주기적 압축 대상)
+        self.active_users = set()
+        # 메모리 추가는 응답을 기다리게 하지 않도록 백그라운드 큐에서 처리
+        self.write_queue = MemoryWriteQueue(memory, on_commit=self._on_commit) if async_writes else None
+    
+    def _on_commit(self, user_id: str, result):
+        """mem0 add가 끝난 시점에 통계 갱신과 검색 캐시 세대 증가
+        
+        비동기 모드에서는 실제 저장 전까지 검색 결과가 바뀌지 않으므로 커밋 시점에 무효화하고,
+        mem0가 모든 항목을 NONE(변경 없음)으로 판단한 경우에는 캐시를 유지합니다.
+        """
+        self.stats.record_add(user_id, result)
+        events = iter_add_events(result)
+        if not events or any(event.get('event', 'ADD') != 'NONE' for event in events):
+            self.search_cache.invalidate(user_id)
+    
+    def invalidate_user(self, user_id: str):
+        """외부에서 메모리를 지웠을 때 (압축 작업 등) 캐시와 통계 초기화"""
+        self.search_cache.invalidate(user_id)
+        self.stats.invalidate(user_id)
+    
+    def store_memory(self, content: str, user_id: str = "default", metadata: Dict[str, Any] = None,
+                     infer: bool = True) -> str:
+        """메모리 저장 (metadata로 종류를 표시, infer=False면 mem0 추출 없이 원문 그대로)"""
+        self.active_users.add(user_id)
+        if self.write_queue:
+            try:
+                self.write_queue.submit(content, user_id, metadata=metadata, infer=infer)
+                return f"⏳ 메모리 저장 예약: {content[:50]}..."
+            except Exception as e:
+                return f"❌ 메모리 저장 실패: {str(e)}"
+        
+        try:
+            kwargs = {}
+            if metadata:
+                kwargs['metadata'] = metadata
+            if not infer:
+                kwargs['infer'] = False
+            result = self.memory.add(content, user_id=user_id, **kwargs)
+            self._on_commit(user_id, result)
+            return f"✅ 메모리 저장: {content[:50]}..."
+        except Exception as e:
+            return f"❌ 메모리 저장 실패: {str(e)}"
+    
+    def ingest_document(self, stream, name: str, user_id: str = "default", mime: str = None,
+                        on_progress=None) -> Dict[str, Any]:
+        """업로드 문서를 겹치는 구간으로 나눠 메모리에 배치 저장 (배치마다 통계/검색 캐시 갱신)"""
+        self.active_users.add(user_id)
+        ingestor = DocumentIngestor(self.memory, on_batch=self._on_commit,
+                                    cache=self.document_cache)
+        return ingestor.ingest(stream, name, user_id, mime=mime, on_progress=on_progress)
+    
+    def search_memories(self, query: str, user_id: str = "default", limit: int = 5) -> str:
+        cached = self.search_cache.get(user_id, query, limit)
+        if cached is not None:
+            return cached
+        
+        generation = self.search_cache.generation(user_id)
+        try:
+            results = self.memory.search(query, user_id=user_id, limit=limit)
+            if not results or 'results' not in results:
+                memory_text = "관련 메모리가 없습니다."
+            else:
+                memory_text = "관련 메모리:\n"
+                for i, result in enumerate(results['results'], 1):
+                    memory_text += f"{i}. {result['memory']}\n"
+        except Exception as e:
+            # 오류는 캐시하지 않음
+            return f"메모리 검색 오류: {str(e)}"
+        
+        self.search_cache.set(user_id, query, limit, memory_text, generation)
+        return memory_text
+    
+    def get_all_memories(self, user_id: str = "default") -> List[str]:
+        """전체 메모리 조회 (비용이 크므로 명시적 요청 시에만 사용, 통계도 함께 갱신)"""
+        try:
+            results = self.memory.get_all(user_id=user_id)
+            if not results or 'results' not in results:
+                memories = []
+            else:
+                memories = [result['memory'] for result in results['results']]
+        except:
+            return []
+        self.stats.load(user_id, memories)
+        return memories
+    
+    def get_memory_stats(self, user_id: str = "default") -> Dict[str, Any]:
+        """저장된 메모리 개수와 최근 메모리 (mem0 조회 없음)"""
+        return self.stats.get(user_id)
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """메모리 검색 캐시와 임베딩 캐시 적중률"""
+        return {
+            'search': self.search_cache.stats(),
+            'embedding': self.embedder.stats() if self.embedder else None,
+        }
+    
+    def get_write_metrics(self) -> Dict[str, Any]:
+        """메모리 쓰기 대기열 지표 (동기 저장 모드면 빈 dict)"""
+        return self.write_queue.metrics() if self.write_queue else {}
+    
+    def close(self):
+        """대기 중인 메모리 쓰기를 마무리"""
+        if self.write_queue:
+            self.write_queue.close()
+
+class _TurnState(threading.local):
+    """스레드별 마지막 턴 정보 (풀에서 공유되는 에이전트를 여러 세션이 동시에 사용)"""
+    trace = None
+    context_stats = None
+    intent = None
+    # 응답 캐시 키로 쓰는 외부 검색(Wikipedia/웹) 결과 + 검색 시점의 사용자 메모리 세대
+    cache_context = None
+    # 배치 실행 중인 스레드는 배치 전용 검색 스레드 풀을 사용 (process_batch)
+    executor = None
+
+# 간단한 에이전트 클래스
+class SimpleAgent:
+    def __init__(self, memory, web_search, config: EngineConfig = None,
+                 memory_stats: MemoryStats = None, lm=None, tracer: Tracer = None,
+                 response_cache: SemanticResponseCache = None, router: IntentRouter = None,
+                 document_cache: DocumentCache = None, memory_search_cache: MemorySearchCache = None):
+        self.config = config or EngineConfig()
+        self.response_cache = response_cache
+        # 단계별 지연 시간 기록 (마지막 턴의 trace는 last_trace로 조회)
+        self.tracer = tracer or default_tracer
+        self.turn = _TurnState()
+        # 모델별 토큰 예산에 맞춘 컨텍스트 구성 (마지막 턴 통계는 last_context_stats)
+        self.budgeter = ContextBudgeter(self.config.model, self.config.context_budget)
+        if router is None:
+            if self.config.intent_rules_path:
+                router = IntentRouter.from_file(self.config.intent_rules_path, threshold=self.config.search_threshold)
+            else:
+                router = IntentRouter(threshold=self.config.search_threshold)
+        self.router = router
+        # 메모리 검색 캐시는 같은 벡터 저장소를 쓰는 에이전트끼리 공유해야 쓰기 후 무효화가 모두에 반영됨
+        self.memory_tools = SimpleMemoryTools(memory, memory_stats, async_writes=self.config.async_memory_writes,
+                                              search_cache=memory_search_cache, document_cache=document_cache)
+        self.web_search = web_search
+        self.retrieval_timeout = self.config.retrieval_timeout
+        # 검색 소스를 동시에 실행하기 위한 스레드 풀 (마감 시간을 넘긴 작업이 응답을 막지 않도록 재사용)
+        self.executor = ThreadPoolExecutor(max_workers=self.config.retrieval_workers, thread_name_prefix="retrieval")
+        
+        # DSPy 설정 (설정된 모델 사용, lm을 직접 넘기면 그대로 사용)
+        # 전역 dspy.configure 대신 이 에이전트의 모듈에만 LM을 지정해 다른 세션/모델과 섞이지 않게 함
+        import dspy
+        if lm is None and self.config.api_key:
+            lm = dspy.LM(model=f'openai/{self.config.model}', api_key=self.config.api_key)
+        self.lm = lm
+        if lm is not None:
+            self.qa = dspy.ChainOfThought("context, question -> reasoning, answer")
+            self.qa.set_lm(lm)
+        else:
+            self.qa = None
+        self.stream_qa = None
+    
+    @property
+    def last_trace(self):
+        """현재 스레드에서 마지막으로 처리한 턴의 trace"""
+        return self.turn.trace
+    
+    @property
+    def last_context_stats(self) -> Optional[Dict[str, Any]]:
+        return self.turn.context_stats
+    
+    @property
+    def last_intent(self):
+        return self.turn.intent
+    
+    def close(self):
+        """대기 중인 메모리 쓰기를 저장하고 스레드 풀 정리"""
+        self.memory_tools.close()
+        self.executor.shutdown(wait=False)
+    
+    @staticmethod
+    def _run_source(trace, stage: str, func, *args):
+        """스레드 풀 작업을 현재 턴의 trace에 span으로 기록하며 실행"""
+        if trace is None:
+            return func(*args)
+        with trace.span(stage):
+            return func(*args)
+    
+    def retrieve(self, user_input: str, user_id: str, needs_search: bool) -> Dict[str, str]:
+        """독립적인 검색 소스를 동시에 실행하고 마감 시간 내에 돌아온 결과만 반환
+        
+        마감 시간은 턴이 검색을 시작한 시점부터 retrieval_timeout 하나이므로,
+        스레드 풀에서 줄을 서느라 늦게 시작한 소스가 있어도 턴은 그 이상 기다리지 않습니다.
+        """
+        trace = self.tracer.current_trace()
+        executor = self.turn.executor or self.executor
+        sources = []
+        if needs_search:
+            sources.append(('wikipedia', 'search_wikipedia', self.web_search.search_wikipedia, (user_input,)))
+            sources.append(('web', 'search_web', self.web_search.search_web, (user_input,)))
+        sources.append(('memory', 'search_memories', self.memory_tools.search_memories, (user_input, user_id)))
+        
+        deadline = time.monotonic() + self.retrieval_timeout
+        futures = {
+            source: executor.submit(self._run_source, trace, stage, func, *args)
+            for source, stage, func, args in sources
+        }
+        _, not_done = wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
+        for future in not_done:
+            # 아직 시작하지 못한 작업은 취소 (실행 중인 작업은 끝나도 결과를 쓰지 않음)
+            future.cancel()
+        
+        results = {}
+        for source, future in futures.items():
+            if future in not_done:
+                continue
+            try:
+                results[source] = future.result()
+            except Exception as e:
+                results[source] = f"{source} 검색 오류: {str(e)}"
+        return results
+    
+    def build_context(self, user_input: str, user_id: str = "default") -> str:
+        """검색과 메모리 조회 결과로 답변 컨텍스트 구성"""
+        # 1. 웹 검색이 필요한지 판단
+        needs_search = False
+        if self.config.search_enabled:
+            with self.tracer.span('route') as span:
+                intent = self.router.route(user_input)
+                self.turn.intent = intent
+                needs_search = intent.wants(SEARCH_INTENT)
+                if span is not None:
+                    span.attributes.update(confidence=round(intent.confidence(SEARCH_INTENT), 3))
+        
+        # 2. 웹 검색과 관련 메모리 검색을 동시에 수행 (세대는 검색 전에 읽어 검색 결과보다 새롭지 않게 함)
+        memory_generation = self.memory_tools.search_cache.generation(user_id)
+        with self.tracer.span('retrieve', needs_search=needs_search):
+            results = self.retrieve(user_input, user_id, needs_search)
+        
+        sources = []
+        wiki_result = results.get('wikipedia')
+        web_result = results.get('web')
+        if wiki_result is not None:
+            sources.append(("Wikipedia 검색", wiki_result))
+        if web_result is not None:
+            sources.append(("웹 검색", web_result))
+        # 메모리 검색 결과 텍스트 대신 세대 번호를 넣어, 메모리가 바뀐 뒤에는 캐시된 답변을 쓰지 않음
+        self.turn.cache_context = "\n\n".join(
+            [f"메모리 세대: {memory_generation}"] + [f"{label}:\n{text}" for label, text in sources]
+        )
+        
+        # 검색 결과를 메모리에 저장 (압축 작업이 만료시킬 수 있도록 metadata로 표시하고 추출 없이 원문 저장)
+        if wiki_result is not None or web_result is not None:
+            with self.tracer.span('store_memory', kind='search'):
+                self.memory_tools.store_memory(
+                    f"검색: {user_input} - Wikipedia: {(wiki_result or '')[:50]}... Web: {(web_result or '')[:50]}...",
+                    user_id, metadata={'kind': SEARCH_MEMORY_KIND}, infer=False
+                )
+        
+        # 3. 관련 메모리
+        memory_result = results.get('memory')
+        if memory_result is not None:
+            sources.append(("관련 기억", memory_result))
+        
+        # 4. 관련도 순위 + 중복 제거로 토큰 예산 안에 맞춤
+        with self.tracer.span('context_budget', budget=self.budgeter.budget) as span:
+            context, stats = self.budgeter.assemble(user_input, sources)
+            if span is not None:
+                span.attributes.update(tokens=stats['tokens'], dropped=stats['dropped_over_budget'],
+                                       duplicates=stats['duplicates_removed'])
+        self.turn.context_stats = stats
+        return context
+    
+    def remember_exchange(self, user_input: str, response: str, user_id: str = "default"):
+        """중요한 정보를 메모리에 저장"""
+        if len(user_input) > 10:  # 의미있는 대화만 저장
+            with self.tracer.span('store_memory', kind='exchange'):
+                self.memory_tools.store_memory(f"대화: {user_input} -> {response[:100]}...", user_id)
+    
+    def fallback_response(self, user_input: str, context: str) -> str:
+        """API 키가 없을 때 기본 응답"""
+        response = f"'{user_input}'에 대한 응답입니다. (모델: {self.config.model})\nOpenAI API 키를 설정하면 더 정교한 답변을 받을 수 있습니다."
+        if context:
+            response = f"{context}\n\n{response}"
+        return response
+    
+    def process_message(self, user_input: str, user_id: str = None) -> str:
+        user_id = user_id or self.config.user_id
+        with self.tracer.start_trace('process_message', user_id=user_id, model=self.config.model) as trace:
+            self.turn.trace = trace
+            context = self.build_context(user_input, user_id)
+            
+            # 4. AI 응답 생성
+            if self.qa:
+                return self.answer(user_input, context, user_id)
+            return self.fallback_response(user_input, context)
+    
+    def embed_question(self, text: str):
+        """응답 캐시용 질문 임베딩 (mem0 임베딩 모델, 사용할 수 없으면 해시 임베딩)"""
+        embedding_model = getattr(self.memory_tools.memory, 'embedding_model', None)
+        if embedding_model is not None:
+            try:
+                return embedding_model.embed(text, "search")
+            except Exception:
+                pass
+        return hashed_embedding(text)
+    
+    def response_cache_context(self, context: str) -> str:
+        """응답 캐시 키 컨텍스트: 이번 턴의 외부 검색 결과와 메모리 세대 (build_context를 거치지 않았으면 전체 컨텍스트)"""
+        return self.turn.cache_context if self.turn.cache_context is not None else context
+    
+    def lookup_cached_answer(self, user_input: str, context: str, user_id: str):
+        """응답 캐시 조회 → (질문 임베딩, 캐시된 답변 또는 None)"""
+        if not self.response_cache:
+            return None, None
+        with self.tracer.span('response_cache') as span:
+            embedding = self.embed_question(user_input)
+            cached = self.response_cache.lookup(user_id, embedding, self.response_cache_context(context))
+            if span is not None:
+                span.attributes['hit'] = cached is not None
+        return embedding, cached
+    
+    def answer(self, user_input: str, context: str, user_id: str = "default") -> str:
+        """컨텍스트를 바탕으로 ChainOfThought 답변 생성"""
+        embedding, cached = self.lookup_cached_answer(user_input, context, user_id)
+        if cached is not None:
+            return cached
+        return self.generate_answer(user_input, context, user_id, embedding)
+    
+    def generate_answer(self, user_input: str, context: str, user_id: str, embedding=None) -> str:
+        """LM 호출로 답변을 생성하고 응답 캐시와 메모리에 기록"""
+        try:
+            with self.tracer.span('lm', model=self.config.model):
+                result = self.qa(context=context, question=user_input)
+            response = result.answer
+            if self.response_cache:
+                self.response_cache.store(user_id, embedding, self.response_cache_context(context), response)
+            self.remember_exchange(user_input, response, user_id)
+            return response
+        except Exception as e:
+            return f"AI 응답 생성 중 오류: {str(e)}"
+    
+    def get_stream_qa(self):
+        """answer 필드를 토큰 단위로 내보내는 DSPy 스트리밍 프로그램 (지원하지 않는 버전이면 None)"""
+        if self.stream_qa is None and self.qa is not None:
+            import dspy
+            try:
+                self.stream_qa = dspy.streamify(
+                    self.qa,
+                    stream_listeners=[dspy.streaming.StreamListener(signature_field_name="answer")],
+                    async_streaming=False
+                )
+            except (AttributeError, TypeError):
+                self.stream_qa = False
+        return self.stream_qa or None
+    
+    def ingest_document(self, stream, name: str, user_id: str = None, mime: str = None,
+                        on_progress=None) -> Dict[str, Any]:
+        """문서를 메모리에 저장 (이후 질문에서는 메모리 검색이 관련 구간만 가져옴)"""
+        user_id = user_id or self.config.user_id
+        with self.tracer.start_trace('ingest_document', user_id=user_id, document=name):
+            return self.memory_tools.ingest_document(stream, name, user_id, mime=mime, on_progress=on_progress)
+    
+    def process_batch(self, items: Iterable[Tuple[str, str]], max_workers: int = 4) -> Iterator[BatchResult]:
+        """(user_id, 입력) 쌍을 동시에 처리하고 끝나는 대로 결과를 yield (사용자별 순서 유지)
+        
+        동시 턴들의 검색 작업이 공용 풀에서 줄을 서다 마감 시간을 넘기지 않도록,
+        배치 동안은 동시 턴 수 × 검색 소스 수 크기의 전용 검색 스레드 풀을 씁니다.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers * RETRIEVAL_SOURCES,
+                                      thread_name_prefix="batch-retrieval")
+        
+        def handle(user_id: str, user_input: str):
+            # run_batch의 스레드가 배치 뒤 다른 턴을 처리해도 종료된 풀을 쓰지 않도록 원래 값으로 복원
+            previous = self.turn.executor
+            self.turn.executor = executor
+            try:
+                return self.process_message(user_input, user_id)
+            finally:
+                self.turn.executor = previous
+        
+        try:
+            yield from run_batch(handle, items, max_workers)
+        finally:
+            executor.shutdown(wait=False)
+    
+    def stream_message(self, user_input: str, user_id: str = None):
+        """process_message의 스트리밍 버전: 답변 토큰을 순서대로 yield"""
+        user_id = user_id or self.config.user_id
+        with self.tracer.start_trace('stream_message', user_id=user_id, model=self.config.model) as trace:
+            self.turn.trace = trace
+            context = self.build_context(user_input, user_id)
+            
+            if not self.qa:
+                yield self.fallback_response(user_input, context)
+                return
+            
+            embedding, cached = self.lookup_cached_answer(user_input, context, user_id)
+            if cached is not None:
+                yield cached
+                return
+            
+            stream_qa = self.get_stream_qa()
+            if stream_qa is None:
+                # 스트리밍을 지원하지 않으면 전체 답변을 한 번에 전달
+                yield self.generate_answer(user_input, context, user_id, embedding)
+                return
+            
+            import dspy
+            response = ""
+            lm_start = time.time_ns()
+            try:
+                for chunk in stream_qa(context=context, question=user_input):
+                    if isinstance(chunk, dspy.streaming.StreamResponse):
+                        if not response:
+                            trace.record_span('lm.first_token', lm_start)
+                        response += chunk.chunk
+                        yield chunk.chunk
+                    elif isinstance(chunk, dspy.Prediction):
+                        # 캐시된 응답처럼 토큰 없이 최종 결과만 온 경우
+                        if not response:
+                            trace.record_span('lm.first_token', lm_start)
+                            response = chunk.answer
+                            yield response
+            except Exception as e:
+                trace.record_span('lm', lm_start, model=self.config.model, error=str(e))
+                yield f"AI 응답 생성 중 오류: {str(e)}"
+                return
+            trace.record_span('lm', lm_start, model=self.config.model)
+            
+            if self.response_cache:
+                self.response_cache.store(user_id, embedding, self.response_cache_context(context), response)
+            self.remember_exchange(user_input, response, user_id)
+
+def create_memory(config: EngineConfig):
+    """설정으로부터 mem0 Memory 구성 (vector_store="numpy"면 로컬 벡터 저장소로 교체)"""
+    from mem0 import Memory
+    
+    memory_config = config.memory_config()
+    memory = Memory.from_config(memory_config) if memory_config else Memory()
+    if config.vector_store == "numpy":
+        from numpy_vector_store import attach_numpy_vector_store
+        attach_numpy_vector_store(memory, config.vector_store_path)
+    return memory
+
+def create_agent(config: EngineConfig = None, search_cache: SearchCache = None,
+                 memory_stats: MemoryStats = None,
+                 response_cache: SemanticResponseCache = None,
+                 router: IntentRouter = None,
+                 document_cache: DocumentCache = None,
+                 search_flight: SingleFlight = None,
+                 search_rate_limiters: Dict[str, TokenBucket] = None,
+                 memory_search_cache: MemorySearchCache = None,
+                 memory=None) -> SimpleAgent:
+    """설정으로부터 메모리, 웹 검색, 에이전트를 구성 (memory를 주면 새로 만들지 않고 공유)"""
+    config = config or EngineConfig()
+    memory = memory if memory is not None else create_memory(config)
+    web_search = SimpleWebSearch(cache=search_cache, language=config.search_language,
+                                 flight=search_flight, rate_limiters=search_rate_limiters)
+    return SimpleAgent(memory, web_search, config=config, memory_stats=memory_stats,
+                       response_cache=response_cache, router=router, document_cache=document_cache,
+                       memory_search_cache=memory_search_cache)
+
+class AgentPool:
+    """모델/설정 해시별로 에이전트를 재사용하는 프로세스 전역 풀
+
+    처음 요청될 때 만들고(lazy), 같은 설정이면 세션이 달라도 같은 에이전트를 돌려주며,
+    idle_ttl 동안 쓰이지 않았거나 max_agents를 넘으면 오래된 것부터 닫습니다.
+    턴을 처리하는 동안은 lease()로 빌려 쓰면 사용 중인 에이전트는 정리 대상에서 빠집니다.
+    """
+    
+    def __init__(self, idle_ttl: float = 1800.0, max_agents: int = 8, factory=None, **shared):
+        self.idle_ttl = idle_ttl
+        self.max_agents = max_agents
+        # shared: search_cache, memory_stats, response_cache, router, document_cache,
+        #         search_flight, search_rate_limiters, memory_search_cache, memory 등 모든 에이전트가 공유하는 자원
+        self.factory = factory or (lambda config: create_agent(config, **shared))
+        self._agents = {}  # key -> {'agent', 'last_used', 'leases'}
+        self._creating = {}  # key -> 생성 중복 방지용 lock
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+    
+    def _acquire(self, config: EngineConfig, lease: bool) -> SimpleAgent:
+        key = config.cache_key()
+        with self._lock:
+            entry = self._agents.get(key)
+            if entry is not None:
+                entry['last_used'] = time.monotonic()
+                entry['leases'] += lease
+                self.reused += 1
+                return entry['agent']
+            create_lock = self._creating.setdefault(key, threading.Lock())
+        
+        # 같은 키의 동시 생성은 한 번만 (다른 키 생성은 막지 않음)
+        with create_lock:
+            with self._lock:
+                entry = self._agents.get(key)
+                if entry is not None:
+                    entry['last_used'] = time.monotonic()
+                    entry['leases'] += lease
+                    self.reused += 1
+                    return entry['agent']
+            agent = self.factory(config)
+            with self._lock:
+                self._agents[key] = {'agent': agent, 'last_used': time.monotonic(), 'leases': int(lease)}
+                self._creating.pop(key, None)
+                self.created += 1
+        self.evict_idle(keep=key)
+        return agent
+    
+    def get(self, config: EngineConfig) -> SimpleAgent:
+        """에이전트 조회 (빌려 쓰지 않으므로 조회 후 바로 쓰지 않는 상태 표시용 등)"""
+        return self._acquire(config, lease=False)
+    
+    @contextlib.contextmanager
+    def lease(self, config: EngineConfig):
+        """with 블록 동안 에이전트를 빌려 씀 (빌려 간 에이전트는 닫히지 않음)"""
+        agent = self._acquire(config, lease=True)
+        key = config.cache_key()
+        try:
+            yield agent
+        finally:
+            with self._lock:
+                entry = self._agents.get(key)
+                if entry is not None and entry['agent'] is agent:
+                    entry['leases'] -= 1
+                    entry['last_used'] = time.monotonic()
+    
+    def evict_idle(self, keep: Optional[str] = None) -> int:
+        """오래 쓰이지 않은 에이전트 정리 (닫은 개수)
+        
+        빌려 간 에이전트는 건너뛰고, 닫기(메모리 쓰기 대기열 마무리)는 호출자를 막지 않도록
+        백그라운드 스레드에서 실행합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ordered = sorted(self._agents.items(), key=lambda item: item[1]['last_used'])
+            idle = [(key, entry) for key, entry in ordered if key != keep and not entry['leases']]
+            expired = [key for key, entry in idle if now - entry['last_used'] > self.idle_ttl]
+            overflow = len(self._agents) - len(expired) - self.max_agents
+            for key, _ in idle:
+                if overflow <= 0:
+                    break
+                if key not in expired:
+                    expired.append(key)
+                    overflow -= 1
+            agents = [self._agents.pop(key)['agent'] for key in expired]
+            self.evicted += len(agents)
+        if agents:
+            threading.Thread(target=self._close_agents, args=(agents,), name="agent-pool-close",
+                             daemon=True).start()
+        return len(agents)
+    
+    @staticmethod
+    def _close_agents(agents: List[SimpleAgent]):
+        for agent in agents:
+            agent.close()
+    
+    def active_users(self) -> List[str]:
+        """풀의 에이전트들이 메모리를 쓴 사용자 (메모리 압축 대상)"""
+        with self._lock:
+            agents = [entry['agent'] for entry in self._agents.values()]
+        users = set()
+        for agent in agents:
+            users.update(agent.memory_tools.active_users)
+        return sorted(users)
+    
+    def close(self):
+        with self._lock:
+            agents = [entry['agent'] for entry in self._agents.values()]
+            self._agents.clear()
+        self._close_agents(agents)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'agents': len(self._agents),
+                'leased': sum(1 for entry in self._agents.values() if entry['leases']),
+                'models': sorted({entry['agent'].config.model for entry in self._agents.values()}),
+                'created': self.created,
+                'reused': self.reused,
+                'evicted': self.evicted,
+            }
+
+def main():
+    """명령줄에서 에이전트 실행 (질문이 없으면 대화형 모드)"""
+    from dotenv import load_dotenv
+    
+    load_dotenv()
+    
+    parser = argparse.ArgumentParser(description="DSPy + mem0 에이전트 엔진")
+    parser.add_argument("question", nargs="?", help="질문 (생략하면 대화형 모드)")
+    parser.add_argument("--model", default="gpt-4o-mini", choices=MODEL_OPTIONS)
+    parser.add_argument("--user-id", default="default")
+    parser.add_argument("--retrieval-timeout", type=float, default=8.0)
+    parser.add_argument("--no-search", action="store_true", help="웹 검색 비활성화")
+    parser.add_argument("--stream", action="store_true", help="답변을 토큰 단위로 출력")
+    parser.add_argument("--context-budget", type=int, help="컨텍스트 토큰 예산 (기본: 모델별 값)")
+    parser.add_argument("--search-threshold", type=float, default=0.5, help="웹 검색 의도 확신도 기준")
+    parser.add_argument("--intent-rules", help="의도 규칙 JSON 파일 (examples 키가 있으면 로컬 분류기도 학습)")
+    parser.add_argument("--batch", help="JSONL 입력 파일 ({\"user_id\", \"input\"} 줄 단위, -는 표준입력)")
+    parser.add_argument("--ingest", action="append", help="메모리에 저장할 문서 (txt/md/pdf/docx, 여러 번 지정 가능)")
+    parser.add_argument("--workers", type=int, default=4, help="배치 동시 실행 수")
+    parser.add_argument("--vector-store", default="default", choices=["default", "numpy"],
+                        help="mem0 벡터 저장소 (numpy: 로컬 메모리 맵 인덱스)")
+    args = parser.parse_args()
+    
+    config = EngineConfig(
+        model=args.model,
+        user_id=args.user_id,
+        retrieval_timeout=args.retrieval_timeout,
+        search_enabled=not args.no_search,
+        context_budget=args.context_budget,
+        search_threshold=args.search_threshold,
+        intent_rules_path=args.intent_rules,
+        vector_store=args.vector_store
+    )
+    agent = create_agent(config, search_cache=SearchCache(),
+                         document_cache=DocumentCache(db_path=os.getenv("DOCUMENT_CACHE_PATH") or None))
+    
+    for path in args.ingest or []:
+        with open(path, "rb") as f:
+            report = agent.ingest_document(f, os.path.basename(path),
+                                           on_progress=lambda r: print(f"📚 {r['name']}: {r['passages']}개 구간 ({r['fraction']:.0%})"))
+        print(f"✅ {report['name']}: {report['passages']}개 구간, {report['batches']}개 배치 ({report['elapsed_s']:.1f}s)")
+    
+    if args.batch:
+        # 배치 모드: 결과를 완료 순서대로 JSONL로 출력
+        stream = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        try:
+            rows = [json.loads(line) for line in stream if line.strip()]
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        items = [(row.get('user_id', args.user_id), row['input']) for row in rows]
+        try:
+            for result in agent.process_batch(items, max_workers=args.workers):
+                print(json.dumps(result.to_dict(), ensure_ascii=False), flush=True)
+        finally:
+            agent.close()
+        return
+    
+    def answer(question: str):
+        if args.stream:
+            for token in agent.stream_message(question):
+                print(token, end="", flush=True)
+            print()
+        else:
+            print(agent.process_message(question))
+    
+    try:
+        if args.question:
+            answer(args.question)
+        else:
+            while True:
+                try:
+                    question = input("📝 사용자: ").strip()
+                except EOFError:
+                    break
+                if question in ("exit", "quit"):
+                    break
+                if question:
+                    answer(question)
+    finally:
+        agent.close()
+
+if __name__ == "__main__":
+    main()
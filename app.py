@@ -2,22 +2,26 @@
 # ChatGPT/Claude 스타일의 완전한 대화 관리 시스템을 갖춘 DSPy + mem0 + 웹검색 Streamlit 앱
 
 import streamlit as st
-import dspy
-from mem0 import Memory
 import os
 import uuid
+import functools
 import json
-import re
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
 
-# 웹 검색을 위한 간단한 구현
-try:
-    from duckduckgo_search import DDGS
-    import wikipediaapi
-    WEB_SEARCH_AVAILABLE = True
-except ImportError:
-    WEB_SEARCH_AVAILABLE = False
+from agent_engine import AgentPool, EngineConfig, MODEL_OPTIONS, create_memory
+from conversation_store import ConversationStore, SQLiteConversationStore
+from document_cache import DocumentCache
+from document_ingest import UnsupportedDocumentError
+from intent_router import IntentRouter
+from memory_cache import MemorySearchCache
+from memory_compaction import CompactionScheduler, MemoryCompactor
+from memory_stats import MemoryStats
+from request_coalescing import SingleFlight, build_rate_limiters
+from response_cache import SemanticResponseCache
+from search_cache import SearchCache
+from tokenizer import KOREAN_WORD_RE, ENGLISH_WORD_RE
+from tracing import default_tracer, start_metrics_server
+from ui_assets import APP_CSS, CONVERSATION_TEMPLATES
 
 # Streamlit 설정
 st.set_page_config(
@@ -27,488 +31,29 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# 기존 CSS 스타일 (그대로 유지)
-st.markdown("""
-<style>
-    /* 전체 앱 스타일링 */
-    .main-header {
-        font-size: 2.2rem;
-        font-weight: 700;
-        text-align: center;
-        margin-bottom: 1.5rem;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-    }
-    
-    /* 메시지 컨테이너 */
-    .message-container {
-        margin: 12px 0;
-        position: relative;
-    }
-    
-    .user-message-container {
-        display: flex;
-        justify-content: flex-end;
-        align-items: flex-start;
-        margin-left: 60px;
-    }
-    
-    .assistant-message-container {
-        display: flex;
-        justify-content: flex-start;
-        align-items: flex-start;
-        margin-right: 60px;
-    }
-    
-    /* 메시지 스타일 개선 */
-    .user-msg {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 15px 20px;
-        border-radius: 18px 18px 5px 18px;
-        box-shadow: 0 2px 10px rgba(102, 126, 234, 0.3);
-        position: relative;
-        word-wrap: break-word;
-        max-width: 80%;
-    }
-    
-    .user-msg::before {
-        content: "👤";
-        position: absolute;
-        right: -45px;
-        top: 50%;
-        transform: translateY(-50%);
-        background: #667eea;
-        width: 35px;
-        height: 35px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 16px;
-    }
-    
-    .assistant-msg {
-        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        color: white;
-        padding: 15px 20px;
-        border-radius: 18px 18px 18px 5px;
-        box-shadow: 0 2px 10px rgba(240, 147, 251, 0.3);
-        position: relative;
-        word-wrap: break-word;
-        max-width: 80%;
-    }
-    
-    .assistant-msg::before {
-        content: "🤖";
-        position: absolute;
-        left: -45px;
-        top: 50%;
-        transform: translateY(-50%);
-        background: #f093fb;
-        width: 35px;
-        height: 35px;
-        border-radius: 50%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 16px;
-    }
-    
-    /* 메모리 박스 개선 */
-    .memory-box {
-        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
-        padding: 12px 16px;
-        border-radius: 12px;
-        margin: 8px 0;
-        border-left: 4px solid #4CAF50;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-        transition: transform 0.2s ease;
-        font-size: 0.9rem;
-    }
-    
-    .memory-box:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }
-    
-    /* 타임스탬프 */
-    .message-timestamp {
-        font-size: 0.75rem;
-        opacity: 0.7;
-        margin-top: 5px;
-        text-align: right;
-    }
-    
-    .user-message-container .message-timestamp {
-        text-align: right;
-    }
-    
-    .assistant-message-container .message-timestamp {
-        text-align: left;
-    }
-    
-    /* 3열 레이아웃 스타일 */
-    .three-column-container {
-        display: flex;
-        gap: 20px;
-        height: 80vh;
-        max-width: 100%;
-    }
-    
-    .left-sidebar {
-        flex: 0 0 280px;
-        background: linear-gradient(145deg, #f8f9fa, #e9ecef);
-        border-radius: 15px;
-        padding: 20px;
-        overflow-y: auto;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    
-    .main-chat-area {
-        flex: 1;
-        display: flex;
-        flex-direction: column;
-        background: #ffffff;
-        border-radius: 15px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-        overflow: hidden;
-    }
-    
-    .right-panel {
-        flex: 0 0 320px;
-        background: linear-gradient(145deg, #f1f3f4, #e8eaed);
-        border-radius: 15px;
-        padding: 20px;
-        overflow-y: auto;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }
-    
-    /* 채팅 영역 내부 구조 */
-    .chat-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        padding: 20px;
-        text-align: center;
-        font-weight: 600;
-        font-size: 1.2rem;
-    }
-    
-    .chat-messages {
-        flex: 1;
-        padding: 20px;
-        overflow-y: auto;
-        background: #fafbfc;
-    }
-    
-    .chat-input-area {
-        border-top: 1px solid #e9ecef;
-        padding: 20px;
-        background: white;
-    }
-    
-    /* 사이드바 섹션 스타일 */
-    .sidebar-section {
-        margin-bottom: 25px;
-        padding-bottom: 15px;
-        border-bottom: 1px solid #dee2e6;
-    }
-    
-    .sidebar-section:last-child {
-        border-bottom: none;
-    }
-    
-    .section-title {
-        font-size: 1.1rem;
-        font-weight: 600;
-        color: #495057;
-        margin-bottom: 15px;
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    /* 우측 패널 스타일 */
-    .panel-section {
-        background: white;
-        border-radius: 12px;
-        padding: 16px;
-        margin-bottom: 16px;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-    }
-    
-    .panel-header {
-        font-size: 1rem;
-        font-weight: 600;
-        color: #495057;
-        margin-bottom: 12px;
-        display: flex;
-        align-items: center;
-        gap: 8px;
-    }
-    
-    /* 버튼 개선 */
-    .stButton > button {
-        border-radius: 20px;
-        border: none;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-    }
-    
-    /* 스크롤바 커스터마이징 */
-    ::-webkit-scrollbar {
-        width: 8px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: #f1f1f1;
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
-    }
-    
-    /* 반응형 디자인 */
-    @media (max-width: 1200px) {
-        .three-column-container {
-            flex-direction: column;
-            height: auto;
-        }
-        
-        .left-sidebar, .right-panel {
-            flex: none;
-            width: 100%;
-            max-height: 300px;
-        }
-        
-        .main-chat-area {
-            min-height: 60vh;
-        }
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# 대화 템플릿 정의
-CONVERSATION_TEMPLATES = {
-    "coding": {
-        "title": "💻 코딩 도움",
-        "description": "프로그래밍 질문과 코드 리뷰를 위한 대화",
-        "initial_message": "안녕하세요! 코딩 관련 질문이나 도움이 필요한 부분이 있나요? 프로그래밍 언어, 알고리즘, 디버깅, 코드 리뷰 등 무엇이든 도와드리겠습니다.",
-        "suggested_prompts": [
-            "Python 함수 작성 도움",
-            "코드 오류 디버깅", 
-            "알고리즘 최적화",
-            "코드 리뷰 요청"
-        ]
-    },
-    "writing": {
-        "title": "✍️ 글쓰기 도움",
-        "description": "창작, 에세이, 보고서 작성을 위한 대화",
-        "initial_message": "창작 활동이나 글쓰기에 도움이 필요하신가요? 소설, 에세이, 보고서, 블로그 포스트 등 어떤 종류의 글이든 함께 작업해보겠습니다.",
-        "suggested_prompts": [
-            "블로그 포스트 아이디어",
-            "소설 플롯 구성",
-            "보고서 구조 잡기", 
-            "문체 개선 요청"
-        ]
-    },
-    "learning": {
-        "title": "📚 학습 도우미",
-        "description": "새로운 주제 학습과 설명을 위한 대화",
-        "initial_message": "새로운 것을 배우고 싶으신가요? 복잡한 개념도 쉽게 설명해드리고, 단계별로 학습할 수 있도록 도와드리겠습니다.",
-        "suggested_prompts": [
-            "개념 쉽게 설명해주세요",
-            "예시와 함께 알려주세요",
-            "연습 문제 만들어주세요",
-            "심화 내용 추천"
-        ]
-    },
-    "brainstorm": {
-        "title": "💡 아이디어 브레인스토밍", 
-        "description": "창의적 아이디어 발상과 기획을 위한 대화",
-        "initial_message": "새로운 아이디어가 필요하신가요? 함께 브레인스토밍하며 창의적인 솔루션을 찾아보겠습니다!",
-        "suggested_prompts": [
-            "비즈니스 아이디어",
-            "프로젝트 기획",
-            "문제 해결 방안",
-            "창의적 접근법"
-        ]
-    }
-}
-
-# 웹 검색 도구 클래스 (기존과 동일)
-class SimpleWebSearch:
-    def __init__(self):
-        self.available = WEB_SEARCH_AVAILABLE
-        if self.available:
-            self.wiki = wikipediaapi.Wikipedia(language='ko', user_agent='DSPy-Agent/1.0')
-    
-    def search_wikipedia(self, query: str) -> str:
-        if not self.available:
-            return "웹 검색 패키지가 설치되지 않았습니다. pip install duckduckgo-search wikipedia-api"
-        
-        try:
-            page = self.wiki.page(query)
-            if page.exists():
-                summary = page.summary
-                sentences = summary.split('.')[:3]
-                result = '. '.join(sentences) + '.'
-                return f"Wikipedia 검색 '{query}':\n{result}"
-            else:
-                return f"Wikipedia에서 '{query}' 정보를 찾을 수 없습니다."
-        except Exception as e:
-            return f"Wikipedia 검색 오류: {str(e)}"
-    
-    def search_web(self, query: str) -> str:
-        if not self.available:
-            return "웹 검색 패키지가 설치되지 않았습니다."
-        
-        try:
-            with DDGS() as ddgs:
-                results = list(ddgs.text(query, max_results=3))
-            
-            if results:
-                search_result = f"웹 검색 '{query}':\n\n"
-                for i, result in enumerate(results, 1):
-                    search_result += f"{i}. {result['title']}\n{result['body'][:150]}...\n\n"
-                return search_result
-            else:
-                return f"'{query}'에 대한 검색 결과가 없습니다."
-        except Exception as e:
-            return f"웹 검색 오류: {str(e)}"
-
-# 메모리 도구 클래스 (기존과 동일)
-class SimpleMemoryTools:
-    def __init__(self, memory):
-        self.memory = memory
-    
-    def store_memory(self, content: str, user_id: str = "default") -> str:
-        try:
-            self.memory.add(content, user_id=user_id)
-            return f"✅ 메모리 저장: {content[:50]}..."
-        except Exception as e:
-            return f"❌ 메모리 저장 실패: {str(e)}"
-    
-    def search_memories(self, query: str, user_id: str = "default") -> str:
-        try:
-            results = self.memory.search(query, user_id=user_id, limit=5)
-            if not results or 'results' not in results:
-                return "관련 메모리가 없습니다."
-            
-            memory_text = "관련 메모리:\n"
-            for i, result in enumerate(results['results'], 1):
-                memory_text += f"{i}. {result['memory']}\n"
-            return memory_text
-        except Exception as e:
-            return f"메모리 검색 오류: {str(e)}"
-    
-    def get_all_memories(self, user_id: str = "default") -> List[str]:
-        try:
-            results = self.memory.get_all(user_id=user_id)
-            if not results or 'results' not in results:
-                return []
-            return [result['memory'] for result in results['results']]
-        except:
-            return []
-
-# 간단한 에이전트 클래스 (기존과 동일)
-class SimpleAgent:
-    def __init__(self, memory, web_search):
-        self.memory_tools = SimpleMemoryTools(memory)
-        self.web_search = web_search
-        
-        # DSPy 설정 (선택된 모델 사용)
-        if os.getenv("OPENAI_API_KEY"):
-            selected_model = getattr(st.session_state, 'selected_model', 'gpt-4o-mini')
-            lm = dspy.LM(model=f'openai/{selected_model}')
-            dspy.configure(lm=lm)
-            self.qa = dspy.ChainOfThought("context, question -> reasoning, answer")
-        else:
-            self.qa = None
-    
-    def process_message(self, user_input: str, user_id: str = "default") -> str:
-        # 1. 웹 검색이 필요한지 판단
-        search_keywords = ["검색", "최신", "뉴스", "찾아", "알려줘", "정보"]
-        needs_search = any(keyword in user_input for keyword in search_keywords)
-        
-        context = ""
-        
-        # 2. 웹 검색 수행
-        if needs_search:
-            # Wikipedia 검색
-            wiki_result = self.web_search.search_wikipedia(user_input)
-            context += f"Wikipedia 검색:\n{wiki_result}\n\n"
-            
-            # 일반 웹 검색
-            web_result = self.web_search.search_web(user_input)
-            context += f"웹 검색:\n{web_result}\n\n"
-            
-            # 검색 결과를 메모리에 저장
-            self.memory_tools.store_memory(f"검색: {user_input} - Wikipedia: {wiki_result[:50]}... Web: {web_result[:50]}...", user_id)
-        
-        # 3. 관련 메모리 검색
-        memory_result = self.memory_tools.search_memories(user_input, user_id)
-        context += f"관련 기억:\n{memory_result}\n\n"
-        
-        # 4. AI 응답 생성
-        if self.qa and os.getenv("OPENAI_API_KEY"):
-            try:
-                result = self.qa(context=context, question=user_input)
-                response = result.answer
-                # 중요한 정보를 메모리에 저장
-                if len(user_input) > 10:  # 의미있는 대화만 저장
-                    self.memory_tools.store_memory(f"대화: {user_input} -> {response[:100]}...", user_id)
-            except Exception as e:
-                response = f"AI 응답 생성 중 오류: {str(e)}"
-        else:
-            # API 키가 없을 때 기본 응답
-            selected_model = getattr(st.session_state, 'selected_model', 'gpt-4o-mini')
-            response = f"'{user_input}'에 대한 응답입니다. (모델: {selected_model})\nOpenAI API 키를 설정하면 더 정교한 답변을 받을 수 있습니다."
-            if context:
-                response = f"{context}\n\n{response}"
-        
-        return response
+# CSS 스타일 (ui_assets에서 프로세스당 한 번 생성)
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # 대화 세션 관리 클래스
 class ConversationManager:
-    """ChatGPT 스타일의 대화 세션 관리"""
+    """ChatGPT 스타일의 대화 세션 관리
+
+    대화 목록과 메시지는 ConversationStore에 저장하고, 세션 상태에는
+    현재 열려 있는 대화의 메시지만 유지합니다.
+    """
     
-    def __init__(self):
-        self.init_conversation_state()
+    def __init__(self, store: ConversationStore):
+        self.store = store
     
     def init_conversation_state(self):
         """대화 상태 초기화"""
-        if 'conversations' not in st.session_state:
-            st.session_state.conversations = {}
-        
         if 'current_conversation_id' not in st.session_state:
             st.session_state.current_conversation_id = None
-        
-        if 'conversation_list' not in st.session_state:
-            st.session_state.conversation_list = []
     
     def create_new_conversation(self, title=None):
         """새 대화 세션 생성 (ChatGPT 스타일)"""
         # 현재 대화가 있고 메시지가 있다면 자동 저장
-        if (st.session_state.current_conversation_id and 
-            st.session_state.current_conversation_id in st.session_state.conversations and
-            st.session_state.conversations[st.session_state.current_conversation_id]['messages']):
-            
+        if st.session_state.current_conversation_id and st.session_state.get('messages'):
             self.save_current_conversation(auto_generate_title=True)
         
         # 새 대화 세션 ID 생성
@@ -518,45 +63,50 @@ class ConversationManager:
         new_conversation = {
             'id': new_conversation_id,
             'title': title or "새 대화",
-            'messages': [],
             'created_at': datetime.now(),
             'updated_at': datetime.now(),
             'user_id': st.session_state.user_id,
             'model': st.session_state.selected_model,
             'starred': False
         }
+        self.store.create_conversation(new_conversation)
         
         # 세션 상태 업데이트
-        st.session_state.conversations[new_conversation_id] = new_conversation
         st.session_state.current_conversation_id = new_conversation_id
         st.session_state.messages = []  # 현재 메시지 초기화
         
-        # 대화 목록에 추가 (최신순)
-        st.session_state.conversation_list.insert(0, new_conversation_id)
-        
         st.toast("✨ 새 대화가 시작되었습니다!")
         return new_conversation_id
     
+    def append_message(self, message):
+        """현재 대화에 새 메시지 하나만 추가 저장 (전체 메시지 복사 없음)"""
+        if not st.session_state.current_conversation_id:
+            return False
+        
+        self.store.append_message(st.session_state.current_conversation_id, message)
+        return self.save_current_conversation()
+    
     def save_current_conversation(self, auto_generate_title=True):
-        """현재 대화 저장"""
+        """현재 대화 저장
+
+        메시지는 append_message로 추가될 때마다 이미 저장되므로 여기서는
+        대화 메타데이터(자동 제목)만 갱신합니다.
+        """
         if not st.session_state.current_conversation_id:
             return False
         
         conversation_id = st.session_state.current_conversation_id
+        conversation = self.store.get_conversation(conversation_id)
         
-        if conversation_id in st.session_state.conversations:
-            # 현재 메시지를 대화에 저장
-            st.session_state.conversations[conversation_id]['messages'] = st.session_state.messages.copy()
-            st.session_state.conversations[conversation_id]['updated_at'] = datetime.now()
-            
+        if conversation:
             # 대화 제목 자동 생성 (AI 기반 또는 규칙 기반)
             if (auto_generate_title and 
-                st.session_state.conversations[conversation_id]['title'] == "새 대화" and
+                conversation['title'] == "새 대화" and
                 len(st.session_state.messages) >= 2):
                 
                 agent = getattr(st.session_state, 'agent', None)
                 new_title = self.generate_conversation_title(st.session_state.messages, agent)
-                st.session_state.conversations[conversation_id]['title'] = new_title
+                self.store.update_conversation(conversation_id, title=new_title)
             
             return True
         return False
@@ -586,10 +136,10 @@ class ConversationManager:
     def extract_keywords(self, text):
         """간단한 키워드 추출 (한국어 지원)"""
         # 한국어 단어 추출 (2글자 이상)
-        korean_words = re.findall(r'[가-힣]{2,}', text)
+        korean_words = KOREAN_WORD_RE.findall(text)
         
         # 영어 단어 추출
-        english_words = re.findall(r'[a-zA-Z]{3,}', text)
+        english_words = ENGLISH_WORD_RE.findall(text)
         
         # 불용어 제거
         stopwords = {'이것', '그것', '저것', '여기', '거기', '저기', '이거', '그거', '저거',
@@ -611,40 +161,36 @@ class ConversationManager:
     
     def load_conversation(self, conversation_id):
         """특정 대화 로드"""
-        if conversation_id in st.session_state.conversations:
+        conversation = self.store.get_conversation(conversation_id)
+        if conversation:
             # 현재 대화 먼저 저장
             if st.session_state.current_conversation_id:
                 self.save_current_conversation()
             
-            # 선택한 대화 로드
-            conversation = st.session_state.conversations[conversation_id]
+            # 선택한 대화의 메시지만 불러오기
             st.session_state.current_conversation_id = conversation_id
-            st.session_state.messages = conversation['messages'].copy()
+            st.session_state.messages = self.store.get_messages(conversation_id)
             st.session_state.user_id = conversation.get('user_id', st.session_state.user_id)
             
-            # 대화 목록에서 맨 위로 이동 (최근 접근한 대화)
-            if conversation_id in st.session_state.conversation_list:
-                st.session_state.conversation_list.remove(conversation_id)
-            st.session_state.conversation_list.insert(0, conversation_id)
-            
             st.toast(f"📂 '{conversation['title']}'를 불러왔습니다!")
             return True
         return False
     
     def delete_conversation(self, conversation_id):
         """대화 삭제"""
-        if conversation_id in st.session_state.conversations:
-            title = st.session_state.conversations[conversation_id]['title']
-            del st.session_state.conversations[conversation_id]
-            
-            if conversation_id in st.session_state.conversation_list:
-                st.session_state.conversation_list.remove(conversation_id)
+        conversation = self.store.get_conversation(conversation_id)
+        if conversation:
+            title = conversation['title']
+            self.store.delete_conversation(conversation_id)
             
             # 삭제된 대화가 현재 대화라면 새 대화 시작
             if st.session_state.current_conversation_id == conversation_id:
-                if st.session_state.conversation_list:
+                st.session_state.current_conversation_id = None
+                st.session_state.messages = []
+                remaining = self.store.list_conversations(st.session_state.user_id, limit=1)
+                if remaining:
                     # 다른 대화가 있으면 가장 최근 대화 로드
-                    self.load_conversation(st.session_state.conversation_list[0])
+                    self.load_conversation(remaining[0]['id'])
                 else:
                     # 모든 대화가 삭제되면 새 대화 시작
                     self.create_new_conversation()
@@ -653,32 +199,151 @@ class ConversationManager:
             return True
         return False
     
+    def toggle_star(self, conversation_id):
+        """즐겨찾기 토글"""
+        conversation = self.store.get_conversation(conversation_id)
+        if conversation:
+            self.store.update_conversation(conversation_id, starred=not conversation['starred'])
+    
+    def get_current_conversation(self):
+        """현재 대화 메타데이터"""
+        if not st.session_state.current_conversation_id:
+            return None
+        return self.store.get_conversation(st.session_state.current_conversation_id)
+    
     def get_conversation_list(self):
         """대화 목록 반환 (최신순)"""
-        conversations = []
-        for conv_id in st.session_state.conversation_list:
-            if conv_id in st.session_state.conversations:
-                conv = st.session_state.conversations[conv_id]
-                conversations.append({
-                    'id': conv_id,
-                    'title': conv['title'],
-                    'created_at': conv['created_at'],
-                    'updated_at': conv['updated_at'],
-                    'message_count': len(conv['messages']),
-                    'is_current': conv_id == st.session_state.current_conversation_id,
-                    'starred': conv.get('starred', False)
-                })
+        conversations = self.store.list_conversations(st.session_state.user_id)
+        for conv in conversations:
+            conv['is_current'] = conv['id'] == st.session_state.current_conversation_id
         return conversations
     
+    def count_conversations(self, starred=None):
+        return self.store.count_conversations(st.session_state.user_id, starred=starred)
+    
     def ensure_current_conversation(self):
-        """현재 대화가 없으면 새로 생성"""
+        """현재 대화가 없으면 새로 생성 (비어 있는 최근 대화가 있으면 재사용)"""
         if not st.session_state.current_conversation_id:
-            self.create_new_conversation()
+            recent = self.store.list_conversations(st.session_state.user_id, limit=1)
+            if recent and recent[0]['message_count'] == 0:
+                st.session_state.current_conversation_id = recent[0]['id']
+                st.session_state.messages = []
+            else:
+                self.create_new_conversation()
 
 # 전역 대화 관리자 인스턴스
 @st.cache_resource
 def get_conversation_manager():
-    return ConversationManager()
+    store = SQLiteConversationStore(os.getenv("CONVERSATION_DB_PATH", "conversations.db"))
+    return ConversationManager(store)
+
+# 프로세스 전역 검색 캐시 (모든 세션과 대화가 공유)
+@st.cache_resource
+def get_search_cache():
+    return SearchCache(
+        ttl=float(os.getenv("SEARCH_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("SEARCH_CACHE_SIZE", "1024")),
+        db_path=os.getenv("SEARCH_CACHE_PATH") or None
+    )
+
+# 프로세스 전역 웹 검색 요청 합치기 + 백엔드별 속도 제한 (모든 에이전트가 공유)
+@st.cache_resource
+def get_search_flight():
+    return SingleFlight()
+
+@st.cache_resource
+def get_search_rate_limiters():
+    return build_rate_limiters({
+        'web': (float(os.getenv("WEB_SEARCH_RATE", "1")), int(os.getenv("WEB_SEARCH_BURST", "3"))),
+        'wikipedia': (float(os.getenv("WIKI_SEARCH_RATE", "5")), int(os.getenv("WIKI_SEARCH_BURST", "10"))),
+    })
+
+# 프로세스 전역 메모리 검색 캐시 (풀의 모든 에이전트가 같은 벡터 저장소를 쓰므로 무효화도 공유)
+@st.cache_resource
+def get_memory_search_cache():
+    return MemorySearchCache(
+        max_entries_per_user=int(os.getenv("MEMORY_SEARCH_CACHE_SIZE", "128")),
+        ttl=float(os.getenv("MEMORY_SEARCH_CACHE_TTL", "300"))
+    )
+
+# 프로세스 전역 업로드 문서 캐시 (구간 해시 기준, 재업로드 시 임베딩 생략)
+@st.cache_resource
+def get_document_cache():
+    return DocumentCache(
+        max_entries=int(os.getenv("DOCUMENT_CACHE_SIZE", "4096")),
+        db_path=os.getenv("DOCUMENT_CACHE_PATH") or None
+    )
+
+# 프로세스 전역 의미 기반 응답 캐시 (사용자별로 분리)
+@st.cache_resource
+def get_response_cache():
+    return SemanticResponseCache(
+        threshold=float(os.getenv("RESPONSE_CACHE_THRESHOLD", "0.92")),
+        ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+        max_entries_per_user=int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    )
+
+# 프로세스 전역 의도 라우터 (규칙 매처를 한 번만 컴파일)
+@st.cache_resource
+def get_intent_router():
+    threshold = float(os.getenv("SEARCH_INTENT_THRESHOLD", "0.5"))
+    classifier_weight = float(os.getenv("INTENT_CLASSIFIER_WEIGHT", "0.4"))
+    rules_path = os.getenv("INTENT_RULES_PATH")
+    if rules_path:
+        # 규칙 파일에 examples가 있으면 로컬 분류기를 학습해 규칙 확신도와 섞음
+        return IntentRouter.from_file(rules_path, threshold=threshold, classifier_weight=classifier_weight)
+    return IntentRouter(threshold=threshold)
+
+# 프로세스 전역 메모리 통계 (사용자별 개수와 최근 메모리)
+@st.cache_resource
+def get_memory_stats():
+    return MemoryStats(recent_size=3)
+
+# 프로세스 전역 mem0 메모리 (모든 에이전트와 압축 스케줄러가 같은 클라이언트/벡터 저장소 사용)
+@st.cache_resource
+def get_memory():
+    return create_memory(EngineConfig(
+        vector_store=os.getenv("VECTOR_STORE", "default"),
+        vector_store_path=os.getenv("VECTOR_STORE_PATH", "vector_store")
+    ))
+
+# 프로세스 전역 에이전트 풀 (모델/설정별 lazy 생성, 세션 간 재사용, 유휴 시 정리)
+@st.cache_resource
+def get_agent_pool():
+    return AgentPool(
+        idle_ttl=float(os.getenv("AGENT_POOL_IDLE_TTL", "1800")),
+        max_agents=int(os.getenv("AGENT_POOL_SIZE", "8")),
+        search_cache=get_search_cache(),
+        memory_stats=get_memory_stats(),
+        response_cache=get_response_cache(),
+        router=get_intent_router(),
+        document_cache=get_document_cache(),
+        search_flight=get_search_flight(),
+        search_rate_limiters=get_search_rate_limiters(),
+        memory_search_cache=get_memory_search_cache(),
+        memory=get_memory()
+    )
+
+# 프로세스 전역 메모리 압축 스케줄러 (MEMORY_COMPACTION_INTERVAL 설정 시 한 번 시작)
+@st.cache_resource
+def get_compaction_scheduler():
+    interval = float(os.getenv("MEMORY_COMPACTION_INTERVAL", "0"))
+    if not interval:
+        return None
+    
+    def invalidate_user(user_id: str):
+        # 모든 에이전트가 공유하는 검색 캐시/통계를 비워 지워진 메모리가 보이지 않게 함
+        get_memory_search_cache().invalidate(user_id)
+        get_memory_stats().invalidate(user_id)
+    
+    compactor = MemoryCompactor(get_memory(), on_change=invalidate_user)
+    return CompactionScheduler(compactor, get_agent_pool().active_users, interval).start()
+
+# Prometheus /metrics 엔드포인트 (METRICS_PORT 설정 시 프로세스당 한 번 시작)
+@st.cache_resource
+def get_metrics_server():
+    port = os.getenv("METRICS_PORT")
+    return start_metrics_server(default_tracer, int(port)) if port else None
 
 # 템플릿 기반 대화 생성
 def create_template_based_conversation(template_key):
@@ -752,11 +417,12 @@ def create_chatgpt_style_sidebar():
         with col2:
             sort_option = st.selectbox(
                 "🔄 정렬",
-                ["recent", "oldest", "title"],
+                ["recent", "oldest", "title", "relevance"],
                 format_func=lambda x: {
                     "recent": "최신순",
                     "oldest": "오래된순", 
-                    "title": "제목순"
+                    "title": "제목순",
+                    "relevance": "관련도순"
                 }[x],
                 key="conversation_sort"
             )
@@ -782,6 +448,7 @@ def create_chatgpt_style_sidebar():
         conversations.sort(key=lambda x: x['updated_at'])
     elif sort_option == "title":
         conversations.sort(key=lambda x: x['title'].lower())
+    # relevance: 검색 결과 순서(관련도순)를 그대로 유지
     
     st.markdown("---")
     
@@ -809,40 +476,32 @@ def create_chatgpt_style_sidebar():
         os.environ["OPENAI_API_KEY"] = api_key
     
     # 모델 선택
-    model_options = ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"]
     selected_model = st.selectbox(
         "🤖 AI 모델",
-        model_options,
+        MODEL_OPTIONS,
         index=0,
         key="model_selector"
     )
     st.session_state.selected_model = selected_model
+    
+    # 스트리밍 응답 (첫 토큰부터 바로 표시)
+    st.checkbox(
+        "⚡ 스트리밍 응답",
+        value=True,
+        key="streaming_enabled",
+        help="답변을 생성되는 대로 바로 표시합니다"
+    )
 
 def search_conversations(query, conversations):
-    """대화 검색 기능"""
+    """대화 검색 기능 (역색인 기반, 관련도순)"""
     if not query.strip():
         return conversations
     
-    query = query.lower().strip()
-    search_results = []
-    
-    for conv in conversations:
-        # 제목에서 검색
-        title_match = query in conv['title'].lower()
-        
-        # 메시지 내용에서 검색
-        content_match = False
-        if conv['id'] in st.session_state.conversations:
-            full_conv = st.session_state.conversations[conv['id']]
-            for message in full_conv['messages']:
-                if query in message['content'].lower():
-                    content_match = True
-                    break
-        
-        if title_match or content_match:
-            search_results.append(conv)
+    conv_manager = get_conversation_manager()
+    ranked_ids = conv_manager.store.search_conversation_ids(st.session_state.user_id, query.strip())
+    by_id = {conv['id']: conv for conv in conversations}
     
-    return search_results
+    return [by_id[conv_id] for conv_id in ranked_ids if conv_id in by_id]
 
 def filter_conversations(conversations, filter_type="all"):
     """대화 필터링"""
@@ -935,7 +594,7 @@ def render_conversation_item(conv, conv_manager):
             help="즐겨찾기",
             use_container_width=True
         ):
-            st.session_state.conversations[conv['id']]['starred'] = not is_starred
+            conv_manager.toggle_star(conv['id'])
             st.rerun()
     
     with col3:
@@ -987,12 +646,7 @@ def create_main_chat_area():
                 add_message_with_timestamp("user", user_input)
             
             # AI 응답 생성
-            with st.spinner("🤖 응답 생성 중..."):
-                try:
-                    response = st.session_state.agent.process_message(user_input, st.session_state.user_id)
-                    add_message_with_timestamp("assistant", response)
-                except Exception as e:
-                    add_message_with_timestamp("assistant", f"❌ 오류: {str(e)}")
+            generate_assistant_response(user_input)
             
             st.rerun()
     else:
@@ -1000,6 +654,53 @@ def create_main_chat_area():
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# AI 응답 생성 (스트리밍 모드에서는 말풍선을 토큰 단위로 갱신)
+def generate_assistant_response(user_input: str) -> bool:
+    """에이전트 응답을 생성하여 대화에 추가 (성공 여부 반환)"""
+    # 턴 동안 에이전트를 빌려 써서 다른 세션의 풀 정리로 닫히지 않게 함
+    with get_agent_pool().lease(st.session_state.agent_config) as agent:
+        try:
+            return run_agent_turn(agent, user_input)
+        finally:
+            # 풀의 에이전트는 여러 세션이 공유하므로 이번 턴의 기록은 세션 상태에 보관
+            st.session_state.last_trace = agent.last_trace
+            st.session_state.last_context_stats = agent.last_context_stats
+
+def run_agent_turn(agent, user_input: str) -> bool:
+    if not st.session_state.get('streaming_enabled', True):
+        with st.spinner("🤖 응답 생성 중..."):
+            try:
+                response = agent.process_message(user_input, st.session_state.user_id)
+                add_message_with_timestamp("assistant", response)
+                return True
+            except Exception as e:
+                add_message_with_timestamp("assistant", f"❌ 오류: {str(e)}")
+                return False
+    
+    # 방금 추가된 사용자 메시지는 이번 실행에서 아직 그려지지 않았으므로 먼저 표시
+    if st.session_state.messages:
+        st.markdown(render_message_html(st.session_state.messages[-1]), unsafe_allow_html=True)
+    
+    placeholder = st.empty()
+    streaming_msg = {"role": "assistant", "content": "", "timestamp": datetime.now().strftime('%H:%M')}
+    response = ""
+    try:
+        with st.spinner("🔎 관련 정보 검색 중..."):
+            tokens = agent.stream_message(user_input, st.session_state.user_id)
+            first_token = next(tokens, "")
+        response = first_token
+        streaming_msg["content"] = response + "▌"
+        placeholder.markdown(render_message_html(streaming_msg), unsafe_allow_html=True)
+        for token in tokens:
+            response += token
+            streaming_msg["content"] = response + "▌"
+            placeholder.markdown(render_message_html(streaming_msg), unsafe_allow_html=True)
+        add_message_with_timestamp("assistant", response)
+        return True
+    except Exception as e:
+        add_message_with_timestamp("assistant", f"❌ 오류: {str(e)}")
+        return False
+
 # 향상된 채팅 입력
 def create_enhanced_chat_input():
     """제안 프롬프트가 포함된 채팅 입력"""
@@ -1022,17 +723,10 @@ def create_enhanced_chat_input():
                     add_message_with_timestamp("user", prompt)
                     
                     # AI 응답 생성
-                    with st.spinner("🤖 응답 생성 중..."):
-                        try:
-                            response = st.session_state.agent.process_message(prompt, st.session_state.user_id)
-                            add_message_with_timestamp("assistant", response)
-                            
-                            # 제안 프롬프트 사용 후 제거
-                            if 'suggested_prompts' in st.session_state:
-                                del st.session_state.suggested_prompts
-                                
-                        except Exception as e:
-                            add_message_with_timestamp("assistant", f"❌ 오류: {str(e)}")
+                    if generate_assistant_response(prompt):
+                        # 제안 프롬프트 사용 후 제거
+                        if 'suggested_prompts' in st.session_state:
+                            del st.session_state.suggested_prompts
                     
                     st.rerun()
         
@@ -1121,8 +815,8 @@ def create_enhanced_chat_input():
                 add_message_with_timestamp("assistant", help_message)
                 st.rerun()
                 return None, None
-        
-        return user_input, None
+            
+            return user_input, None
     
     with tab2:
         uploaded_file = st.file_uploader(
@@ -1132,23 +826,49 @@ def create_enhanced_chat_input():
         )
         
         if uploaded_file:
-            file_content = ""
-            file_type = uploaded_file.type
-            
-            if file_type.startswith('text/'):
-                file_content = str(uploaded_file.read(), "utf-8")
-            elif file_type.startswith('image/'):
+            file_type = uploaded_file.type or ""
+            is_image = file_type.startswith('image/')
+            if is_image:
                 st.image(uploaded_file, caption="업로드된 이미지", use_container_width=True)
-                file_content = f"[이미지 파일: {uploaded_file.name}]"
-            else:
-                file_content = f"[파일: {uploaded_file.name} ({file_type})]"
             
             process_file = st.button("📄 파일 처리", use_container_width=True)
             if process_file:
-                return f"파일 내용 분석 요청: {uploaded_file.name}\n\n{file_content}", uploaded_file
+                if is_image:
+                    return f"파일 내용 분석 요청: {uploaded_file.name}\n\n[이미지 파일: {uploaded_file.name}]", uploaded_file
+                # 문서는 메모리에 구간으로 저장하고, 답변 시 메모리 검색이 관련 구간만 가져옴
+                if ingest_uploaded_file(uploaded_file):
+                    return f"파일 내용 분석 요청: {uploaded_file.name}", uploaded_file
         
         return None, None
 
+def ingest_uploaded_file(uploaded_file) -> bool:
+    """업로드 문서를 진행률과 함께 메모리에 저장 (성공 여부 반환)"""
+    progress = st.progress(0.0, text=f"📚 {uploaded_file.name} 읽는 중...")
+    
+    def on_progress(report):
+        progress.progress(min(report['fraction'], 1.0),
+                          text=f"📚 {report['name']}: {report['passages']}개 구간 저장 중...")
+    
+    try:
+        with get_agent_pool().lease(st.session_state.agent_config) as agent:
+            report = agent.ingest_document(
+                uploaded_file, uploaded_file.name, st.session_state.user_id,
+                mime=uploaded_file.type, on_progress=on_progress
+            )
+    except UnsupportedDocumentError as e:
+        progress.empty()
+        st.error(f"❌ {str(e)}")
+        return False
+    except Exception as e:
+        progress.empty()
+        st.error(f"❌ 파일 처리 실패: {str(e)}")
+        return False
+    
+    progress.empty()
+    reused = f" (캐시된 임베딩 {report['cached_passages']}개 재사용)" if report['cached_passages'] else ""
+    st.toast(f"✅ {report['name']}: {report['passages']}개 구간을 메모리에 저장했습니다{reused} ({report['elapsed_s']:.1f}초)")
+    return True
+
 # 우측 패널 생성
 def create_right_panel():
     """향상된 우측 패널"""
@@ -1158,11 +878,11 @@ def create_right_panel():
         st.markdown('<div class="panel-section">', unsafe_allow_html=True)
         st.markdown('<div class="panel-header">ℹ️ 현재 대화</div>', unsafe_allow_html=True)
         
-        if st.session_state.current_conversation_id:
-            current_conv = st.session_state.conversations[st.session_state.current_conversation_id]
-            
+        conv_manager = get_conversation_manager()
+        current_conv = conv_manager.get_current_conversation()
+        if current_conv:
             st.markdown(f"**제목:** {current_conv['title']}")
-            st.markdown(f"**메시지:** {len(current_conv['messages'])}개")
+            st.markdown(f"**메시지:** {len(st.session_state.messages)}개")
             st.markdown(f"**모델:** {current_conv.get('model', 'unknown')}")
             st.markdown(f"**생성:** {current_conv['created_at'].strftime('%Y-%m-%d %H:%M')}")
         
@@ -1174,21 +894,75 @@ def create_right_panel():
         st.markdown('<div class="panel-header">🧠 메모리 상태</div>', unsafe_allow_html=True)
         
         if st.session_state.agent:
-            memories = st.session_state.agent.memory_tools.get_all_memories(st.session_state.user_id)
+            memory_tools = st.session_state.agent.memory_tools
+            stats = memory_tools.get_memory_stats(st.session_state.user_id)
             
-            if memories:
-                st.metric("저장된 기억", f"{len(memories)}개")
-                
+            if stats['loaded']:
+                st.metric("저장된 기억", f"{stats['count']}개")
+            else:
+                st.metric("이번 실행에서 저장", f"{stats['added']}개")
+            
+            # 전체 메모리 조회는 명시적으로 요청할 때만
+            if st.button("🔄 전체 메모리 불러오기", key="load_all_memories", use_container_width=True):
+                memory_tools.get_all_memories(st.session_state.user_id)
+                st.rerun()
+            
+            if stats['recent']:
                 # 최근 메모리 표시
                 st.markdown("**최근 기억:**")
-                for i, memory in enumerate(memories[-3:], 1):
+                for memory in stats['recent']:
                     st.markdown(f'''
                     <div class="memory-box">
                         💭 {memory[:100]}...
                     </div>
                     ''', unsafe_allow_html=True)
-            else:
+            elif stats['loaded']:
                 st.info("💭 저장된 기억이 없습니다.")
+            
+            # 백그라운드 메모리 쓰기 대기열
+            write_metrics = memory_tools.get_write_metrics()
+            if write_metrics:
+                st.caption(f"📝 쓰기 대기열: {write_metrics['depth']}개 | "
+                           f"지연 {write_metrics['last_lag']:.1f}초 | "
+                           f"실패 {write_metrics['failed']}개")
+            
+            cache_metrics = memory_tools.get_cache_metrics()
+            search_metrics = cache_metrics['search']
+            caption = f"🧠 검색 캐시 적중 {search_metrics['hits']} ({search_metrics['hit_rate']:.0%})"
+            if cache_metrics['embedding']:
+                caption += f" | 임베딩 캐시 적중 {cache_metrics['embedding']['hits']}"
+            st.caption(caption)
+        
+        st.markdown('</div>', unsafe_allow_html=True)
+    
+    # 마지막 턴의 단계별 지연 시간
+    with st.container():
+        st.markdown('<div class="panel-section">', unsafe_allow_html=True)
+        st.markdown('<div class="panel-header">⏱️ 단계별 지연</div>', unsafe_allow_html=True)
+        
+        last_trace = st.session_state.get('last_trace')
+        if last_trace:
+            for i, stage in enumerate(last_trace.breakdown()):
+                label = f"**{stage['name']}**" if i == 0 else stage['name']
+                error = " ⚠️" if stage['error'] else ""
+                st.markdown(f"{label}: {stage['duration_ms']:.0f}ms{error}")
+
+            context_stats = st.session_state.get('last_context_stats')
+            if context_stats:
+                st.caption(
+                    f"컨텍스트 {context_stats['tokens']}/{context_stats['budget']} 토큰 · "
+                    f"중복 제거 {context_stats['duplicates_removed']} · 예산 초과 제외 {context_stats['dropped_over_budget']}"
+                )
+
+            st.download_button(
+                "📥 트레이스 내보내기 (OTel JSON)",
+                data=json.dumps(default_tracer.export_otel(), ensure_ascii=False),
+                file_name="agent_traces.json",
+                mime="application/json",
+                use_container_width=True
+            )
+        else:
+            st.caption("아직 기록된 응답이 없습니다.")
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -1204,42 +978,89 @@ def create_right_panel():
         col1, col2 = st.columns(2)
         with col1:
             st.metric("사용자", user_msgs)
-            st.metric("전체 대화", len(st.session_state.get('conversation_list', [])))
+            st.metric("전체 대화", conv_manager.count_conversations())
         with col2:
             st.metric("AI", ai_msgs)
-            starred_count = len([conv_id for conv_id in st.session_state.get('conversation_list', [])
-                               if st.session_state.conversations.get(conv_id, {}).get('starred', False)])
-            st.metric("⭐ 즐겨찾기", starred_count)
+            st.metric("⭐ 즐겨찾기", conv_manager.count_conversations(starred=True))
+        
+        # 검색 캐시 적중률
+        cache_stats = get_search_cache().stats()
+        st.caption(f"🔎 검색 캐시: 적중 {cache_stats['hits']} / 실패 {cache_stats['misses']} "
+                   f"({cache_stats['hit_rate']:.0%})")
+        flight_stats = get_search_flight().stats()
+        throttled = sum(limiter.stats()['throttled'] for limiter in get_search_rate_limiters().values())
+        st.caption(f"🔀 검색 요청 합치기: {flight_stats['coalesced']}회 | 속도 제한 대기 {throttled}회")
+        response_stats = get_response_cache().stats()
+        st.caption(f"💬 응답 캐시: 적중 {response_stats['hits']} ({response_stats['hit_rate']:.0%}) | "
+                   f"절약한 LM 호출 {response_stats['saved_lm_calls']}회")
+        document_stats = get_document_cache().stats()
+        st.caption(f"📄 문서 캐시: 적중 {document_stats['hits']} / 실패 {document_stats['misses']} "
+                   f"({document_stats['size']}개 구간)")
+        pool_stats = get_agent_pool().stats()
+        st.caption(f"🤖 에이전트 풀: {', '.join(pool_stats['models']) or '-'} | "
+                   f"재사용 {pool_stats['reused']} / 생성 {pool_stats['created']}")
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-# 메시지 렌더링 함수 (기존과 동일)
-def render_messages():
-    for i, msg in enumerate(st.session_state.messages):
-        timestamp = msg.get('timestamp', datetime.now().strftime('%H:%M'))
-        
-        if msg['role'] == 'user':
-            st.markdown(f'''
-            <div class="message-container">
-                <div class="user-message-container">
-                    <div>
-                        <div class="user-msg">{msg["content"]}</div>
-                        <div class="message-timestamp">{timestamp}</div>
-                    </div>
+# 메시지 렌더링 함수
+# 한 번에 표시하는 최근 메시지 수와 "이전 메시지 더 보기" 단위
+MESSAGE_WINDOW = 30
+
+def build_message_html(role: str, content: str, timestamp: str) -> str:
+    """단일 메시지 말풍선 HTML"""
+    if role == 'user':
+        return f'''
+        <div class="message-container">
+            <div class="user-message-container">
+                <div>
+                    <div class="user-msg">{content}</div>
+                    <div class="message-timestamp">{timestamp}</div>
                 </div>
             </div>
-            ''', unsafe_allow_html=True)
-        else:
-            st.markdown(f'''
-            <div class="message-container">
-                <div class="assistant-message-container">
-                    <div>
-                        <div class="assistant-msg">{msg["content"]}</div>
-                        <div class="message-timestamp">{timestamp}</div>
-                    </div>
+        </div>
+        '''
+    return f'''
+        <div class="message-container">
+            <div class="assistant-message-container">
+                <div>
+                    <div class="assistant-msg">{content}</div>
+                    <div class="message-timestamp">{timestamp}</div>
                 </div>
             </div>
-            ''', unsafe_allow_html=True)
+        </div>
+        '''
+
+@st.cache_resource
+def get_message_html_cache():
+    """변경되지 않은 메시지의 HTML 조각을 프로세스 단위로 재사용"""
+    return functools.lru_cache(maxsize=4096)(build_message_html)
+
+def render_message_html(msg) -> str:
+    timestamp = msg.get('timestamp') or datetime.now().strftime('%H:%M')
+    return get_message_html_cache()(msg['role'], msg['content'], timestamp)
+
+def render_messages():
+    """최근 메시지 창만 렌더링 (재실행 비용이 전체 대화 길이가 아닌 창 크기에 비례)"""
+    # 대화가 바뀌면 창 크기 초기화
+    if st.session_state.get('message_window_conversation') != st.session_state.current_conversation_id:
+        st.session_state.message_window_conversation = st.session_state.current_conversation_id
+        st.session_state.message_window = MESSAGE_WINDOW
+    
+    messages = st.session_state.messages
+    window = st.session_state.get('message_window', MESSAGE_WINDOW)
+    hidden_count = max(len(messages) - window, 0)
+    
+    if hidden_count:
+        if st.button(
+            f"⬆️ 이전 메시지 더 보기 ({hidden_count}개 숨김)",
+            key="load_earlier_messages",
+            use_container_width=True
+        ):
+            st.session_state.message_window = window + MESSAGE_WINDOW
+            st.rerun()
+    
+    for msg in messages[hidden_count:]:
+        st.markdown(render_message_html(msg), unsafe_allow_html=True)
 
 # 세션 상태 초기화
 def init_session_state():
@@ -1252,6 +1073,8 @@ def init_session_state():
         st.session_state.current_model = None
     if 'agent' not in st.session_state:
         st.session_state.agent = None
+    if 'agent_config' not in st.session_state:
+        st.session_state.agent_config = None
     
     # 대화 관리자 초기화
     conv_manager = get_conversation_manager()
@@ -1261,44 +1084,31 @@ def init_session_state():
     conv_manager.ensure_current_conversation()
     
     # messages는 현재 대화의 메시지와 동기화
-    if st.session_state.current_conversation_id:
-        current_conv = st.session_state.conversations.get(st.session_state.current_conversation_id)
-        if current_conv and 'messages' not in st.session_state:
-            st.session_state.messages = current_conv['messages'].copy()
+    if st.session_state.current_conversation_id and 'messages' not in st.session_state:
+        st.session_state.messages = conv_manager.store.get_messages(st.session_state.current_conversation_id)
     
     if 'messages' not in st.session_state:
         st.session_state.messages = []
 
 # 에이전트 설정
 def setup_agent():
-    # 모델이 변경되었거나 에이전트가 없는 경우 재생성
-    if (st.session_state.agent is None or 
-        getattr(st.session_state, 'current_model', None) != st.session_state.selected_model):
-        
-        try:
-            # mem0 설정
-            config = {
-                "llm": {
-                    "provider": "openai",
-                    "config": {
-                        "model": st.session_state.selected_model,
-                        "temperature": 0.1,
-                        "api_key": os.getenv("OPENAI_API_KEY")
-                    }
-                } if os.getenv("OPENAI_API_KEY") else None
-            }
-            
-            memory = Memory.from_config(config) if config["llm"] else Memory()
-            web_search = SimpleWebSearch()
-            agent = SimpleAgent(memory, web_search)
-            
-            st.session_state.agent = agent
-            st.session_state.current_model = st.session_state.selected_model
-            return True
-        except Exception as e:
-            st.error(f"에이전트 설정 실패: {str(e)}")
-            return False
-    return True
+    # 모델/설정별로 풀에서 에이전트를 가져옴 (모델 전환 시 재생성 없이 기존 에이전트 재사용)
+    try:
+        config = EngineConfig(
+            model=st.session_state.selected_model,
+            user_id=st.session_state.user_id,
+            vector_store=os.getenv("VECTOR_STORE", "default"),
+            vector_store_path=os.getenv("VECTOR_STORE_PATH", "vector_store"),
+            # 풀의 에이전트 하나를 모든 세션이 공유하므로 동시 턴 × 검색 소스 수만큼 여유를 둠
+            retrieval_workers=int(os.getenv("RETRIEVAL_WORKERS", "16"))
+        )
+        st.session_state.agent_config = config
+        st.session_state.agent = get_agent_pool().get(config)
+        st.session_state.current_model = st.session_state.selected_model
+        return True
+    except Exception as e:
+        st.error(f"에이전트 설정 실패: {str(e)}")
+        return False
 
 # 메시지 추가 함수 (자동 저장 포함)
 def add_message_with_timestamp(role: str, content: str):
@@ -1310,13 +1120,15 @@ def add_message_with_timestamp(role: str, content: str):
     }
     st.session_state.messages.append(message)
     
-    # 현재 대화에 자동 저장
+    # 현재 대화에 새 메시지만 추가 저장
     conv_manager = get_conversation_manager()
-    conv_manager.save_current_conversation()
+    conv_manager.append_message(message)
 
 # 메인 앱
 def main():
     init_session_state()
+    get_metrics_server()
+    get_compaction_scheduler()
     
     # 페이지 설정
     st.markdown('<div class="main-header">🧠 AI 메모리 어시스턴트</div>', unsafe_allow_html=True)
@@ -0,0 +1,71 @@
+# batch_runner.py
+# 여러 (user_id, 입력) 쌍을 제한된 동시성으로 처리하고 완료 순서대로 결과를 돌려주는 배치 실행기
+#
+# 같은 사용자의 입력은 한 작업 레인에서 들어온 순서대로 처리하므로 메모리 쓰기 순서가 유지되고,
+# 서로 다른 사용자는 스레드 풀에서 병렬로 처리됩니다. (LM/메모리 호출이 I/O 대기 위주라 스레드 풀 사용)
+
+import queue
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+class BatchResult:
+    """배치 항목 하나의 처리 결과"""
+
+    def __init__(self, index: int, user_id: str, user_input: str, output: Any = None,
+                 error: Optional[str] = None, elapsed: float = 0.0):
+        self.index = index
+        self.user_id = user_id
+        self.user_input = user_input
+        self.output = output
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> dict:
+        return {
+            'index': self.index,
+            'user_id': self.user_id,
+            'input': self.user_input,
+            'output': self.output,
+            'error': self.error,
+            'elapsed_s': self.elapsed,
+        }
+
+
+def run_batch(handler: Callable[[str, str], Any], items: Iterable[Tuple[str, str]],
+              max_workers: int = 4) -> Iterator[BatchResult]:
+    """handler(user_id, user_input)를 배치로 실행하고 끝나는 대로 BatchResult를 yield
+
+    items의 순서 번호가 BatchResult.index이며, 한 항목이 실패해도 같은 사용자의 다음 항목은 계속 처리합니다.
+    """
+    lanes = OrderedDict()
+    total = 0
+    for index, (user_id, user_input) in enumerate(items):
+        lanes.setdefault(user_id, []).append((index, user_input))
+        total += 1
+    if not total:
+        return
+
+    results = queue.Queue()
+
+    def run_lane(user_id: str, lane):
+        for index, user_input in lane:
+            start = time.perf_counter()
+            try:
+                output = handler(user_id, user_input)
+                results.put(BatchResult(index, user_id, user_input, output, elapsed=time.perf_counter() - start))
+            except Exception as e:
+                results.put(BatchResult(index, user_id, user_input, error=str(e),
+                                        elapsed=time.perf_counter() - start))
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="batch") as executor:
+        for user_id, lane in lanes.items():
+            executor.submit(run_lane, user_id, lane)
+        for _ in range(total):
+            yield results.get()
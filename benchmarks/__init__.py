@@ -0,0 +1,11 @@
+# benchmarks
+# 외부 API 없이 실행되는 오프라인 성능 측정 도구
+#
+# 사용법:
+#   python -m benchmarks.run agent --turns 1000
+#   python -m benchmarks.run conversations --conversations 10000
+#   python -m benchmarks.run react --turns 200
+#   python -m benchmarks.run batch --turns 400 --workers 1,4,16
+#   python -m benchmarks.run coalesce --turns 20 --users 16
+#   python -m benchmarks.startup app agent_engine --repeat 5
+#   python -m benchmarks.vector_store --sizes 1000,100000,1000000
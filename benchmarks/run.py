@@ -0,0 +1,280 @@
+# benchmarks/run.py
+# 재현 가능한 시나리오를 실행하고 단계별 p50/p95/p99 지연 시간을 출력
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from typing import List, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stubs import LatencyModel, StageRecorder, StubMemory, FakeDDGS, FakeWikipedia
+
+# 검색 키워드가 섞인 재현용 질문 목록
+QUESTIONS = [
+    "파이썬 최신 버전 정보 알려줘",
+    "오늘 점심 메뉴 추천해줘",
+    "서울 날씨 뉴스 검색해줘",
+    "내가 좋아하는 음식이 뭐였지?",
+    "DSPy 사용법 찾아줘",
+    "주말에 등산 가기 좋은 곳은?",
+    "mem0 메모리 구조에 대한 정보",
+    "어제 이야기한 프로젝트 기억나?",
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """선형 보간 백분위수 (정렬된 입력)"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(samples: Dict[str, List[float]]) -> Dict[str, Dict[str, float]]:
+    """단계별 count/mean/p50/p95/p99 (밀리초)"""
+    summary = {}
+    for stage, values in samples.items():
+        ordered = sorted(values)
+        summary[stage] = {
+            'count': len(ordered),
+            'mean_ms': sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+            'p50_ms': percentile(ordered, 50) * 1000,
+            'p95_ms': percentile(ordered, 95) * 1000,
+            'p99_ms': percentile(ordered, 99) * 1000,
+        }
+    return summary
+
+
+def print_report(title: str, summary: Dict[str, Dict[str, float]], elapsed: float):
+    print(f"\n== {title} ({elapsed:.2f}s) ==")
+    print(f"{'stage':<28}{'count':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    for stage, row in sorted(summary.items()):
+        print(f"{stage:<28}{row['count']:>8}{row['mean_ms']:>10.2f}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}")
+
+
+def run_agent(args) -> Dict[str, List[float]]:
+    """SimpleAgent.process_message를 N턴 실행"""
+    from agent_engine import EngineConfig, SimpleAgent, SimpleWebSearch
+    from benchmarks.stub_lm import StubLM, qa_answers
+    from search_cache import SearchCache
+
+    recorder = StageRecorder()
+    memory = StubMemory(
+        add_latency=LatencyModel.parse(args.memory_add_latency, seed=args.seed + 1),
+        search_latency=LatencyModel.parse(args.memory_search_latency, seed=args.seed + 2),
+        recorder=recorder
+    )
+    web_search = SimpleWebSearch(
+        cache=SearchCache() if args.search_cache else None,
+        wiki=FakeWikipedia(LatencyModel.parse(args.wiki_latency, seed=args.seed + 3), recorder, seed=args.seed),
+        ddgs_factory=FakeDDGS(LatencyModel.parse(args.web_latency, seed=args.seed + 4), recorder)
+    )
+    lm = StubLM(qa_answers(), LatencyModel.parse(args.lm_latency, seed=args.seed + 5), recorder)
+    config = EngineConfig(api_key="", retrieval_timeout=args.retrieval_timeout,
+                          async_memory_writes=not args.sync_writes)
+    agent = SimpleAgent(memory, web_search, config=config, lm=lm)
+
+    questions = random.Random(args.seed)
+    try:
+        for _ in range(args.turns):
+            question = questions.choice(QUESTIONS)
+            with recorder.timed("turn"):
+                agent.process_message(question, user_id="bench_user")
+    finally:
+        agent.close()
+    return recorder.samples
+
+
+def run_conversations(args) -> Dict[str, List[float]]:
+    """SQLiteConversationStore에 N개 대화를 만들고 목록/검색/로드 지연 측정
+
+    ConversationManager는 st.session_state에 묶여 있으므로 그 아래 저장소를 직접 측정합니다.
+    """
+    from conversation_store import SQLiteConversationStore
+
+    recorder = StageRecorder()
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store = SQLiteConversationStore(os.path.join(tmpdir, "bench.db"))
+        conversation_ids = []
+        for i in range(args.conversations):
+            conversation_id = str(uuid.uuid4())
+            now = datetime.now()
+            with recorder.timed("create_conversation"):
+                store.create_conversation({
+                    'id': conversation_id, 'user_id': 'bench_user', 'title': f"대화 {i}",
+                    'model': 'gpt-4o-mini', 'created_at': now, 'updated_at': now,
+                })
+            for _ in range(args.messages):
+                message = {'role': 'user', 'content': rng.choice(QUESTIONS), 'timestamp': now.strftime('%H:%M')}
+                with recorder.timed("append_message"):
+                    store.append_message(conversation_id, message)
+            conversation_ids.append(conversation_id)
+
+        for _ in range(args.queries):
+            with recorder.timed("list_conversations"):
+                store.list_conversations('bench_user')
+            with recorder.timed("search_conversations"):
+                store.search_conversation_ids('bench_user', rng.choice(["파이썬", "날씨", "메모리", "등산"]))
+            with recorder.timed("get_messages"):
+                store.get_messages(rng.choice(conversation_ids))
+        store.close()
+    return recorder.samples
+
+
+def run_react(args) -> Dict[str, List[float]]:
+    """MemoryReActAgent.forward를 N턴 실행 (--react-script parallel이면 조회를 run_tools_parallel로 묶음)"""
+    import dspy
+    from benchmarks.stub_lm import StubLM, react_answers, react_parallel_answers
+    from official_dspy_mem0_pattern import MemoryReActAgent
+
+    recorder = StageRecorder()
+    memory = StubMemory(
+        add_latency=LatencyModel.parse(args.memory_add_latency, seed=args.seed + 1),
+        search_latency=LatencyModel.parse(args.memory_search_latency, seed=args.seed + 2),
+        recorder=recorder
+    )
+    answers = react_parallel_answers() if args.react_script == "parallel" else react_answers()
+    lm = StubLM(answers, LatencyModel.parse(args.lm_latency, seed=args.seed + 5), recorder)
+    dspy.configure(lm=lm)
+    agent = MemoryReActAgent(memory)
+
+    questions = random.Random(args.seed)
+    tool_calls = cache_hits = 0
+    for _ in range(args.turns):
+        with recorder.timed("forward"):
+            prediction = agent(user_input=questions.choice(QUESTIONS))
+        tool_calls += prediction.turn_stats['tool_calls']
+        cache_hits += prediction.turn_stats['cache_hits']
+    agent.close()
+    print(f"턴당 LM 호출 {len(recorder.samples['lm']) / args.turns:.2f}회 | "
+          f"도구 실행 {tool_calls / args.turns:.2f}회 | 메모이제이션 적중 {cache_hits / args.turns:.2f}회")
+    return recorder.samples
+
+
+def run_batch_throughput(args) -> Dict[str, List[float]]:
+    """SimpleAgent.process_batch를 --workers 값마다 실행해 처리량(턴/초) 비교"""
+    from agent_engine import EngineConfig, SimpleAgent, SimpleWebSearch
+    from benchmarks.stub_lm import StubLM, qa_answers
+
+    recorder = StageRecorder()
+    questions = random.Random(args.seed)
+    items = [(f"bench_user_{i % args.users}", questions.choice(QUESTIONS)) for i in range(args.turns)]
+    for workers in [int(value) for value in args.workers.split(",")]:
+        memory = StubMemory(
+            add_latency=LatencyModel.parse(args.memory_add_latency, seed=args.seed + 1),
+            search_latency=LatencyModel.parse(args.memory_search_latency, seed=args.seed + 2),
+            recorder=recorder
+        )
+        web_search = SimpleWebSearch(
+            wiki=FakeWikipedia(LatencyModel.parse(args.wiki_latency, seed=args.seed + 3), recorder, seed=args.seed),
+            ddgs_factory=FakeDDGS(LatencyModel.parse(args.web_latency, seed=args.seed + 4), recorder)
+        )
+        lm = StubLM(qa_answers(), LatencyModel.parse(args.lm_latency, seed=args.seed + 5), recorder)
+        config = EngineConfig(api_key="", retrieval_timeout=args.retrieval_timeout,
+                              async_memory_writes=not args.sync_writes)
+        agent = SimpleAgent(memory, web_search, config=config, lm=lm)
+        try:
+            start = time.perf_counter()
+            errors = sum(1 for result in agent.process_batch(items, max_workers=workers) if not result.ok)
+            elapsed = time.perf_counter() - start
+        finally:
+            agent.close()
+        print(f"workers={workers:<3} {len(items) / elapsed:8.1f} 턴/초 | 오류 {errors}건")
+    return recorder.samples
+
+
+def run_coalesce(args) -> Dict[str, List[float]]:
+    """--users개 스레드가 같은 검색어를 동시에 검색할 때 실제 백엔드 호출 수 측정"""
+    import threading
+    from agent_engine import SimpleWebSearch
+    from request_coalescing import build_rate_limiters
+
+    recorder = StageRecorder()
+    web_search = SimpleWebSearch(
+        wiki=FakeWikipedia(LatencyModel.parse(args.wiki_latency, seed=args.seed + 3), recorder, seed=args.seed),
+        ddgs_factory=FakeDDGS(LatencyModel.parse(args.web_latency, seed=args.seed + 4), recorder),
+        rate_limiters=build_rate_limiters({'web': (args.web_rate, 3)})
+    )
+    questions = random.Random(args.seed)
+    for _ in range(args.turns):
+        query = questions.choice(QUESTIONS)
+        barrier = threading.Barrier(args.users)
+
+        def search():
+            barrier.wait()
+            with recorder.timed("search_web.caller"):
+                web_search.search_web(query)
+
+        threads = [threading.Thread(target=search) for _ in range(args.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    metrics = web_search.get_metrics()
+    print(f"검색 {args.turns * args.users}회 → 백엔드 호출 {len(recorder.samples['search_web'])}회 | "
+          f"합쳐진 요청 {metrics['flight']['coalesced']}회 | "
+          f"속도 제한 대기 {metrics['rate_limits']['web']['throttled']}회")
+    return recorder.samples
+
+
+SCENARIOS = {
+    'agent': run_agent,
+    'batch': run_batch_throughput,
+    'coalesce': run_coalesce,
+    'conversations': run_conversations,
+    'react': run_react,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 에이전트 벤치마크")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--conversations", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=4, help="대화당 메시지 수")
+    parser.add_argument("--queries", type=int, default=200, help="목록/검색/로드 측정 횟수")
+    parser.add_argument("--seed", type=int, default=42)
+    # 지연 분포: "kind:median_ms[:spread]" (constant / uniform / lognormal)
+    parser.add_argument("--lm-latency", default="lognormal:5:0.4")
+    parser.add_argument("--wiki-latency", default="lognormal:3:0.5")
+    parser.add_argument("--web-latency", default="lognormal:4:0.5")
+    parser.add_argument("--memory-add-latency", default="lognormal:2:0.5")
+    parser.add_argument("--memory-search-latency", default="lognormal:1:0.5")
+    parser.add_argument("--retrieval-timeout", type=float, default=8.0)
+    parser.add_argument("--search-cache", action="store_true", help="SearchCache 사용")
+    parser.add_argument("--sync-writes", action="store_true", help="메모리 쓰기를 동기로 실행")
+    parser.add_argument("--react-script", choices=["serial", "parallel"], default="serial",
+                        help="react 시나리오의 LM 응답 스크립트")
+    parser.add_argument("--workers", default="1,2,4,8", help="batch 시나리오의 동시 실행 수 (쉼표 구분)")
+    parser.add_argument("--users", type=int, default=16, help="batch/coalesce 시나리오의 사용자(동시 요청) 수")
+    parser.add_argument("--web-rate", type=float, default=1.0, help="coalesce 시나리오의 웹 검색 초당 요청 한도")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    samples = SCENARIOS[args.scenario](args)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(samples)
+    print_report(args.scenario, summary, elapsed)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'scenario': args.scenario, 'elapsed_s': elapsed, 'args': vars(args),
+                       'stages': summary}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# benchmarks/startup.py
+# 콜드 스타트 측정: 새 프로세스에서 모듈을 import하는 시간과 모듈별 import 비용(-X importtime)
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import List, Dict, Any
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_TARGETS = ["app", "agent_engine", "conversation_store", "tracing"]
+
+# 첫 사용 전까지 로드되지 않아야 하는 무거운 의존성
+HEAVY_MODULES = ["dspy", "mem0", "duckduckgo_search", "wikipediaapi", "tiktoken", "litellm"]
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """-X importtime 출력 → [{module, self_us, cumulative_us, depth}] (인터프리터 시작 시 import 제외)"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': (len(match.group(3)) - 1) // 2,
+            })
+            if rows[-1]['module'] == 'site' and rows[-1]['depth'] == 0:
+                rows = []
+    return rows
+
+
+def measure(target: str) -> Dict[str, Any]:
+    """새 인터프리터에서 target을 import하고 벽시계 시간, 모듈별 비용, 로드된 무거운 의존성 반환"""
+    # sys, time은 내장 모듈이라 측정 결과에 섞이지 않음
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {target}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(repr({{'elapsed': elapsed, 'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    result = {'target': target, 'process_s': wall, 'modules': parse_importtime(proc.stderr)}
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        result['error'] = errors[-1] if errors else f"exit code {proc.returncode}"
+        return result
+
+    output = ast.literal_eval(proc.stdout.strip().splitlines()[-1])
+    result['import_s'] = output['elapsed']
+    result['heavy_loaded'] = output['heavy']
+    return result
+
+
+def top_packages(modules: List[Dict[str, Any]], limit: int) -> List[tuple]:
+    """최상위 패키지별 import 시간 (하위 모듈 자체 시간의 합, 많이 걸린 순)"""
+    totals = defaultdict(int)
+    for row in modules:
+        totals[row['module'].split('.')[0]] += row['self_us']
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 (콜드 스타트) 측정")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    parser.add_argument("--repeat", type=int, default=5, help="대상별 반복 횟수 (중앙값 보고)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 상위 모듈 수")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    report = []
+    for target in args.targets:
+        runs = [measure(target) for _ in range(args.repeat)]
+        failed = next((run for run in runs if 'error' in run), None)
+        if failed:
+            print(f"\n== {target}: import 실패 ({failed['error']})")
+            report.append({'target': target, 'error': failed['error']})
+            continue
+
+        runs.sort(key=lambda run: run['import_s'])
+        median = runs[len(runs) // 2]
+        packages = top_packages(median['modules'], args.top)
+        print(f"\n== {target}: import {median['import_s'] * 1000:.1f}ms "
+              f"(프로세스 {median['process_s'] * 1000:.1f}ms, {args.repeat}회 중앙값)")
+        print(f"   로드된 무거운 의존성: {', '.join(median['heavy_loaded']) or '없음'}")
+        print(f"   {'package':<32}{'self':>12}  (ms)")
+        for name, self_us in packages:
+            print(f"   {name:<32}{self_us / 1000:>12.1f}")
+
+        report.append({
+            'target': target,
+            'import_ms': median['import_s'] * 1000,
+            'process_ms': median['process_s'] * 1000,
+            'heavy_loaded': median['heavy_loaded'],
+            'top_modules_ms': {name: us / 1000 for name, us in packages},
+        })
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/stub_lm.py
+# 지연 시간을 흉내내는 DSPy LM 대체 구현
+
+import itertools
+import time
+from typing import List, Dict, Any
+
+try:
+    from dspy.utils.dummies import DummyLM
+except ImportError:
+    from dspy.utils import DummyLM
+
+from benchmarks.stubs import LatencyModel, StageRecorder
+
+
+class StubLM(DummyLM):
+    """지연 시간을 흉내내는 DSPy DummyLM (응답 목록을 무한 반복)"""
+
+    def __init__(self, answers: List[Dict[str, Any]], latency: LatencyModel = None,
+                 recorder: StageRecorder = None, stage: str = "lm"):
+        # DummyLM은 목록을 한 번만 소비하므로 순환 이터레이터를 넘김
+        super().__init__(answers)
+        self.answers = itertools.cycle(answers)
+        self.latency = latency or LatencyModel(median_ms=0)
+        self.recorder = recorder
+        self.stage = stage
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        self.latency.wait()
+        try:
+            return super().__call__(*args, **kwargs)
+        finally:
+            if self.recorder:
+                self.recorder.record(self.stage, time.perf_counter() - start)
+
+
+def qa_answers() -> List[Dict[str, Any]]:
+    """SimpleAgent의 ChainOfThought("context, question -> reasoning, answer")용 응답"""
+    return [
+        {"reasoning": "컨텍스트를 검토했습니다.", "answer": "벤치마크용 고정 답변입니다."},
+        {"reasoning": "관련 기억을 활용했습니다.", "answer": "기억을 바탕으로 한 고정 답변입니다."},
+    ]
+
+
+def react_answers() -> List[Dict[str, Any]]:
+    """MemoryReActAgent(dspy.ReAct)용 응답: 메모리 검색 → 선호도 조회 → 같은 검색 반복 → 종료 → 최종 답변"""
+    return [
+        {"next_thought": "관련 기억을 찾아봅니다.", "next_tool_name": "search_memories",
+         "next_tool_args": {"query": "사용자 선호도"}},
+        {"next_thought": "음식 선호도도 확인합니다.", "next_tool_name": "get_preferences",
+         "next_tool_args": {"category": "음식"}},
+        {"next_thought": "처음 검색 결과를 다시 확인합니다.", "next_tool_name": "search_memories",
+         "next_tool_args": {"query": "사용자 선호도"}},
+        {"next_thought": "충분한 정보를 얻었습니다.", "next_tool_name": "finish", "next_tool_args": {}},
+        {"reasoning": "검색한 기억을 바탕으로 답합니다.", "response": "벤치마크용 고정 응답입니다."},
+    ]
+
+
+def react_parallel_answers() -> List[Dict[str, Any]]:
+    """react_answers와 같은 조회를 run_tools_parallel 한 번으로 묶은 응답"""
+    return [
+        {"next_thought": "필요한 기억을 한 번에 조회합니다.", "next_tool_name": "run_tools_parallel",
+         "next_tool_args": {"calls": [
+             {"tool": "search_memories", "args": {"query": "사용자 선호도"}},
+             {"tool": "get_preferences", "args": {"category": "음식"}},
+         ]}},
+        {"next_thought": "충분한 정보를 얻었습니다.", "next_tool_name": "finish", "next_tool_args": {}},
+        {"reasoning": "검색한 기억을 바탕으로 답합니다.", "response": "벤치마크용 고정 응답입니다."},
+    ]
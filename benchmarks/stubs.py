@@ -0,0 +1,212 @@
+# benchmarks/stubs.py
+# 네트워크 없이 재현 가능한 대체 구현 (mem0 Memory, DDGS, wikipediaapi)
+
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+
+class LatencyModel:
+    """설정 가능한 지연 분포 (시드 고정으로 재현 가능)
+
+    kind: "constant" | "uniform" | "lognormal"
+    """
+
+    def __init__(self, kind: str = "lognormal", median_ms: float = 0.0, spread: float = 0.5,
+                 seed: int = 0):
+        self.kind = kind
+        self.median_ms = median_ms
+        self.spread = spread
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, spec: str, seed: int = 0) -> "LatencyModel":
+        """"lognormal:120:0.4", "constant:50", "uniform:20:80" 형식의 설정 파싱"""
+        parts = spec.split(":")
+        kind = parts[0]
+        median_ms = float(parts[1]) if len(parts) > 1 else 0.0
+        spread = float(parts[2]) if len(parts) > 2 else 0.5
+        return cls(kind, median_ms, spread, seed)
+
+    def sample(self) -> float:
+        """지연 시간(초) 샘플"""
+        if self.median_ms <= 0:
+            return 0.0
+        with self._lock:
+            if self.kind == "constant":
+                ms = self.median_ms
+            elif self.kind == "uniform":
+                # spread를 상한(ms)으로 사용
+                ms = self._random.uniform(self.median_ms, max(self.spread, self.median_ms))
+            else:
+                ms = self._random.lognormvariate(0.0, self.spread) * self.median_ms
+        return ms / 1000.0
+
+    def wait(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+
+class StageRecorder:
+    """단계별 소요 시간 기록"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def timed(self, stage: str):
+        return _Timed(self, stage)
+
+
+class _Timed:
+    def __init__(self, recorder: StageRecorder, stage: str):
+        self.recorder = recorder
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.record(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class StubMemory:
+    """mem0 Memory의 add/search/get_all/delete를 흉내내는 인메모리 구현
+
+    검색은 단어 겹침 점수 기준이며, LLM 추출 없이 입력 문장을 그대로 저장합니다.
+    """
+
+    def __init__(self, add_latency: LatencyModel = None, search_latency: LatencyModel = None,
+                 recorder: StageRecorder = None):
+        self.add_latency = add_latency or LatencyModel(median_ms=0)
+        self.search_latency = search_latency or LatencyModel(median_ms=0)
+        self.recorder = recorder
+        self._memories = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tokens(text: str) -> set:
+        return set(re.findall(r'[가-힣]+|[a-zA-Z]+|[0-9]+', text.lower()))
+
+    def _record(self, stage: str, start: float):
+        if self.recorder:
+            self.recorder.record(stage, time.perf_counter() - start)
+
+    def add(self, messages, user_id: str = "default", metadata: Optional[Dict] = None, **kwargs):
+        start = time.perf_counter()
+        self.add_latency.wait()
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+
+        results = []
+        with self._lock:
+            for message in messages:
+                item = {
+                    'id': str(uuid.uuid4()),
+                    'memory': message['content'],
+                    'user_id': user_id,
+                    'metadata': metadata or {},
+                    'created_at': datetime.now().isoformat(),
+                }
+                self._memories[user_id].append(item)
+                results.append({'id': item['id'], 'memory': item['memory'], 'event': 'ADD'})
+        self._record("memory.add", start)
+        return {'results': results}
+
+    def search(self, query: str, user_id: str = "default", limit: int = 5, **kwargs):
+        start = time.perf_counter()
+        self.search_latency.wait()
+        query_tokens = self._tokens(query)
+        with self._lock:
+            scored = []
+            for item in self._memories[user_id]:
+                overlap = len(query_tokens & self._tokens(item['memory']))
+                if overlap:
+                    scored.append((overlap, item))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        results = [dict(item, score=float(score)) for score, item in scored[:limit]]
+        self._record("memory.search", start)
+        return {'results': results}
+
+    def get_all(self, user_id: str = "default", **kwargs):
+        with self._lock:
+            return {'results': [dict(item) for item in self._memories[user_id]]}
+
+    def delete(self, memory_id: str):
+        with self._lock:
+            for user_id, items in self._memories.items():
+                self._memories[user_id] = [item for item in items if item['id'] != memory_id]
+
+
+class FakeDDGS:
+    """duckduckgo_search.DDGS 대체 (컨텍스트 매니저 + text)"""
+
+    def __init__(self, latency: LatencyModel = None, recorder: StageRecorder = None):
+        self.latency = latency or LatencyModel(median_ms=0)
+        self.recorder = recorder
+
+    def __call__(self):
+        # SimpleWebSearch는 ddgs_factory()로 세션을 열므로 자신을 반환
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query: str, max_results: int = 3):
+        start = time.perf_counter()
+        self.latency.wait()
+        results = [
+            {"title": f"{query} 결과 {i}", "body": f"{query}에 대한 가짜 검색 결과 본문 {i}. " * 5,
+             "href": f"https://example.com/{i}"}
+            for i in range(1, max_results + 1)
+        ]
+        if self.recorder:
+            self.recorder.record("search_web", time.perf_counter() - start)
+        return results
+
+
+class _FakePage:
+    def __init__(self, title: str, exists: bool):
+        self.title = title
+        self._exists = exists
+        self.summary = f"{title}은(는) 벤치마크용 가짜 문서입니다. 두 번째 문장입니다. 세 번째 문장입니다. 네 번째 문장입니다."
+
+    def exists(self) -> bool:
+        return self._exists
+
+
+class FakeWikipedia:
+    """wikipediaapi.Wikipedia 대체 (page().exists(), summary)"""
+
+    def __init__(self, latency: LatencyModel = None, recorder: StageRecorder = None,
+                 hit_ratio: float = 0.7, seed: int = 0):
+        self.latency = latency or LatencyModel(median_ms=0)
+        self.recorder = recorder
+        self.hit_ratio = hit_ratio
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def page(self, title: str) -> _FakePage:
+        start = time.perf_counter()
+        self.latency.wait()
+        with self._lock:
+            exists = self._random.random() < self.hit_ratio
+        if self.recorder:
+            self.recorder.record("search_wikipedia", time.perf_counter() - start)
+        return _FakePage(title, exists)
@@ -0,0 +1,95 @@
+# benchmarks/vector_store.py
+# NumpyVectorStore와 mem0 기본 벡터 저장소(Qdrant 로컬)의 검색 지연 비교
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmarks.run import summarize, print_report
+from benchmarks.stubs import StageRecorder
+
+USER_ID = "bench_user"
+
+
+def make_numpy_store(path: str, dims: int):
+    from numpy_vector_store import NumpyVectorStore
+    return NumpyVectorStore(path=path, embedding_model_dims=dims)
+
+
+def make_qdrant_store(path: str, dims: int):
+    """mem0가 기본으로 쓰는 로컬(on-disk) Qdrant 저장소"""
+    from mem0.vector_stores.qdrant import Qdrant
+    return Qdrant(collection_name="bench", embedding_model_dims=dims, path=path, on_disk=True)
+
+
+BACKENDS = {
+    'numpy': make_numpy_store,
+    'qdrant': make_qdrant_store,
+}
+
+
+def run_backend(name: str, size: int, args, rng: np.random.Generator, recorder: StageRecorder):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            store = BACKENDS[name](tmpdir, args.dims)
+        except ImportError as e:
+            print(f"   {name}: 건너뜀 ({e})")
+            return
+
+        for start in range(0, size, args.batch):
+            count = min(args.batch, size - start)
+            vectors = rng.standard_normal((count, args.dims), dtype=np.float32)
+            payloads = [{'user_id': USER_ID, 'data': f"memory {start + i}"} for i in range(count)]
+            ids = [str(uuid.uuid4()) for _ in range(count)]
+            with recorder.timed(f"{name}.insert_batch"):
+                store.insert(vectors=vectors.tolist() if name != 'numpy' else vectors,
+                             payloads=payloads, ids=ids)
+
+        queries = rng.standard_normal((args.queries, args.dims), dtype=np.float32)
+        for query in queries:
+            vector = query.tolist() if name != 'numpy' else query
+            with recorder.timed(f"{name}.search"):
+                store.search(query="", vectors=vector, limit=args.limit, filters={'user_id': USER_ID})
+
+        if hasattr(store, 'close'):
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 저장소 검색 지연 비교")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="저장할 메모리 수 (쉼표 구분, 최대 1000000 권장)")
+    parser.add_argument("--dims", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=10000, help="insert 배치 크기")
+    parser.add_argument("--backends", default="numpy,qdrant")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    results = {}
+    for size in [int(value) for value in args.sizes.split(",")]:
+        recorder = StageRecorder()
+        start = time.perf_counter()
+        for name in args.backends.split(","):
+            run_backend(name, size, args, np.random.default_rng(args.seed), recorder)
+        summary = summarize(recorder.samples)
+        print_report(f"{size} memories x {args.dims} dims", summary, time.perf_counter() - start)
+        results[size] = summary
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'args': vars(args), 'sizes': results}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# context_budget.py
+# LM에 보내는 컨텍스트를 토큰 예산 안으로 구성 (관련도 순위 + 중복 제거)
+
+import functools
+import importlib.util
+import math
+import re
+from typing import List, Dict, Any, Tuple
+
+from tokenizer import tokenize
+
+# tiktoken은 첫 토큰 계산 때 import (설치 여부만 미리 확인)
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+HANGUL_RE = re.compile(r'[가-힣]')
+LIST_ITEM_RE = re.compile(r'^\d+\.\s')
+SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?。])\s+')
+
+# 이 비율 이상 단어가 겹치는 조각은 중복으로 간주
+DUPLICATE_OVERLAP = 0.8
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding_for(model: str):
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """토큰 수 (tiktoken이 있으면 정확히, 없으면 한글 1자=1토큰, 그 외 4자=1토큰으로 추정)"""
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding_for(model).encode(text))
+
+    hangul = len(HANGUL_RE.findall(text))
+    others = len(re.sub(r'\s+', '', text)) - hangul
+    return hangul + math.ceil(others / 4)
+
+
+def split_snippets(text: str, max_chars: int = 400) -> List[str]:
+    """소스 텍스트를 조각으로 분리
+
+    머리줄("...:")은 버리고, 번호 목록은 항목별로, 나머지는 문단별로 나눈 뒤
+    max_chars보다 긴 조각은 문장 단위로 다시 자릅니다.
+    """
+    items = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        current = []
+        for line in paragraph.split('\n'):
+            line = line.strip()
+            if not line or (line.endswith(':') and not current):
+                continue
+            if LIST_ITEM_RE.match(line) and current:
+                items.append(" ".join(current))
+                current = []
+            current.append(line)
+        if current:
+            items.append(" ".join(current))
+
+    snippets = []
+    for item in items:
+        if len(item) <= max_chars:
+            snippets.append(item)
+        else:
+            snippets.extend(part.strip() for part in SENTENCE_SPLIT_RE.split(item) if part.strip())
+    return snippets
+
+
+class ContextBudgeter:
+    """여러 검색 소스의 조각을 질문 관련도순으로 골라 토큰 예산 안에 맞춤"""
+
+    def __init__(self, model: str = "gpt-4o-mini", budget: int = 3000):
+        self.model = model
+        self.budget = budget
+
+    def score(self, question_terms: set, snippet_terms: List[str], position: int) -> float:
+        """질문 단어와 겹치는 비율 + 소스 내 앞쪽 조각 가산점"""
+        if not snippet_terms:
+            overlap = 0.0
+        else:
+            matched = sum(1 for term in snippet_terms if any(term.startswith(q) or q.startswith(term)
+                                                             for q in question_terms))
+            overlap = matched / math.sqrt(len(snippet_terms))
+        return overlap + 1.0 / (position + 2)
+
+    def assemble(self, question: str, sources: List[Tuple[str, str]]) -> Tuple[str, Dict[str, Any]]:
+        """(라벨, 텍스트) 소스 목록으로 예산 내 컨텍스트 구성 → (컨텍스트, 통계)"""
+        question_terms = set(tokenize(question))
+        candidates = []
+        for source_index, (label, text) in enumerate(sources):
+            for position, snippet in enumerate(split_snippets(text)):
+                terms = tokenize(snippet)
+                candidates.append({
+                    'source': source_index,
+                    'position': position,
+                    'text': snippet,
+                    'terms': set(terms),
+                    'score': self.score(question_terms, terms, position),
+                    'tokens': count_tokens(snippet, self.model),
+                })
+
+        # 관련도 높은 조각부터 중복을 건너뛰며 예산을 채움
+        selected = []
+        used_tokens = 0
+        duplicates = 0
+        over_budget = 0
+        for candidate in sorted(candidates, key=lambda c: c['score'], reverse=True):
+            if any(self._is_duplicate(candidate, kept) for kept in selected):
+                duplicates += 1
+                continue
+            if used_tokens + candidate['tokens'] > self.budget:
+                over_budget += 1
+                continue
+            selected.append(candidate)
+            used_tokens += candidate['tokens']
+
+        # 출력은 원래 소스와 조각 순서를 유지
+        selected.sort(key=lambda c: (c['source'], c['position']))
+        context = ""
+        for source_index, (label, _) in enumerate(sources):
+            parts = [c['text'] for c in selected if c['source'] == source_index]
+            if parts:
+                context += f"{label}:\n" + "\n".join(parts) + "\n\n"
+
+        stats = {
+            'budget': self.budget,
+            'tokens': used_tokens,
+            'snippets': len(selected),
+            'candidates': len(candidates),
+            'duplicates_removed': duplicates,
+            'dropped_over_budget': over_budget,
+        }
+        return context, stats
+
+    @staticmethod
+    def _is_duplicate(candidate: Dict[str, Any], kept: Dict[str, Any]) -> bool:
+        if candidate['text'] == kept['text']:
+            return True
+        smaller = min(len(candidate['terms']), len(kept['terms']))
+        if smaller < 3:
+            return False
+        return len(candidate['terms'] & kept['terms']) / smaller >= DUPLICATE_OVERLAP
+
@@ -0,0 +1,302 @@
+# conversation_store.py
+# 대화 세션 영구 저장소 (기본: SQLite)
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from tokenizer import index_terms
+
+# 색인 규칙(tokenizer.index_terms)이 바뀌면 올림 (PRAGMA user_version이 더 낮은 DB는 다시 색인)
+TERM_INDEX_VERSION = 1
+
+# 제목에서 찾은 단어는 본문보다 높은 점수
+TITLE_WEIGHT = 3
+
+
+class ConversationStore(ABC):
+    """대화 저장소 인터페이스
+
+    대화 메타데이터와 메시지를 분리해서 다루므로, 호출 측은 열려 있는 대화의
+    메시지만 메모리에 들고 있으면 됩니다.
+    """
+
+    @abstractmethod
+    def create_conversation(self, conversation: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """대화 메타데이터 (메시지 제외)"""
+        ...
+
+    @abstractmethod
+    def update_conversation(self, conversation_id: str, **fields):
+        ...
+
+    @abstractmethod
+    def delete_conversation(self, conversation_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def list_conversations(self, user_id: str, starred: Optional[bool] = None,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """사용자의 대화 목록 (최근 업데이트순)"""
+        ...
+
+    @abstractmethod
+    def count_conversations(self, user_id: str, starred: Optional[bool] = None) -> int:
+        ...
+
+    @abstractmethod
+    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def append_message(self, conversation_id: str, message: Dict[str, Any]):
+        """대화 끝에 메시지 하나 추가"""
+        ...
+
+    @abstractmethod
+    def search_conversation_ids(self, user_id: str, query: str) -> List[str]:
+        """제목이나 메시지 내용이 검색어와 맞는 대화 ID (관련도순)"""
+        ...
+
+
+class SQLiteConversationStore(ConversationStore):
+    """conversations / messages 테이블 기반의 SQLite 저장소
+
+    conversation_terms 테이블은 (단어, 대화) 단위의 역색인으로, 메시지가
+    추가될 때마다 해당 메시지의 단어만 증분 갱신됩니다.
+    """
+
+    CONVERSATION_FIELDS = ('title', 'model', 'starred', 'user_id', 'updated_at')
+
+    def __init__(self, db_path: str = "conversations.db"):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._init_schema()
+
+    def _init_schema(self):
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    model TEXT,
+                    starred INTEGER NOT NULL DEFAULT 0,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+                    ON conversations(user_id, updated_at DESC);
+                CREATE INDEX IF NOT EXISTS idx_conversations_updated
+                    ON conversations(updated_at DESC);
+                CREATE INDEX IF NOT EXISTS idx_conversations_starred
+                    ON conversations(user_id, starred);
+
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_messages_conversation
+                    ON messages(conversation_id, id);
+            """)
+            needs_backfill = self._conn.execute("PRAGMA user_version").fetchone()[0] < TERM_INDEX_VERSION
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS conversation_terms (
+                    term TEXT NOT NULL,
+                    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+                    field TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, conversation_id, field)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_conversation_terms_conversation
+                    ON conversation_terms(conversation_id);
+            """)
+            if needs_backfill:
+                self._backfill_terms()
+                self._conn.execute(f"PRAGMA user_version = {TERM_INDEX_VERSION}")
+            self._conn.commit()
+
+    def _backfill_terms(self):
+        """색인이 없거나 이전 규칙으로 만든 DB의 대화를 한 번 다시 색인 (lock 보유 상태에서 호출)"""
+        self._conn.execute("DELETE FROM conversation_terms")
+        for row in self._conn.execute("SELECT id, title FROM conversations").fetchall():
+            self._index_terms(row['id'], 'title', row['title'])
+        for row in self._conn.execute("SELECT conversation_id, content FROM messages").fetchall():
+            self._index_terms(row['conversation_id'], 'content', row['content'])
+
+    def _index_terms(self, conversation_id: str, field: str, text: str):
+        """텍스트의 단어 빈도를 역색인에 누적 (lock 보유 상태에서 호출)"""
+        counts = Counter(index_terms(text))
+        if not counts:
+            return
+        self._conn.executemany(
+            "INSERT INTO conversation_terms (term, conversation_id, field, tf) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (term, conversation_id, field) DO UPDATE SET tf = tf + excluded.tf",
+            [(term, conversation_id, field, tf) for term, tf in counts.items()]
+        )
+
+    def _reindex_field(self, conversation_id: str, field: str, texts: List[str]):
+        """대화의 특정 필드 색인을 다시 구성 (lock 보유 상태에서 호출)"""
+        self._conn.execute(
+            "DELETE FROM conversation_terms WHERE conversation_id = ? AND field = ?",
+            (conversation_id, field)
+        )
+        for text in texts:
+            self._index_terms(conversation_id, field, text)
+
+    @staticmethod
+    def _to_conversation(row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'title': row['title'],
+            'model': row['model'],
+            'starred': bool(row['starred']),
+            'message_count': row['message_count'],
+            'created_at': datetime.fromisoformat(row['created_at']),
+            'updated_at': datetime.fromisoformat(row['updated_at']),
+        }
+
+    def create_conversation(self, conversation: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO conversations (id, user_id, title, model, starred, message_count, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (
+                    conversation['id'],
+                    conversation['user_id'],
+                    conversation['title'],
+                    conversation.get('model'),
+                    int(conversation.get('starred', False)),
+                    conversation['created_at'].isoformat(),
+                    conversation['updated_at'].isoformat(),
+                )
+            )
+            self._index_terms(conversation['id'], 'title', conversation['title'])
+            self._conn.commit()
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM conversations WHERE id = ?", (conversation_id,)
+            ).fetchone()
+        return self._to_conversation(row) if row else None
+
+    def update_conversation(self, conversation_id: str, **fields):
+        updates = {key: value for key, value in fields.items() if key in self.CONVERSATION_FIELDS}
+        if not updates:
+            return
+        if 'starred' in updates:
+            updates['starred'] = int(updates['starred'])
+        if 'updated_at' in updates:
+            updates['updated_at'] = updates['updated_at'].isoformat()
+
+        assignments = ", ".join(f"{key} = ?" for key in updates)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE conversations SET {assignments} WHERE id = ?",
+                (*updates.values(), conversation_id)
+            )
+            if 'title' in updates:
+                self._reindex_field(conversation_id, 'title', [updates['title']])
+            self._conn.commit()
+
+    def delete_conversation(self, conversation_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def list_conversations(self, user_id: str, starred: Optional[bool] = None,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT * FROM conversations WHERE user_id = ?"
+        params = [user_id]
+        if starred is not None:
+            sql += " AND starred = ?"
+            params.append(int(starred))
+        sql += " ORDER BY updated_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._to_conversation(row) for row in rows]
+
+    def count_conversations(self, user_id: str, starred: Optional[bool] = None) -> int:
+        sql = "SELECT COUNT(*) FROM conversations WHERE user_id = ?"
+        params = [user_id]
+        if starred is not None:
+            sql += " AND starred = ?"
+            params.append(int(starred))
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def get_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT role, content, timestamp FROM messages WHERE conversation_id = ? ORDER BY id",
+                (conversation_id,)
+            ).fetchall()
+        return [{'role': row['role'], 'content': row['content'], 'timestamp': row['timestamp']} for row in rows]
+
+    def append_message(self, conversation_id: str, message: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO messages (conversation_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                (conversation_id, message['role'], message['content'], message.get('timestamp'))
+            )
+            self._conn.execute(
+                "UPDATE conversations SET message_count = message_count + 1, updated_at = ? WHERE id = ?",
+                (datetime.now().isoformat(), conversation_id)
+            )
+            self._index_terms(conversation_id, 'content', message['content'])
+            self._conn.commit()
+
+    def search_conversation_ids(self, user_id: str, query: str) -> List[str]:
+        """역색인 접두어 검색
+
+        검색어의 각 단어를 색인의 접두어 범위(term >= w AND term < w + U+FFFF)로
+        찾으므로 대화 수와 무관하게 색인 범위만 읽습니다. 더 많은 검색어 단어와
+        맞은 대화가 먼저 오고, 같으면 빈도(제목 가중) 합이 큰 대화가 먼저 옵니다.
+        """
+        terms = list(dict.fromkeys(index_terms(query)))
+        if not terms:
+            return []
+
+        matched = Counter()
+        weights = Counter()
+        with self._lock:
+            for term in terms:
+                rows = self._conn.execute(
+                    "SELECT t.conversation_id, "
+                    "       SUM(t.tf * CASE t.field WHEN 'title' THEN ? ELSE 1 END) AS weight "
+                    "FROM conversation_terms t JOIN conversations c ON c.id = t.conversation_id "
+                    "WHERE t.term >= ? AND t.term < ? AND c.user_id = ? "
+                    "GROUP BY t.conversation_id",
+                    (TITLE_WEIGHT, term, term + '\uffff', user_id)
+                ).fetchall()
+                for row in rows:
+                    matched[row['conversation_id']] += 1
+                    weights[row['conversation_id']] += row['weight']
+
+        return sorted(matched, key=lambda conv_id: (matched[conv_id], weights[conv_id]), reverse=True)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
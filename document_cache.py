@@ -0,0 +1,113 @@
+# document_cache.py
+# 업로드 문서 구간의 SHA-256 기준 임베딩 캐시
+#
+# 문서를 스트리밍으로 읽으면서 구간마다 (임베딩 모델, 구간 텍스트)의 해시로 조회/기록하므로,
+# 같은 파일을 다시 올려도 임베딩을 다시 계산하지 않고 메모리 사용량도 문서 크기와 무관합니다.
+# (선택적 SQLite 디스크 저장소 지원)
+# mem0 저장 여부는 기록하지 않습니다: 압축/삭제나 비영속 저장소 때문에 저장된 구간이 사라질 수 있으므로
+# 재업로드도 항상 저장합니다.
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+def passage_key(embedding_model: Optional[str], content: str) -> str:
+    """같은 임베딩 모델로 계산한 같은 구간만 같은 키"""
+    return hashlib.sha256(f"{embedding_model or ''}\0{content}".encode("utf-8")).hexdigest()
+
+
+class DocumentCache:
+    """구간 해시 → 임베딩 LRU 캐시
+
+    메모리 LRU가 1차 캐시이고, db_path가 주어지면 SQLite에 같이 기록하여
+    Streamlit 재시작 후에도 재업로드가 캐시 적중이 됩니다. 임베딩은 float32 BLOB으로 저장합니다.
+    """
+
+    def __init__(self, max_entries: int = 4096, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> embedding
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            # 문서 전체를 한 행에 담던 이전 형식 (캐시이므로 버림)
+            self._db.execute("DROP TABLE IF EXISTS document_cache")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS passage_embeddings ("
+                "key TEXT PRIMARY KEY, embedding BLOB NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get_many(self, embedding_model: Optional[str], contents: List[str]) -> List[Optional[List[float]]]:
+        """구간마다 캐시된 임베딩 (없으면 None)"""
+        embeddings = []
+        with self._lock:
+            for content in contents:
+                key = passage_key(embedding_model, content)
+                embedding = self._entries.get(key)
+                if embedding is not None:
+                    self._entries.move_to_end(key)
+                elif self._db is not None:
+                    row = self._db.execute("SELECT embedding FROM passage_embeddings WHERE key = ?",
+                                           (key,)).fetchone()
+                    if row:
+                        values = array('f')
+                        values.frombytes(row[0])
+                        embedding = values.tolist()
+                        self._remember(key, embedding)
+                if embedding is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                embeddings.append(embedding)
+        return embeddings
+
+    def put_many(self, embedding_model: Optional[str], contents: List[str], embeddings: List[Any]):
+        """구간 임베딩 기록 (배치마다 호출되므로 문서 전체를 모아 두지 않음)"""
+        rows = []
+        with self._lock:
+            for content, embedding in zip(contents, embeddings):
+                key = passage_key(embedding_model, content)
+                embedding = [float(v) for v in embedding]
+                self._remember(key, embedding)
+                rows.append((key, array('f', embedding).tobytes(), time.time()))
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO passage_embeddings (key, embedding, updated_at) VALUES (?, ?, ?)", rows
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, embedding: List[float]):
+        """메모리 LRU에 기록하고 크기 제한 초과 시 가장 오래된 항목 제거 (lock 보유 상태에서 호출)"""
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM passage_embeddings")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'persistent': self._db is not None,
+            }
@@ -0,0 +1,264 @@
+# document_ingest.py
+# 업로드 파일을 조금씩 읽어 겹치는 구간(passage)으로 나누고 mem0에 배치로 저장
+#
+# 파일 전체를 프롬프트에 붙이는 대신 구간을 메모리로 저장해 두면,
+# 이후 질문마다 메모리 검색이 관련 구간만 컨텍스트로 가져옵니다.
+# 텍스트 추출 → 구간 분할 → 저장이 제너레이터로 이어지므로 한 번에 배치 하나 분량만 메모리에 올라갑니다.
+# (문서 캐시도 배치마다 구간 임베딩을 조회/기록하므로 문서 전체를 모으지 않음)
+
+import codecs
+import hashlib
+import importlib.util
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from document_cache import DocumentCache
+
+# 선택적 의존성 (PDF: pypdf, DOCX: python-docx)
+PYPDF_AVAILABLE = importlib.util.find_spec("pypdf") is not None
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+
+READ_CHUNK_BYTES = 64 * 1024
+# 저장되는 구간 메모리 접두어 (검색 결과에서 출처가 보이도록)
+DOCUMENT_MEMORY_PREFIX = "문서"
+
+TEXT_EXTENSIONS = {'.txt', '.md', '.markdown', '.csv', '.log'}
+
+
+class UnsupportedDocumentError(ValueError):
+    """처리할 수 없는 형식이거나 필요한 파서가 설치되지 않음"""
+
+
+def document_kind(name: str, mime: Optional[str] = None) -> str:
+    """확장자(없으면 MIME)로 'text' / 'pdf' / 'docx' 판별"""
+    extension = os.path.splitext(name or "")[1].lower()
+    mime = mime or ""
+    if extension in TEXT_EXTENSIONS or (not extension and mime.startswith('text/')):
+        return 'text'
+    if extension == '.pdf' or mime == 'application/pdf':
+        return 'pdf'
+    if extension == '.docx' or mime.endswith('wordprocessingml.document'):
+        return 'docx'
+    raise UnsupportedDocumentError(f"지원하지 않는 파일 형식입니다: {name} ({mime or '알 수 없음'})")
+
+
+def _stream_size(stream) -> Optional[int]:
+    size = getattr(stream, 'size', None)
+    if size:
+        return size
+    try:
+        position = stream.tell()
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(position)
+        return size
+    except (AttributeError, OSError):
+        return None
+
+
+def iter_text_blocks(stream, name: str, mime: Optional[str] = None) -> Iterator[Tuple[str, float]]:
+    """(텍스트 조각, 처리한 비율 0~1)을 순서대로 yield
+
+    텍스트는 READ_CHUNK_BYTES씩 읽어 UTF-8로 점진 디코딩하고, PDF는 페이지, DOCX는 문단 단위로 읽습니다.
+    """
+    kind = document_kind(name, mime)
+
+    if kind == 'text':
+        size = _stream_size(stream)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        read = 0
+        while True:
+            chunk = stream.read(READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            read += len(chunk)
+            text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+            yield text.replace("\r\n", "\n"), (read / size if size else 0.0)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail, 1.0
+        return
+
+    if kind == 'pdf':
+        if not PYPDF_AVAILABLE:
+            raise UnsupportedDocumentError("PDF 처리에는 pypdf가 필요합니다 (pip install pypdf)")
+        from pypdf import PdfReader
+        reader = PdfReader(stream)
+        total = len(reader.pages)
+        for i, page in enumerate(reader.pages, 1):
+            text = page.extract_text() or ""
+            yield text + "\n\n", i / total
+        return
+
+    if not DOCX_AVAILABLE:
+        raise UnsupportedDocumentError("DOCX 처리에는 python-docx가 필요합니다 (pip install python-docx)")
+    from docx import Document
+    document = Document(stream)
+    paragraphs = document.paragraphs
+    total = len(paragraphs) + len(document.tables)
+    for i, paragraph in enumerate(paragraphs, 1):
+        if paragraph.text.strip():
+            yield paragraph.text + "\n", i / total
+    for i, table in enumerate(document.tables, len(paragraphs) + 1):
+        rows = [" | ".join(cell.text.strip() for cell in row.cells) for row in table.rows]
+        yield "\n".join(rows) + "\n\n", i / total
+
+
+def _break_point(text: str, limit: int) -> int:
+    """limit 이하에서 문단 → 줄 → 문장 → 공백 순으로 자연스러운 끊는 위치 (앞쪽 절반은 피함)"""
+    window = text[:limit]
+    floor = limit // 2
+    for separator in ("\n\n", "\n", ". ", "다. ", "? ", "! ", " "):
+        index = window.rfind(separator, floor)
+        if index != -1:
+            return index + len(separator)
+    return limit
+
+
+def _stripped_span(text: str, end: int) -> Optional[Tuple[int, int]]:
+    """text[:end]에서 앞뒤 공백을 뺀 범위 (공백뿐이면 None)"""
+    chunk = text[:end]
+    stripped = chunk.strip()
+    if not stripped:
+        return None
+    lead = len(chunk) - len(chunk.lstrip())
+    return lead, lead + len(stripped)
+
+
+def iter_passage_spans(blocks: Iterable[str], passage_chars: int = 800,
+                       overlap_chars: int = 150) -> Iterator[Tuple[int, int, str]]:
+    """텍스트 조각 스트림을 overlap_chars만큼 겹치는 passage_chars 이하의 구간으로 분할
+
+    (전체 텍스트 기준 시작, 끝, 구간)을 yield하므로 조각을 이어 붙인 텍스트[시작:끝]이 곧 구간입니다.
+    """
+    buffer = ""
+    offset = 0  # buffer[0]의 전체 텍스트 기준 위치
+    carried = 0  # buffer 앞부분 중 이미 내보낸 구간과 겹치는 길이
+    for block in blocks:
+        buffer += block
+        while len(buffer) >= passage_chars:
+            cut = _break_point(buffer, passage_chars)
+            span = _stripped_span(buffer, cut)
+            if span:
+                yield offset + span[0], offset + span[1], buffer[span[0]:span[1]]
+            start = max(cut - overlap_chars, 0)
+            # 겹치는 부분이 단어 중간에서 시작하지 않도록 다음 공백 뒤로 이동
+            space = buffer.find(" ", start, cut)
+            if space != -1:
+                start = space + 1
+            if start == 0:
+                start = cut
+            buffer = buffer[start:]
+            offset += start
+            carried = cut - start
+    if len(buffer) > carried:
+        span = _stripped_span(buffer, len(buffer))
+        if span:
+            yield offset + span[0], offset + span[1], buffer[span[0]:span[1]]
+
+
+def iter_passages(blocks: Iterable[str], passage_chars: int = 800, overlap_chars: int = 150) -> Iterator[str]:
+    """iter_passage_spans의 구간 텍스트만"""
+    for _, _, passage in iter_passage_spans(blocks, passage_chars, overlap_chars):
+        yield passage
+
+
+def passage_content(name: str, index: int, passage: str) -> str:
+    """mem0에 저장되는 구간 메모리 텍스트"""
+    return f"{DOCUMENT_MEMORY_PREFIX} {name} #{index}: {passage}"
+
+
+class DocumentIngestor:
+    """문서를 구간으로 나눠 batch_size개씩 mem0에 저장
+
+    mem0 add는 infer=False로 호출해 LLM 사실 추출 없이 구간 원문을 그대로 저장하고,
+    임베딩 모델이 CachedEmbedder면 배치의 임베딩을 add 전에 동시에 계산해 둡니다.
+    cache(DocumentCache)가 주어지면 같은 파일의 재업로드는 캐시된 구간 임베딩으로 저장합니다.
+    """
+
+    def __init__(self, memory, batch_size: int = 16, passage_chars: int = 800, overlap_chars: int = 150,
+                 on_batch: Optional[Callable[[str, Any], None]] = None,
+                 cache: Optional[DocumentCache] = None):
+        self.memory = memory
+        self.batch_size = batch_size
+        self.passage_chars = passage_chars
+        self.overlap_chars = overlap_chars
+        # 배치가 저장될 때마다 호출 (통계 갱신, 검색 캐시 무효화)
+        self.on_batch = on_batch
+        self.cache = cache
+
+    def _embedding_model_name(self) -> Optional[str]:
+        config = getattr(getattr(self.memory, 'embedding_model', None), 'config', None)
+        model = getattr(config, 'model', None)
+        return str(model) if model is not None else None
+
+    def _store(self, contents: List[str], name: str, user_id: str) -> int:
+        """배치 저장 (문서 캐시에 있는 구간 임베딩은 재사용하고, 새로 계산한 것은 캐시에 기록)
+
+        재사용한 임베딩 수를 돌려줍니다. 임베딩 모델이 CachedEmbedder가 아니면 캐시를 쓰지 않습니다.
+        """
+        reused = 0
+        embedder = getattr(self.memory, 'embedding_model', None)
+        embed_many = getattr(embedder, 'embed_many', None)
+        if embed_many is not None:
+            model = self._embedding_model_name()
+            missing = list(range(len(contents)))
+            if self.cache is not None:
+                cached = self.cache.get_many(model, contents)
+                hits = [i for i, embedding in enumerate(cached) if embedding is not None]
+                embedder.seed([contents[i] for i in hits], [cached[i] for i in hits], "add")
+                missing = [i for i, embedding in enumerate(cached) if embedding is None]
+                reused = len(hits)
+            embeddings = embed_many(contents, "add")
+            if self.cache is not None and missing:
+                self.cache.put_many(model, [contents[i] for i in missing], [embeddings[i] for i in missing])
+        messages = [{"role": "user", "content": content} for content in contents]
+        metadata = {'source': name, 'kind': 'document'}
+        try:
+            result = self.memory.add(messages, user_id=user_id, metadata=metadata, infer=False)
+        except TypeError:
+            # infer 인자가 없는 mem0 버전 (LLM 추출을 거쳐 저장됨)
+            result = self.memory.add(messages, user_id=user_id, metadata=metadata)
+        if self.on_batch:
+            self.on_batch(user_id, result)
+        return reused
+
+    def ingest(self, stream, name: str, user_id: str, mime: Optional[str] = None,
+               on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """stream을 끝까지 읽어 저장하고 결과 보고 (on_progress는 배치마다 호출)
+
+        추출 텍스트의 SHA-256은 읽으면서 계산하므로(report['digest']) 파일을 미리 한 번 더 읽지 않습니다.
+        """
+        start = time.perf_counter()
+        report = {'name': name, 'passages': 0, 'batches': 0, 'chars': 0, 'fraction': 0.0, 'cached_passages': 0}
+        digest = hashlib.sha256()
+
+        def blocks():
+            for text, fraction in iter_text_blocks(stream, name, mime):
+                report['fraction'] = fraction
+                digest.update(text.encode("utf-8"))
+                yield text
+
+        def flush(batch):
+            report['cached_passages'] += self._store(batch, name, user_id)
+            report['batches'] += 1
+
+        batch = []
+        for passage in iter_passages(blocks(), self.passage_chars, self.overlap_chars):
+            report['passages'] += 1
+            report['chars'] += len(passage)
+            batch.append(passage_content(name, report['passages'], passage))
+            if len(batch) >= self.batch_size:
+                flush(batch)
+                batch = []
+                if on_progress:
+                    on_progress(dict(report))
+        if batch:
+            flush(batch)
+
+        report['digest'] = digest.hexdigest()
+        report['fraction'] = 1.0
+        report['elapsed_s'] = time.perf_counter() - start
+        if on_progress:
+            on_progress(dict(report))
+        return report
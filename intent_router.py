@@ -0,0 +1,206 @@
+# intent_router.py
+# 사용자 입력의 의도(웹 검색 필요 여부 등)를 판별하는 라우터
+# 키워드 규칙은 한 번에 컴파일된 매처(Aho-Corasick 또는 정규식)로 한 번만 훑습니다.
+
+import json
+import math
+import re
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+SEARCH_INTENT = "search"
+
+# 규칙 파일에서 분류기 학습 예시를 담는 키 ([["텍스트", "의도"], ...])
+EXAMPLES_KEY = "examples"
+
+# 의도별 키워드 → 가중치 (가중치 = 이 키워드만으로의 확신도)
+DEFAULT_RULES = {
+    SEARCH_INTENT: {
+        "검색": 0.9,
+        "뉴스": 0.9,
+        "최신": 0.8,
+        "찾아": 0.8,
+        "정보": 0.6,
+        "알려줘": 0.5,
+        "search": 0.9,
+        "news": 0.9,
+        "latest": 0.8,
+    },
+}
+
+
+class RegexMatcher:
+    """키워드 전체를 하나의 정규식 alternation으로 컴파일한 매처"""
+
+    def __init__(self, patterns: Iterable[str]):
+        # 긴 키워드를 먼저 두어 겹치는 접두어보다 우선 매칭
+        ordered = sorted(set(patterns), key=len, reverse=True)
+        self.regex = re.compile("|".join(re.escape(p) for p in ordered), re.IGNORECASE) if ordered else None
+
+    def find(self, text: str) -> List[str]:
+        if self.regex is None:
+            return []
+        return [match.group(0).lower() for match in self.regex.finditer(text)]
+
+
+class AhoCorasickMatcher:
+    """pyahocorasick 오토마톤 기반 매처 (규칙이 수천 개여도 입력 길이에 비례)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.automaton = ahocorasick.Automaton()
+        for pattern in set(patterns):
+            self.automaton.add_word(pattern.lower(), pattern.lower())
+        self.empty = len(self.automaton) == 0
+        if not self.empty:
+            self.automaton.make_automaton()
+
+    def find(self, text: str) -> List[str]:
+        if self.empty:
+            return []
+        return [pattern for _, pattern in self.automaton.iter(text.lower())]
+
+
+def build_matcher(patterns: Iterable[str]):
+    """pyahocorasick이 설치되어 있으면 Aho-Corasick, 아니면 컴파일된 정규식"""
+    if AHOCORASICK_AVAILABLE:
+        return AhoCorasickMatcher(patterns)
+    return RegexMatcher(patterns)
+
+
+def char_ngrams(text: str, n: int = 2) -> List[str]:
+    compact = "".join(text.lower().split())
+    return [compact[i:i + n] for i in range(max(len(compact) - n + 1, 1))]
+
+
+class NaiveBayesClassifier:
+    """문자 바이그램 다항 나이브 베이즈 (외부 의존성 없는 경량 로컬 분류기)"""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self.class_counts = defaultdict(int)
+        self.feature_counts = defaultdict(lambda: defaultdict(int))
+        self.feature_totals = defaultdict(int)
+        self.vocabulary = set()
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> "NaiveBayesClassifier":
+        """(텍스트, 의도) 예시로 학습"""
+        for text, intent in examples:
+            self.class_counts[intent] += 1
+            for gram in char_ngrams(text):
+                self.feature_counts[intent][gram] += 1
+                self.feature_totals[intent] += 1
+                self.vocabulary.add(gram)
+        return self
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        total = sum(self.class_counts.values())
+        if not total:
+            return {}
+        grams = char_ngrams(text)
+        vocab_size = len(self.vocabulary) or 1
+        log_scores = {}
+        for intent, count in self.class_counts.items():
+            score = math.log(count / total)
+            denominator = self.feature_totals[intent] + self.alpha * vocab_size
+            for gram in grams:
+                score += math.log((self.feature_counts[intent].get(gram, 0) + self.alpha) / denominator)
+            log_scores[intent] = score
+
+        top = max(log_scores.values())
+        exp_scores = {intent: math.exp(score - top) for intent, score in log_scores.items()}
+        norm = sum(exp_scores.values())
+        return {intent: value / norm for intent, value in exp_scores.items()}
+
+
+class IntentDecision:
+    """라우팅 결과 (의도별 확신도와 매칭된 키워드)"""
+
+    def __init__(self, scores: Dict[str, float], matched: Dict[str, List[str]], threshold: float):
+        self.scores = scores
+        self.matched = matched
+        self.threshold = threshold
+
+    def confidence(self, intent: str) -> float:
+        return self.scores.get(intent, 0.0)
+
+    def wants(self, intent: str) -> bool:
+        return self.confidence(intent) >= self.threshold
+
+    @property
+    def top_intent(self) -> Optional[str]:
+        if not self.scores:
+            return None
+        return max(self.scores, key=self.scores.get)
+
+
+class IntentRouter:
+    """키워드 규칙 + (선택) 로컬 분류기로 의도별 확신도 계산
+
+    규칙 확신도는 매칭된 키워드 가중치의 noisy-OR(1 - Π(1 - w))이고,
+    분류기가 있으면 classifier_weight 비율로 분류기 확률과 섞습니다.
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, float]] = None, classifier: NaiveBayesClassifier = None,
+                 threshold: float = 0.5, classifier_weight: float = 0.4):
+        self.rules = {intent: {k.lower(): w for k, w in keywords.items()}
+                      for intent, keywords in (rules or DEFAULT_RULES).items()}
+        self.classifier = classifier
+        self.threshold = threshold
+        self.classifier_weight = classifier_weight
+
+        # 키워드 → [(의도, 가중치)] 역색인과 단일 매처
+        self.keyword_index = defaultdict(list)
+        for intent, keywords in self.rules.items():
+            for keyword, weight in keywords.items():
+                self.keyword_index[keyword].append((intent, weight))
+        self.matcher = build_matcher(self.keyword_index)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "IntentRouter":
+        """JSON 규칙 파일 ({"의도": {"키워드": 가중치}, "examples": [["텍스트", "의도"], ...]})로 생성
+
+        examples가 있으면 그 예시로 NaiveBayesClassifier를 학습해 규칙과 함께 씁니다.
+        분류기는 예시에 나온 의도 중에서만 고르므로 검색이 아닌 예시(예: "chat")도 함께 넣어야 합니다.
+        """
+        with open(path, encoding="utf-8") as f:
+            rules = json.load(f)
+        examples = rules.pop(EXAMPLES_KEY, None)
+        if examples and kwargs.get('classifier') is None:
+            kwargs['classifier'] = NaiveBayesClassifier().fit((text, intent) for text, intent in examples)
+        return cls(rules, **kwargs)
+
+    def route(self, text: str) -> IntentDecision:
+        matched = defaultdict(list)
+        for keyword in self.matcher.find(text):
+            for intent, _ in self.keyword_index.get(keyword, ()):
+                if keyword not in matched[intent]:
+                    matched[intent].append(keyword)
+
+        scores = {}
+        for intent in self.rules:
+            miss = 1.0
+            for keyword in matched.get(intent, ()):
+                miss *= 1.0 - dict(self.keyword_index[keyword])[intent]
+            scores[intent] = 1.0 - miss
+
+        if self.classifier is not None:
+            probabilities = self.classifier.predict_proba(text)
+            for intent in set(scores) | set(probabilities):
+                scores[intent] = ((1 - self.classifier_weight) * scores.get(intent, 0.0)
+                                  + self.classifier_weight * probabilities.get(intent, 0.0))
+
+        return IntentDecision(scores, dict(matched), self.threshold)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'intents': len(self.rules),
+            'keywords': len(self.keyword_index),
+            'matcher': type(self.matcher).__name__,
+            'classifier': self.classifier is not None,
+        }
@@ -0,0 +1,179 @@
+# memory_cache.py
+# mem0 메모리 검색 결과와 질문 임베딩 캐시
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from search_cache import normalize_query
+
+
+class CachedEmbedder:
+    """mem0 embedding_model을 감싸는 LRU 임베딩 캐시
+
+    memory.embedding_model 자리에 끼워 넣으면 mem0 search/add와 응답 캐시가
+    같은 캐시를 공유하므로, 한 턴에서 같은 질문을 두 번 임베딩하지 않습니다.
+    """
+
+    def __init__(self, embedding_model, max_entries: int = 2048):
+        self.embedding_model = embedding_model
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, text, memory_action: Optional[str] = None):
+        if not isinstance(text, str):
+            return self.embedding_model.embed(text, memory_action)
+
+        key = (memory_action, text)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        embedding = self.embedding_model.embed(text, memory_action)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def embed_many(self, texts: List[str], memory_action: Optional[str] = None,
+                   max_workers: int = 4) -> List[Any]:
+        """여러 텍스트를 임베딩 (캐시에 없는 것만 동시에 계산해 캐시에 넣음)
+
+        문서 수집처럼 mem0 add 전에 미리 호출해 두면 add 안의 embed 호출은 모두 캐시 적중이 됩니다.
+        """
+        embeddings = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                key = (memory_action, text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    embeddings[i] = self._entries[key]
+                else:
+                    missing.append(i)
+        if not missing:
+            return embeddings
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing)), thread_name_prefix="embed") as executor:
+            computed = list(executor.map(lambda i: self.embedding_model.embed(texts[i], memory_action), missing))
+        with self._lock:
+            self.misses += len(missing)
+            for i, embedding in zip(missing, computed):
+                embeddings[i] = embedding
+                self._entries[(memory_action, texts[i])] = embedding
+                self._entries.move_to_end((memory_action, texts[i]))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embeddings
+
+    def seed(self, texts: List[str], embeddings: List[Any], memory_action: Optional[str] = None):
+        """이미 알고 있는 임베딩을 캐시에 넣음 (문서 캐시에서 복원한 구간 임베딩 등)"""
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                self._entries[(memory_action, text)] = embedding
+                self._entries.move_to_end((memory_action, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __getattr__(self, name):
+        # config 등 나머지 속성은 원래 임베딩 모델로 위임
+        return getattr(self.embedding_model, name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+            }
+
+
+def install_cached_embedder(memory, max_entries: int = 2048) -> Optional[CachedEmbedder]:
+    """memory.embedding_model을 CachedEmbedder로 교체 (이미 교체되었거나 없으면 그대로)"""
+    embedding_model = getattr(memory, 'embedding_model', None)
+    if embedding_model is None:
+        return None
+    if not isinstance(embedding_model, CachedEmbedder):
+        embedding_model = CachedEmbedder(embedding_model, max_entries)
+        memory.embedding_model = embedding_model
+    return embedding_model
+
+
+class MemorySearchCache:
+    """사용자별 메모리 검색 결과 LRU 캐시
+
+    사용자마다 세대(generation) 번호를 두고 메모리가 바뀔 때 올려서,
+    이전 세대에 저장된 결과는 조회되지 않게 합니다.
+    """
+
+    def __init__(self, max_entries_per_user: int = 128, ttl: float = 300.0):
+        self.max_entries_per_user = max_entries_per_user
+        self.ttl = ttl
+        self._users = {}  # user_id -> OrderedDict((query, limit) -> (generation, expires_at, value))
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, user_id: str, query: str, limit: int) -> Optional[str]:
+        key = (normalize_query(query), limit)
+        with self._lock:
+            entries = self._users.get(user_id)
+            entry = entries.get(key) if entries else None
+            if entry is None or entry[0] != self._generations.get(user_id, 0) or entry[1] <= time.time():
+                if entry is not None:
+                    del entries[key]
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, user_id: str, query: str, limit: int, value: str, generation: Optional[int] = None):
+        """검색 결과 저장 (generation은 검색 시작 시점의 세대, 그 사이 쓰기가 있었으면 저장하지 않음)"""
+        key = (normalize_query(query), limit)
+        with self._lock:
+            current = self._generations.get(user_id, 0)
+            if generation is not None and generation != current:
+                return
+            entries = self._users.setdefault(user_id, OrderedDict())
+            entries[key] = (current, time.time() + self.ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries_per_user:
+                entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """사용자의 세대를 올려 캐시된 결과를 모두 무효화"""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._users.pop(user_id, None)
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': sum(len(entries) for entries in self._users.values()),
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,238 @@
+# memory_compaction.py
+# mem0 메모리 중복 제거 + 오래된 검색 기록 만료 (CLI 또는 주기 실행)
+#
+# 사용법:
+#   python memory_compaction.py --user-id user_001 --dry-run
+#   python memory_compaction.py --user-id user_001 --vector-store numpy --interval 3600
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional, Callable, Iterable
+
+import numpy as np
+
+# 매 턴 저장되는 검색 결과 메모리의 metadata['kind'] (agent_engine.SimpleAgent.build_context)
+# mem0 추출(infer)이 텍스트를 사실 문장으로 바꾸므로 접두어 대신 metadata로 구분
+SEARCH_MEMORY_KIND = "search"
+
+
+def is_search_memory(item: Dict[str, Any]) -> bool:
+    return (item.get('metadata') or {}).get('kind') == SEARCH_MEMORY_KIND
+
+
+def parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def age_of(item: Dict[str, Any], now: datetime) -> Optional[timedelta]:
+    created_at = parse_timestamp(item.get('updated_at') or item.get('created_at'))
+    if created_at is None:
+        return None
+    if created_at.tzinfo is None:
+        return now.replace(tzinfo=None) - created_at
+    return now - created_at
+
+
+class MemoryCompactor:
+    """사용자별 메모리를 훑어 만료/중복 항목을 삭제
+
+    1. metadata['kind']가 SEARCH_MEMORY_KIND인 검색 기록은 search_ttl보다 오래되면 삭제
+    2. 남은 메모리는 임베딩 코사인 유사도가 threshold 이상인 것끼리 묶고,
+       묶음마다 가장 최근 항목 하나만 남김
+    벡터 저장소가 get_vectors를 제공하면(NumpyVectorStore) 임베딩을 다시 계산하지 않습니다.
+    """
+
+    def __init__(self, memory, threshold: float = 0.95, search_ttl: timedelta = timedelta(days=7),
+                 dry_run: bool = False, on_change: Optional[Callable[[str], None]] = None):
+        self.memory = memory
+        self.threshold = threshold
+        self.search_ttl = search_ttl
+        self.dry_run = dry_run
+        # 삭제가 있었던 사용자에 대해 호출 (검색 캐시/통계 무효화 등)
+        self.on_change = on_change
+
+    def _get_all(self, user_id: str) -> List[Dict[str, Any]]:
+        try:
+            results = self.memory.get_all(user_id=user_id, limit=100000)
+        except TypeError:
+            # limit 인자가 없는 mem0 버전
+            results = self.memory.get_all(user_id=user_id)
+        if isinstance(results, dict):
+            results = results.get('results', [])
+        return [item for item in results or [] if isinstance(item, dict) and item.get('id')]
+
+    def _vectors(self, items: List[Dict[str, Any]]) -> np.ndarray:
+        ids = [item['id'] for item in items]
+        stored = {}
+        get_vectors = getattr(getattr(self.memory, 'vector_store', None), 'get_vectors', None)
+        if get_vectors is not None:
+            stored = get_vectors(ids)
+
+        rows = []
+        for item in items:
+            vector = stored.get(item['id'])
+            if vector is None:
+                vector = self.memory.embedding_model.embed(item['memory'], "add")
+            rows.append(np.asarray(vector, dtype=np.float32))
+        matrix = np.vstack(rows)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def find_duplicates(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """유사도 threshold 이상인 묶음 목록 (각 묶음의 첫 항목이 남길 대표, 최신순)"""
+        if len(items) < 2:
+            return []
+        now = datetime.now(timezone.utc)
+        ages = {item['id']: age_of(item, now) for item in items}
+        items = sorted(items, key=lambda item: timedelta.max if ages[item['id']] is None else ages[item['id']])
+        matrix = self._vectors(items)
+
+        assigned = np.zeros(len(items), dtype=bool)
+        clusters = []
+        for i in range(len(items)):
+            if assigned[i]:
+                continue
+            similar = np.nonzero((matrix[i + 1:] @ matrix[i] >= self.threshold) & ~assigned[i + 1:])[0] + i + 1
+            if len(similar):
+                assigned[similar] = True
+                clusters.append([items[i]] + [items[j] for j in similar])
+        return clusters
+
+    def compact_user(self, user_id: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        items = self._get_all(user_id)
+
+        expired = []
+        remaining = []
+        for item in items:
+            age = age_of(item, now)
+            if is_search_memory(item) and age is not None and age > self.search_ttl:
+                expired.append(item)
+            else:
+                remaining.append(item)
+
+        clusters = self.find_duplicates(remaining)
+        duplicates = [item for cluster in clusters for item in cluster[1:]]
+
+        removed = expired + duplicates
+        dims = 0
+        embedder_config = getattr(getattr(self.memory, 'embedding_model', None), 'config', None)
+        if embedder_config is not None:
+            dims = getattr(embedder_config, 'embedding_dims', 0) or 0
+        # 삭제된 메모리의 텍스트 + float32 벡터 크기 추정
+        estimated_bytes = sum(len(item.get('memory', '').encode("utf-8")) + dims * 4 for item in removed)
+
+        failed = 0
+        if not self.dry_run:
+            for item in removed:
+                try:
+                    self.memory.delete(memory_id=item['id'])
+                except Exception:
+                    failed += 1
+            if removed and self.on_change:
+                self.on_change(user_id)
+
+        report = {
+            'user_id': user_id,
+            'scanned': len(items),
+            'expired': len(expired),
+            'duplicates': len(duplicates),
+            'clusters': len(clusters),
+            'vectors_reclaimed': len(removed) - failed,
+            'bytes_reclaimed': estimated_bytes,
+            'failed': failed,
+            'dry_run': self.dry_run,
+        }
+
+        # 로컬 벡터 저장소면 죽은 행을 실제로 회수하고 그 크기로 보고
+        compact = getattr(getattr(self.memory, 'vector_store', None), 'compact', None)
+        if compact is not None and not self.dry_run and removed:
+            reclaimed = compact()
+            text_bytes = sum(len(item.get('memory', '').encode("utf-8")) for item in removed)
+            # delete 중 자동 압축이 이미 일어났으면 compact()가 돌려주는 값은 일부뿐이므로 추정치와 비교
+            report['bytes_reclaimed'] = max(estimated_bytes, reclaimed['bytes'] + text_bytes)
+
+        report['elapsed_s'] = time.perf_counter() - start
+        return report
+
+    def run(self, user_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        return [self.compact_user(user_id) for user_id in user_ids]
+
+
+class CompactionScheduler:
+    """interval초마다 user_ids()가 돌려주는 사용자들을 압축하는 백그라운드 스레드"""
+
+    def __init__(self, compactor: MemoryCompactor, user_ids: Callable[[], Iterable[str]], interval: float = 3600.0):
+        self.compactor = compactor
+        self.user_ids = user_ids
+        self.interval = interval
+        self.last_reports = []
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="memory-compaction", daemon=True)
+
+    def start(self) -> "CompactionScheduler":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.last_reports = self.compactor.run(list(self.user_ids()))
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    from dotenv import load_dotenv
+    from agent_engine import EngineConfig, create_memory
+
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(
+        description="mem0 메모리 중복 제거 / 검색 기록 만료",
+        epilog="numpy 벡터 저장소는 한 프로세스만 열 수 있으므로 앱이 실행 중일 때는 같은 경로로 실행하지 마세요 "
+               "(VectorStoreLockedError로 실패). 앱에서는 MEMORY_COMPACTION_INTERVAL을 지정하면 "
+               "프로세스 전체에서 스케줄러 하나가 돕니다."
+    )
+    parser.add_argument("--user-id", action="append", required=True, help="대상 사용자 (여러 번 지정 가능)")
+    parser.add_argument("--threshold", type=float, default=0.95, help="중복으로 볼 코사인 유사도")
+    parser.add_argument("--search-ttl-days", type=float, default=7.0, help="검색 기록 메모리 보존 기간")
+    parser.add_argument("--vector-store", default="default", choices=["default", "numpy"])
+    parser.add_argument("--vector-store-path", default="vector_store")
+    parser.add_argument("--dry-run", action="store_true", help="삭제하지 않고 결과만 보고")
+    parser.add_argument("--interval", type=float, help="지정하면 이 간격(초)으로 계속 실행")
+    args = parser.parse_args()
+
+    config = EngineConfig(vector_store=args.vector_store, vector_store_path=args.vector_store_path)
+    compactor = MemoryCompactor(
+        create_memory(config),
+        threshold=args.threshold,
+        search_ttl=timedelta(days=args.search_ttl_days),
+        dry_run=args.dry_run
+    )
+
+    while True:
+        for report in compactor.run(args.user_id):
+            print(json.dumps(report, ensure_ascii=False))
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# memory_stats.py
+# 사용자별 메모리 통계 (전체 조회 없이 개수와 최근 메모리 유지)
+
+import threading
+from collections import deque
+from typing import List, Dict, Any
+
+
+def iter_add_events(result) -> List[Dict[str, Any]]:
+    """mem0 Memory.add 반환값에서 이벤트 목록 추출 (버전별 형식 차이 흡수)"""
+    if isinstance(result, dict):
+        result = result.get('results', [])
+    if not isinstance(result, list):
+        return []
+    return [item for item in result if isinstance(item, dict)]
+
+
+class MemoryStats:
+    """사용자별 메모리 개수와 최근 메모리 링 버퍼
+
+    store_memory가 mem0 add 결과의 ADD/UPDATE/DELETE 이벤트로 갱신하므로,
+    화면 갱신마다 get_all을 호출할 필요가 없습니다. 전체 개수는 명시적으로
+    load를 호출해야 알 수 있으며, 그 전에는 이번 프로세스에서 추가된 수만 집계합니다.
+    """
+
+    def __init__(self, recent_size: int = 3):
+        self.recent_size = recent_size
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, user_id: str) -> Dict[str, Any]:
+        """사용자 항목 (lock 보유 상태에서 호출)"""
+        if user_id not in self._users:
+            self._users[user_id] = {
+                'count': None,  # 전체 조회 전에는 알 수 없음
+                'added': 0,
+                'recent': deque(maxlen=self.recent_size),
+            }
+        return self._users[user_id]
+
+    def load(self, user_id: str, memories: List[str]):
+        """get_all 결과로 통계 초기화"""
+        with self._lock:
+            entry = self._entry(user_id)
+            entry['count'] = len(memories)
+            entry['added'] = 0
+            entry['recent'].clear()
+            entry['recent'].extend(memories[-self.recent_size:])
+
+    def record_add(self, user_id: str, result):
+        """mem0 add 결과 반영"""
+        with self._lock:
+            entry = self._entry(user_id)
+            for event in iter_add_events(result):
+                kind = event.get('event', 'ADD')
+                text = event.get('memory')
+                if kind == 'ADD':
+                    entry['added'] += 1
+                    if entry['count'] is not None:
+                        entry['count'] += 1
+                elif kind == 'DELETE':
+                    entry['added'] -= 1
+                    if entry['count'] is not None:
+                        entry['count'] = max(entry['count'] - 1, 0)
+                    continue
+                if text and kind in ('ADD', 'UPDATE'):
+                    entry['recent'].append(text)
+
+    def invalidate(self, user_id: str):
+        """외부에서 메모리가 크게 바뀌었을 때 통계 초기화"""
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entry(user_id)
+            return {
+                'count': entry['count'],
+                'added': entry['added'],
+                'recent': list(entry['recent']),
+                'loaded': entry['count'] is not None,
+            }
@@ -0,0 +1,159 @@
+# memory_writer.py
+# mem0 메모리 추가를 응답 경로 밖으로 옮기는 비동기 write-behind 큐
+
+import atexit
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+
+class MemoryWriteQueue:
+    """메모리 추가 요청을 모아 백그라운드 스레드에서 배치로 저장
+
+    같은 사용자의 요청은 하나의 mem0 add 호출(메시지 목록)로 합쳐지므로
+    LLM 추출과 임베딩이 요청마다가 아니라 배치마다 한 번 실행됩니다.
+    metadata나 infer가 다른 요청은 섞이지 않도록 별도의 add 호출로 저장합니다.
+    실패한 배치는 지수 백오프로 재시도하고, 프로세스 종료 시 남은 항목을 저장합니다.
+    """
+
+    def __init__(self, memory, batch_size: int = 8, flush_interval: float = 0.5,
+                 max_retries: int = 3, retry_backoff: float = 1.0,
+                 on_commit: Optional[Callable[[str, Any], None]] = None):
+        self.memory = memory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_commit = on_commit
+
+        self._queue = queue.Queue()
+        self._pending = deque()  # 대기 중인 항목의 등록 시각 (지연 측정용)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.committed = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.last_lag = 0.0
+        self.last_error = None
+
+        self._worker = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def submit(self, content: str, user_id: str = "default", metadata: Optional[Dict[str, Any]] = None,
+               infer: bool = True):
+        """메모리 추가 요청 등록 (즉시 반환, infer=False면 추출 없이 원문 그대로 저장)"""
+        enqueued_at = time.time()
+        # 종료 표시(None)보다 뒤에 들어간 항목은 저장되지 않으므로 close와 같은 lock 안에서 확인 후 등록
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("메모리 쓰기 큐가 종료되었습니다.")
+            self._pending.append(enqueued_at)
+            self._queue.put((content, user_id, metadata, infer, enqueued_at))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            # 첫 항목 이후 flush_interval 동안 들어온 항목을 한 배치로 모음
+            batch = [item]
+            stop = False
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    next_item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stop = True
+                    break
+                batch.append(next_item)
+
+            self._write_batch(batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        # 사용자(와 metadata/infer)별로 묶되 등록 순서 유지
+        groups = OrderedDict()
+        for content, user_id, metadata, infer, enqueued_at in batch:
+            key = (user_id, json.dumps(metadata, sort_keys=True) if metadata else None, infer)
+            groups.setdefault(key, (metadata, []))[1].append((content, enqueued_at))
+
+        for (user_id, _, infer), (metadata, items) in groups.items():
+            messages = [{"role": "user", "content": content} for content, _ in items]
+            kwargs = {}
+            if metadata:
+                kwargs['metadata'] = metadata
+            if not infer:
+                kwargs['infer'] = False
+            result = None
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = self.memory.add(messages, user_id=user_id, **kwargs)
+                    break
+                except Exception as e:
+                    self.last_error = str(e)
+                    if attempt == self.max_retries:
+                        result = e
+                        break
+                    self.retries += 1
+                    time.sleep(self.retry_backoff * (2 ** attempt))
+
+            now = time.time()
+            with self._cond:
+                if isinstance(result, Exception):
+                    self.failed += len(items)
+                else:
+                    self.committed += len(items)
+                self.batches += 1
+                self.last_lag = now - items[0][1]
+                for _ in items:
+                    self._pending.popleft()
+                self._cond.notify_all()
+
+            if self.on_commit and not isinstance(result, Exception):
+                try:
+                    self.on_commit(user_id, result)
+                except Exception:
+                    pass
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """대기 중인 항목이 모두 저장될 때까지 대기"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout=timeout)
+
+    def close(self, timeout: float = 30.0):
+        """남은 항목을 저장하고 워커 종료 (풀에서 정리된 큐가 종료 시까지 남지 않도록 atexit 등록도 해제)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        atexit.unregister(self.close)
+        self._worker.join(timeout=timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """대기열 깊이와 지연 지표"""
+        with self._cond:
+            oldest = self._pending[0] if self._pending else None
+            return {
+                'depth': len(self._pending),
+                'oldest_lag': time.time() - oldest if oldest else 0.0,
+                'last_lag': self.last_lag,
+                'committed': self.committed,
+                'failed': self.failed,
+                'retries': self.retries,
+                'batches': self.batches,
+                'last_error': self.last_error,
+            }
@@ -0,0 +1,495 @@
+# numpy_vector_store.py
+# 외부 벡터 DB 없이 쓰는 mem0 벡터 저장소 (사용자별 메모리 맵 float32 행렬)
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+SHARED_PARTITION = "_shared"
+COMPACT_CHUNK_ROWS = 65536
+
+
+class VectorStoreLockedError(RuntimeError):
+    """다른 프로세스가 같은 저장소 디렉터리를 사용 중"""
+
+
+class OutputData:
+    """mem0 벡터 저장소 결과 형식 (id, score, payload)"""
+
+    def __init__(self, id: str, score: Optional[float] = None, payload: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.score = score
+        self.payload = payload or {}
+
+    def __repr__(self):
+        return f"OutputData(id={self.id!r}, score={self.score!r})"
+
+
+class _Partition:
+    """한 사용자의 벡터 행렬과 페이로드
+
+    vectors.f32는 (capacity, dims) float32 메모리 맵이며 행은 정규화된 상태로 뒤에만 추가됩니다.
+    삭제/벡터 수정은 기존 행을 죽은 행으로 표시하고, log.jsonl에 연산을 순서대로 기록합니다.
+    """
+
+    def __init__(self, directory: str, dims: int, initial_capacity: int):
+        self.directory = directory
+        self.dims = dims
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.log_path = os.path.join(directory, "log.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+        self.ids = []  # row -> id
+        self.payloads = []  # row -> payload
+        self.rows = {}  # id -> 살아 있는 row
+        self.count = 0
+        self._replay_log()
+
+        capacity = max(initial_capacity, self.count)
+        if os.path.exists(self.vectors_path):
+            capacity = max(capacity, os.path.getsize(self.vectors_path) // (4 * dims))
+        self._open(capacity)
+        self.alive = np.zeros(self.matrix.shape[0], dtype=bool)
+        for row in self.rows.values():
+            self.alive[row] = True
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def _replay_log(self):
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # 중단된 마지막 줄은 무시
+                op = entry['op']
+                if op == 'put':
+                    row = entry['row']
+                    while len(self.ids) <= row:
+                        self.ids.append(None)
+                        self.payloads.append(None)
+                    previous = self.rows.get(entry['id'])
+                    if previous is not None:
+                        self.payloads[previous] = None
+                    self.ids[row] = entry['id']
+                    self.payloads[row] = entry['payload']
+                    self.rows[entry['id']] = row
+                    self.count = max(self.count, row + 1)
+                elif op == 'payload' and entry['id'] in self.rows:
+                    self.payloads[self.rows[entry['id']]] = entry['payload']
+                elif op == 'del':
+                    row = self.rows.pop(entry['id'], None)
+                    if row is not None:
+                        self.payloads[row] = None
+
+    def _open(self, capacity: int):
+        capacity = max(capacity, 1)
+        mode = "r+" if os.path.exists(self.vectors_path) else "w+"
+        if mode == "r+" and os.path.getsize(self.vectors_path) < capacity * self.dims * 4:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(capacity * self.dims * 4)
+        self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dims))
+
+    def _grow(self, needed: int):
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.matrix.flush()
+        del self.matrix
+        self._open(capacity)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.alive)] = self.alive
+        self.alive = alive
+
+    def _write_log(self, entry: Dict[str, Any]):
+        self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def append(self, ids: List[str], vectors: np.ndarray, payloads: List[Dict[str, Any]]):
+        start = self.count
+        self._grow(start + len(ids))
+        self.matrix[start:start + len(ids)] = vectors
+        for offset, (vector_id, payload) in enumerate(zip(ids, payloads)):
+            row = start + offset
+            previous = self.rows.get(vector_id)
+            if previous is not None:
+                self.alive[previous] = False
+                self.payloads[previous] = None
+            self.ids.append(vector_id)
+            self.payloads.append(payload)
+            self.rows[vector_id] = row
+            self.alive[row] = True
+            self._write_log({'op': 'put', 'id': vector_id, 'row': row, 'payload': payload})
+        self.count = start + len(ids)
+        self._log.flush()
+
+    def set_payload(self, vector_id: str, payload: Dict[str, Any]):
+        self.payloads[self.rows[vector_id]] = payload
+        self._write_log({'op': 'payload', 'id': vector_id, 'payload': payload})
+        self._log.flush()
+
+    def delete(self, vector_id: str) -> bool:
+        row = self.rows.pop(vector_id, None)
+        if row is None:
+            return False
+        self.alive[row] = False
+        self.payloads[row] = None
+        self._write_log({'op': 'del', 'id': vector_id})
+        self._log.flush()
+        return True
+
+    @property
+    def dead(self) -> int:
+        return self.count - len(self.rows)
+
+    def search(self, query: np.ndarray, limit: int, mask: Optional[np.ndarray] = None):
+        """정규화된 query와 살아 있는 행의 코사인 유사도 top-k → [(row, score)]"""
+        if not self.rows or limit <= 0:
+            return []
+        scores = self.matrix[:self.count] @ query
+        valid = self.alive[:self.count] if mask is None else self.alive[:self.count] & mask
+        scores = np.where(valid, scores, -np.inf)
+        k = min(limit, int(valid.sum()))
+        if k == 0:
+            return []
+        if k < self.count:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(self.count)
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def compact(self) -> Dict[str, int]:
+        """죽은 행을 제거하고 행렬/로그를 다시 작성 → {vectors, bytes} 회수량"""
+        live_rows = sorted(self.rows.values())
+        before_rows = self.count
+        before_bytes = self.matrix.shape[0] * self.dims * 4
+
+        tmp_vectors = self.vectors_path + ".tmp"
+        tmp_log = self.log_path + ".tmp"
+        capacity = max(len(live_rows), 1)
+        compacted = np.memmap(tmp_vectors, dtype=np.float32, mode="w+", shape=(capacity, self.dims))
+        # 큰 파티션도 메모리에 한꺼번에 올리지 않도록 나눠서 복사
+        for start in range(0, len(live_rows), COMPACT_CHUNK_ROWS):
+            chunk = live_rows[start:start + COMPACT_CHUNK_ROWS]
+            compacted[start:start + len(chunk)] = self.matrix[chunk]
+        compacted.flush()
+        del compacted
+
+        ids = [self.ids[row] for row in live_rows]
+        payloads = [self.payloads[row] for row in live_rows]
+        with open(tmp_log, "w", encoding="utf-8") as f:
+            for row, (vector_id, payload) in enumerate(zip(ids, payloads)):
+                f.write(json.dumps({'op': 'put', 'id': vector_id, 'row': row, 'payload': payload},
+                                   ensure_ascii=False) + "\n")
+
+        self._log.close()
+        del self.matrix
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_log, self.log_path)
+
+        self.ids = ids
+        self.payloads = payloads
+        self.rows = {vector_id: row for row, vector_id in enumerate(ids)}
+        self.count = len(ids)
+        self._open(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.alive[:self.count] = True
+        self._log = open(self.log_path, "a", encoding="utf-8")
+        return {'vectors': before_rows - self.count, 'bytes': before_bytes - capacity * self.dims * 4}
+
+    def close(self):
+        self.matrix.flush()
+        self._log.close()
+
+
+def _normalize(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NumpyVectorStore:
+    """mem0 VectorStoreBase와 같은 메서드를 제공하는 로컬 벡터 저장소
+
+    filters의 user_id별로 파티션(디렉터리)을 나누고, 검색은 해당 파티션 행렬과의
+    행렬-벡터 곱 + argpartition으로 top-k를 구합니다. 삭제/수정으로 죽은 행 비율이
+    compact_ratio를 넘으면 그 파티션을 자동으로 압축합니다.
+    """
+
+    def __init__(self, collection_name: str = "mem0", path: str = "vector_store",
+                 embedding_model_dims: Optional[int] = None, initial_capacity: int = 1024,
+                 compact_ratio: float = 0.3):
+        self.collection_name = collection_name
+        self.root = os.path.join(path, collection_name)
+        self.initial_capacity = initial_capacity
+        self.compact_ratio = compact_ratio
+        self._partitions = {}
+        self._id_index = {}  # id -> partition key
+        self._lock = threading.RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+        # 행 번호는 인스턴스 메모리 상태로 정해지므로 디렉터리당 쓰는 쪽은 하나만 허용
+        # (같은 프로세스에서는 open_numpy_vector_store로 인스턴스를 공유)
+        self._lock_file = open(os.path.join(self.root, "LOCK"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise VectorStoreLockedError(f"벡터 저장소를 다른 곳에서 사용 중입니다: {self.root}")
+
+        self.meta_path = os.path.join(self.root, "meta.json")
+        self.dims = embedding_model_dims
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dims = meta['dims']
+            for key in meta.get('partitions', []):
+                self._partition(key)
+
+    # --- 내부 도구 ---
+
+    @staticmethod
+    def partition_key(filters: Optional[Dict[str, Any]]) -> str:
+        user_id = (filters or {}).get('user_id')
+        return str(user_id) if user_id is not None else SHARED_PARTITION
+
+    def _save_meta(self):
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({'dims': self.dims, 'partitions': sorted(self._partitions)}, f, ensure_ascii=False)
+
+    def _partition(self, key: str, create: bool = False) -> Optional[_Partition]:
+        partition = self._partitions.get(key)
+        if partition is not None:
+            return partition
+        directory = os.path.join(self.root, hashlib.sha1(key.encode("utf-8")).hexdigest()[:16])
+        if not create and not os.path.exists(directory):
+            return None
+        partition = _Partition(directory, self.dims, self.initial_capacity)
+        self._partitions[key] = partition
+        for vector_id in partition.rows:
+            self._id_index[vector_id] = key
+        if create:
+            self._save_meta()
+        return partition
+
+    @staticmethod
+    def _matches(payload: Optional[Dict[str, Any]], filters: Dict[str, Any]) -> bool:
+        return payload is not None and all(payload.get(key) == value for key, value in filters.items())
+
+    def _maybe_compact(self, partition: _Partition):
+        if partition.count and partition.dead / partition.count > self.compact_ratio:
+            partition.compact()
+
+    # --- mem0 VectorStoreBase 인터페이스 ---
+
+    def create_col(self, name: str = None, vector_size: int = None, distance: str = "cosine"):
+        with self._lock:
+            if vector_size and self.dims is None:
+                self.dims = vector_size
+                self._save_meta()
+
+    def insert(self, vectors, payloads: Optional[List[Dict]] = None, ids: Optional[List[str]] = None):
+        matrix = _normalize(vectors)
+        payloads = payloads or [{} for _ in range(len(matrix))]
+        ids = ids or [str(i) for i in range(len(matrix))]
+        with self._lock:
+            if self.dims is None:
+                self.dims = matrix.shape[1]
+                self._save_meta()
+            # 같은 사용자 항목끼리 모아 한 번에 추가
+            groups = {}
+            for vector_id, payload, vector in zip(ids, payloads, matrix):
+                groups.setdefault(self.partition_key(payload), []).append((vector_id, payload, vector))
+            for key, items in groups.items():
+                for vector_id, _, _ in items:
+                    previous = self._id_index.get(vector_id)
+                    if previous is not None and previous != key:
+                        self._partitions[previous].delete(vector_id)
+                partition = self._partition(key, create=True)
+                partition.append([item[0] for item in items], np.stack([item[2] for item in items]),
+                                 [item[1] for item in items])
+                for vector_id, _, _ in items:
+                    self._id_index[vector_id] = key
+
+    def search(self, query, vectors=None, limit: int = 5, filters: Optional[Dict] = None) -> List[OutputData]:
+        # mem0 버전에 따라 search(query=텍스트, vectors=벡터) 또는 search(query=벡터)로 호출됨
+        vector = query if vectors is None else vectors
+        if self.dims is None:
+            return []
+        query_vector = _normalize(vector)[0]
+        with self._lock:
+            partition = self._partition(self.partition_key(filters))
+            if partition is None:
+                return []
+            extra = {key: value for key, value in (filters or {}).items() if key != 'user_id'}
+            mask = None
+            if extra:
+                mask = np.array([self._matches(payload, extra) for payload in partition.payloads[:partition.count]],
+                                dtype=bool)
+            hits = partition.search(query_vector, limit, mask)
+            return [OutputData(partition.ids[row], score, partition.payloads[row]) for row, score in hits]
+
+    def delete(self, vector_id: str):
+        with self._lock:
+            key = self._id_index.pop(vector_id, None)
+            if key is None:
+                return
+            partition = self._partitions[key]
+            partition.delete(vector_id)
+            self._maybe_compact(partition)
+
+    def update(self, vector_id: str, vector=None, payload: Optional[Dict] = None):
+        with self._lock:
+            key = self._id_index.get(vector_id)
+            if key is None:
+                return
+            partition = self._partitions[key]
+            if vector is not None:
+                current = payload if payload is not None else partition.payloads[partition.rows[vector_id]]
+                partition.append([vector_id], _normalize(vector), [current])
+                self._maybe_compact(partition)
+            elif payload is not None:
+                partition.set_payload(vector_id, payload)
+
+    def get(self, vector_id: str) -> Optional[OutputData]:
+        with self._lock:
+            key = self._id_index.get(vector_id)
+            if key is None:
+                return None
+            partition = self._partitions[key]
+            return OutputData(vector_id, None, partition.payloads[partition.rows[vector_id]])
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """저장된 (정규화된) 벡터 조회 (없는 id는 제외) - 임베딩을 다시 계산하지 않는 압축 작업용"""
+        with self._lock:
+            vectors = {}
+            for vector_id in ids:
+                key = self._id_index.get(vector_id)
+                if key is not None:
+                    partition = self._partitions[key]
+                    vectors[vector_id] = np.array(partition.matrix[partition.rows[vector_id]])
+            return vectors
+
+    def list_cols(self) -> List[str]:
+        return [self.collection_name]
+
+    def delete_col(self):
+        with self._lock:
+            for partition in self._partitions.values():
+                partition.close()
+            self._partitions.clear()
+            self._id_index.clear()
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.makedirs(self.root, exist_ok=True)
+
+    def col_info(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'name': self.collection_name,
+                'dims': self.dims,
+                'partitions': len(self._partitions),
+                'vectors': sum(len(p.rows) for p in self._partitions.values()),
+                'dead_vectors': sum(p.dead for p in self._partitions.values()),
+            }
+
+    def list(self, filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[List[OutputData]]:
+        """mem0 get_all이 기대하는 [[OutputData, ...]] 형식"""
+        with self._lock:
+            if filters and 'user_id' in filters:
+                partitions = [self._partition(self.partition_key(filters))]
+            else:
+                partitions = list(self._partitions.values())
+            extra = {key: value for key, value in (filters or {}).items() if key != 'user_id'}
+            results = []
+            for partition in partitions:
+                if partition is None:
+                    continue
+                for vector_id, row in partition.rows.items():
+                    payload = partition.payloads[row]
+                    if extra and not self._matches(payload, extra):
+                        continue
+                    results.append(OutputData(vector_id, None, payload))
+                    if limit and len(results) >= limit:
+                        return [results]
+            return [results]
+
+    def reset(self):
+        self.delete_col()
+        self._save_meta()
+
+    # --- 관리 ---
+
+    def compact(self) -> Dict[str, int]:
+        """모든 파티션 압축 → 회수한 벡터 수와 바이트"""
+        reclaimed = {'vectors': 0, 'bytes': 0}
+        with self._lock:
+            for partition in self._partitions.values():
+                result = partition.compact()
+                reclaimed['vectors'] += result['vectors']
+                reclaimed['bytes'] += result['bytes']
+        return reclaimed
+
+    def close(self):
+        """파티션을 닫고 디렉터리 잠금 해제 (공유 인스턴스면 레지스트리에서도 제거)"""
+        with self._lock:
+            for partition in self._partitions.values():
+                partition.close()
+            self._partitions.clear()
+            self._id_index.clear()
+            if not self._lock_file.closed:
+                self._lock_file.close()
+        with _stores_lock:
+            if _stores.get(os.path.abspath(self.root)) is self:
+                del _stores[os.path.abspath(self.root)]
+
+
+# 절대 경로 → 공유 인스턴스 (에이전트 풀의 여러 에이전트가 같은 디렉터리를 쓰는 경우)
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def open_numpy_vector_store(path: str = "vector_store", collection_name: str = "mem0",
+                            embedding_model_dims: Optional[int] = None) -> NumpyVectorStore:
+    """경로당 하나의 NumpyVectorStore를 열거나 이미 열린 인스턴스를 반환
+
+    다른 프로세스가 같은 디렉터리를 잡고 있으면 VectorStoreLockedError가 발생합니다.
+    """
+    root = os.path.abspath(os.path.join(path, collection_name))
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = NumpyVectorStore(collection_name=collection_name, path=path,
+                                     embedding_model_dims=embedding_model_dims)
+            _stores[root] = store
+        return store
+
+
+def attach_numpy_vector_store(memory, path: str = "vector_store", collection_name: str = "mem0") -> NumpyVectorStore:
+    """mem0 Memory의 벡터 저장소를 (경로별 공유) NumpyVectorStore로 교체
+
+    mem0 설정 검증은 등록된 provider만 허용하므로 Memory를 만든 뒤 vector_store를 바꿔 끼웁니다.
+    """
+    dims = None
+    embedder_config = getattr(getattr(memory, 'embedding_model', None), 'config', None)
+    if embedder_config is not None:
+        dims = getattr(embedder_config, 'embedding_dims', None)
+    store = open_numpy_vector_store(path, collection_name, dims)
+    memory.vector_store = store
+    return store
@@ -3,10 +3,18 @@
 
 import dspy
 from mem0 import Memory
+import contextvars
+import functools
+import inspect
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from dotenv import load_dotenv
 
+from batch_runner import run_batch
+from tracing import Tracer, default_tracer
+
 load_dotenv()
 
 class MemoryTools:
@@ -51,6 +59,45 @@ class MemoryTools:
         except Exception as e:
             return f"메모리 조회 오류: {str(e)}"
 
+class TurnToolCache:
+    """한 턴(forward 호출) 동안의 조회 도구 결과 메모이제이션
+
+    같은 인자의 조회 도구 호출은 한 번만 실행하고, 쓰기 도구가 실행되면
+    해당 user_id의 캐시된 조회 결과를 버립니다.
+    """
+    
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+        self.tool_calls = 0
+        self.cache_hits = 0
+    
+    def get(self, key):
+        with self._lock:
+            if key in self._results:
+                self.cache_hits += 1
+                return True, self._results[key]
+            return False, None
+    
+    def set(self, key, value):
+        with self._lock:
+            self._results[key] = value
+    
+    def count_call(self):
+        with self._lock:
+            self.tool_calls += 1
+    
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._results = {key: value for key, value in self._results.items() if key[1] != user_id}
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {'tool_calls': self.tool_calls, 'cache_hits': self.cache_hits}
+
+# 현재 턴의 도구 캐시 (forward 호출마다 새로 만들어 동시 실행되는 턴끼리 섞이지 않게 함)
+_turn_tool_cache = contextvars.ContextVar("turn_tool_cache", default=None)
+
 def get_current_time() -> str:
     """현재 시간 반환"""
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -67,12 +114,18 @@ class MemoryQA(dspy.Signature):
 class MemoryReActAgent(dspy.Module):
     """mem0 메모리 기능이 강화된 ReAct 에이전트"""
     
-    def __init__(self, memory: Memory):
+    # 같은 턴에서 결과를 재사용할 수 있는 조회 도구와, 실행 후 조회 캐시를 무효화하는 쓰기 도구
+    READ_TOOLS = {"search_memories", "get_all_memories", "get_preferences"}
+    WRITE_TOOLS = {"store_memory", "set_reminder", "update_preferences"}
+    
+    def __init__(self, memory: Memory, tracer: Tracer = None, max_parallel_tools: int = 4):
         super().__init__()
         self.memory_tools = MemoryTools(memory)
+        self.tracer = tracer or default_tracer
+        self.tool_executor = ThreadPoolExecutor(max_workers=max_parallel_tools, thread_name_prefix="react-tool")
         
-        # ReAct에서 사용할 도구들 정의
-        self.tools = [
+        # ReAct에서 사용할 도구들 정의 (도구 호출마다 span 기록 + 턴 단위 메모이제이션)
+        tools = [
             self.memory_tools.store_memory,
             self.memory_tools.search_memories,
             self.memory_tools.get_all_memories,
@@ -81,6 +134,11 @@ class MemoryReActAgent(dspy.Module):
             self.get_preferences,
             self.update_preferences,
         ]
+        self.tool_map = {
+            tool.__name__: self.memoized(self.tracer.traced(f"tool.{tool.__name__}")(tool))
+            for tool in tools
+        }
+        self.tools = list(self.tool_map.values()) + [self.run_tools_parallel]
         
         # 도구가 포함된 ReAct 초기화
         self.react = dspy.ReAct(
@@ -89,9 +147,91 @@ class MemoryReActAgent(dspy.Module):
             max_iters=6
         )
     
-    def forward(self, user_input: str):
-        """메모리 인식 추론으로 사용자 입력 처리"""
-        return self.react(user_input=user_input)
+    def memoized(self, tool):
+        """조회 도구는 같은 턴의 같은 인자 호출을 재사용하고, 쓰기 도구는 실행 후 캐시 무효화"""
+        name = tool.__name__
+        signature = inspect.signature(tool)
+        
+        @functools.wraps(tool)
+        def wrapper(*args, **kwargs):
+            cache = _turn_tool_cache.get()
+            if cache is None:
+                return tool(*args, **kwargs)
+            
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            user_id = bound.arguments.get("user_id", "default_user")
+            key = (name, user_id, repr(sorted(bound.arguments.items())))
+            if name in self.READ_TOOLS:
+                found, value = cache.get(key)
+                if found:
+                    return value
+            
+            cache.count_call()
+            result = tool(*args, **kwargs)
+            if name in self.READ_TOOLS:
+                cache.set(key, result)
+            elif name in self.WRITE_TOOLS:
+                cache.invalidate(user_id)
+            return result
+        return wrapper
+    
+    def run_tools_parallel(self, calls: list[dict]) -> str:
+        """서로 독립적인 조회 도구 여러 개를 한 번에 동시 실행
+        
+        calls 예: [{"tool": "search_memories", "args": {"query": "음식"}},
+                   {"tool": "get_preferences", "args": {"category": "운동"}}]
+        조회 도구(search_memories, get_all_memories, get_preferences, get_current_time)만 허용됩니다.
+        """
+        allowed = self.READ_TOOLS | {"get_current_time"}
+        futures = []
+        for call in calls:
+            name = call.get("tool")
+            args = call.get("args") or {}
+            if name not in allowed:
+                futures.append((name, args, None))
+                continue
+            # 작업 스레드에서도 현재 턴의 도구 캐시/trace를 쓰도록 컨텍스트 복사
+            context = contextvars.copy_context()
+            futures.append((name, args, self.tool_executor.submit(context.run, self.tool_map[name], **args)))
+        
+        lines = []
+        for name, args, future in futures:
+            if future is None:
+                lines.append(f"[{name}] 병렬 실행할 수 없는 도구입니다 (조회 도구만 허용).")
+                continue
+            try:
+                lines.append(f"[{name} {args}]\n{future.result()}")
+            except Exception as e:
+                lines.append(f"[{name} {args}] 오류: {str(e)}")
+        return "\n\n".join(lines)
+    
+    def forward(self, user_input: str, user_id: str = None):
+        """메모리 인식 추론으로 사용자 입력 처리 (user_id를 주면 도구 호출에 쓰도록 입력에 명시)
+        
+        이 턴의 도구 실행/메모이제이션 통계는 예측의 turn_stats로 함께 돌려줍니다
+        (batch()로 동시에 실행되는 턴끼리 덮어쓰지 않도록 인스턴스에 두지 않음).
+        """
+        if user_id:
+            user_input = f"[user_id: {user_id}] {user_input}"
+        cache = TurnToolCache()
+        token = _turn_tool_cache.set(cache)
+        try:
+            with self.tracer.start_trace("react.forward"):
+                prediction = self.react(user_input=user_input)
+        finally:
+            _turn_tool_cache.reset(token)
+        prediction.turn_stats = cache.stats()
+        return prediction
+    
+    def close(self):
+        """병렬 도구 실행용 스레드 풀 종료"""
+        self.tool_executor.shutdown(wait=True)
+    
+    def batch(self, items, max_workers: int = 4):
+        """(user_id, 입력) 쌍을 동시에 처리하고 끝나는 대로 BatchResult를 yield (사용자별 순서 유지)"""
+        return run_batch(lambda user_id, user_input: self(user_input=user_input, user_id=user_id).response,
+                         items, max_workers)
     
     def set_reminder(self, reminder_text: str, date_time: str = None, user_id: str = "default_user") -> str:
         """사용자를 위한 알림 설정"""
@@ -141,8 +281,11 @@ def setup_official_integration():
         }
     }
     
-    # 메모리 시스템 초기화
+    # 메모리 시스템 초기화 (VECTOR_STORE=numpy면 로컬 NumpyVectorStore로 교체)
     memory = Memory.from_config(config)
+    if os.getenv("VECTOR_STORE") == "numpy":
+        from numpy_vector_store import attach_numpy_vector_store
+        attach_numpy_vector_store(memory, os.getenv("VECTOR_STORE_PATH", "vector_store"))
     
     # 메모리 강화 에이전트 생성
     agent = MemoryReActAgent(memory)
@@ -172,13 +315,16 @@ def demo_conversation():
             "김철수입니다. 지금까지 저에 대해 무엇을 알고 있나요?"
         ]
         
-        for i, user_input in enumerate(conversations, 1):
-            print(f"\n📝 사용자: {user_input}")
-            try:
-                response = agent(user_input=user_input)
-                print(f"🤖 에이전트: {response.response}")
-            except Exception as e:
-                print(f"❌ 오류: {e}")
+        # 같은 사용자의 입력은 배치 실행기에서도 순서대로 처리됨
+        try:
+            for result in agent.batch([("default_user", user_input) for user_input in conversations]):
+                print(f"\n📝 사용자: {result.user_input}")
+                if result.ok:
+                    print(f"🤖 에이전트: {result.output}")
+                else:
+                    print(f"❌ 오류: {result.error}")
+        finally:
+            agent.close()
     
     except Exception as e:
         print(f"설정 오류: {e}")
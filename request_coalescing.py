@@ -0,0 +1,131 @@
+# request_coalescing.py
+# 동시에 들어온 같은 외부 요청을 하나로 합치는 single-flight와 백엔드별 토큰 버킷 속도 제한
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# 백엔드별 기본 (초당 요청 수, 버스트 크기): DuckDuckGo는 짧은 간격의 연속 요청을 쉽게 차단함
+DEFAULT_RATE_LIMITS = {
+    'web': (1.0, 3),
+    'wikipedia': (5.0, 10),
+}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """같은 키의 동시 호출은 먼저 온 호출 하나만 실행하고 나머지는 그 결과를 기다림
+
+    결과를 보관하지 않으므로(캐시는 SearchCache 몫) 실행이 끝난 뒤 들어온 호출은 다시 실행합니다.
+    예외도 기다리던 호출 모두에게 그대로 전달됩니다.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> _Call
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'coalesce_rate': self.coalesced / total if total else 0.0,
+                'in_flight': len(self._calls),
+            }
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0  # 토큰을 기다려야 했던 요청
+        self.rejected = 0  # timeout 안에 토큰을 얻지 못한 요청
+        self.total_wait = 0.0
+
+    def _reserve(self, timeout: Optional[float]) -> Tuple[bool, float]:
+        """토큰 하나를 예약하고 기다려야 할 시간 반환 (timeout을 넘기면 예약하지 않음)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                self.rejected += 1
+                return False, 0.0
+            # 대기할 요청도 미리 토큰을 빼 두어(음수 허용) 도착 순서대로 처리
+            self._tokens -= 1
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.total_wait += wait
+            return True, wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """토큰을 얻을 때까지 대기 (timeout 안에 얻을 수 없으면 기다리지 않고 False)"""
+        ok, wait = self._reserve(timeout)
+        if ok and wait > 0:
+            time.sleep(wait)
+        return ok
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'rejected': self.rejected,
+                'avg_wait_ms': self.total_wait / self.throttled * 1000 if self.throttled else 0.0,
+            }
+
+
+def build_rate_limiters(limits: Optional[Dict[str, Tuple[float, int]]] = None) -> Dict[str, TokenBucket]:
+    """{백엔드: (초당 요청 수, 버스트)} → {백엔드: TokenBucket} (기본값과 병합)"""
+    merged = dict(DEFAULT_RATE_LIMITS)
+    merged.update(limits or {})
+    return {backend: TokenBucket(rate, burst) for backend, (rate, burst) in merged.items()}
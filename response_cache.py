@@ -0,0 +1,112 @@
+# response_cache.py
+# DSPy 답변 생성 앞단의 의미 기반 응답 캐시
+
+import hashlib
+import math
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+
+def normalize_vector(vector) -> List[float]:
+    values = [float(v) for v in vector]
+    norm = math.sqrt(sum(v * v for v in values))
+    return [v / norm for v in values] if norm else values
+
+
+def hashed_embedding(text: str, dims: int = 256) -> List[float]:
+    """외부 임베딩 모델이 없을 때 쓰는 문자 바이그램 해시 임베딩"""
+    vector = [0.0] * dims
+    compact = "".join(text.lower().split())
+    grams = [compact[i:i + 2] for i in range(max(len(compact) - 1, 1))]
+    for gram in grams:
+        vector[zlib.crc32(gram.encode("utf-8")) % dims] += 1.0
+    return normalize_vector(vector)
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha256(context.encode("utf-8")).hexdigest()
+
+
+class SemanticResponseCache:
+    """질문 임베딩 + 검색 컨텍스트 해시 기준의 사용자별 응답 캐시
+
+    같은 사용자가 같은 검색 컨텍스트에서 의미가 거의 같은 질문(코사인 유사도
+    threshold 이상)을 하면 LM 호출 없이 이전 답변을 돌려줍니다.
+    SimpleAgent는 외부 검색 결과와 사용자 메모리 세대(MemorySearchCache.generation)를 컨텍스트로 넘기므로,
+    그 사이 메모리가 바뀌었으면 캐시된 답변을 쓰지 않습니다.
+    """
+
+    def __init__(self, threshold: float = 0.92, ttl: float = 3600.0, max_entries_per_user: int = 256):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries_per_user = max_entries_per_user
+        self._users = {}  # user_id -> OrderedDict(entry_id -> entry)
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, user_id: str, embedding, context: str) -> Optional[str]:
+        """유사한 질문의 캐시된 답변 (없으면 None)"""
+        query = normalize_vector(embedding)
+        key = context_hash(context)
+        now = time.time()
+
+        with self._lock:
+            entries = self._users.get(user_id)
+            best_id, best_score = None, self.threshold
+            if entries:
+                for entry_id in list(entries):
+                    entry = entries[entry_id]
+                    if entry['expires_at'] <= now:
+                        del entries[entry_id]
+                        continue
+                    if entry['context_hash'] != key or len(entry['embedding']) != len(query):
+                        continue
+                    score = sum(a * b for a, b in zip(query, entry['embedding']))
+                    if score >= best_score:
+                        best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            entries.move_to_end(best_id)
+            self.hits += 1
+            return entries[best_id]['answer']
+
+    def store(self, user_id: str, embedding, context: str, answer: str):
+        with self._lock:
+            entries = self._users.setdefault(user_id, OrderedDict())
+            self._next_id += 1
+            entries[self._next_id] = {
+                'embedding': normalize_vector(embedding),
+                'context_hash': context_hash(context),
+                'answer': answer,
+                'expires_at': time.time() + self.ttl,
+            }
+            while len(entries) > self.max_entries_per_user:
+                entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """적중률과 절약한 LM 호출 수"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'saved_lm_calls': self.hits,
+                'entries': sum(len(entries) for entries in self._users.values()),
+                'threshold': self.threshold,
+            }
@@ -0,0 +1,124 @@
+# search_cache.py
+# 웹 검색 결과를 위한 TTL + LRU 캐시 (선택적 SQLite 디스크 저장소 지원)
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def normalize_query(query: str) -> str:
+    """캐시 키용 검색어 정규화 (대소문자, 공백 통일)"""
+    return re.sub(r'\s+', ' ', query).strip().lower()
+
+
+class SearchCache:
+    """검색어 + 언어 기준의 TTL/LRU 캐시
+
+    메모리 LRU가 1차 캐시이고, db_path가 주어지면 SQLite에 같이 기록하여
+    Streamlit 재시작 후에도 항목이 유지됩니다.
+    """
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_search_cache_expires ON search_cache(expires_at)")
+            self._db.commit()
+
+    def make_key(self, source: str, query: str, language: str = "ko") -> str:
+        return f"{source}:{language}:{normalize_query(query)}"
+
+    def get(self, source: str, query: str, language: str = "ko") -> Optional[str]:
+        key = self.make_key(source, query, language)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    self._remember(key, row[1], row[0])
+                    self.hits += 1
+                    return row[0]
+                if row:
+                    self._db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, source: str, query: str, value: str, language: str = "ko"):
+        key = self.make_key(source, query, language)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        """메모리 LRU에 기록하고 크기 제한 초과 시 가장 오래된 항목 제거 (lock 보유 상태에서 호출)"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def purge_expired(self) -> int:
+        """만료된 항목 정리"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for key in expired:
+                del self._entries[key]
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+                self._db.commit()
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 적중/실패 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'persistent': self._db is not None,
+            }
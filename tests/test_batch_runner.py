@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_runner import run_batch
+
+
+def test_results_keep_per_user_order_and_indexes():
+    seen = []
+    lock = threading.Lock()
+
+    def handler(user_id, user_input):
+        time.sleep(0.01 if user_id == "a" else 0.0)
+        with lock:
+            seen.append((user_id, user_input))
+        return user_input.upper()
+
+    items = [("a", "a1"), ("b", "b1"), ("a", "a2"), ("b", "b2"), ("a", "a3")]
+    results = list(run_batch(handler, items, max_workers=2))
+
+    assert sorted(result.index for result in results) == list(range(len(items)))
+    for result in results:
+        assert (result.user_id, result.user_input) == items[result.index]
+        assert result.output == result.user_input.upper()
+    # 같은 사용자의 입력은 들어온 순서대로 처리
+    assert [value for user, value in seen if user == "a"] == ["a1", "a2", "a3"]
+    assert [value for user, value in seen if user == "b"] == ["b1", "b2"]
+    a_results = [result.index for result in results if result.user_id == "a"]
+    assert a_results == sorted(a_results)
+
+
+def test_failure_does_not_stop_the_users_lane():
+    def handler(user_id, user_input):
+        if user_input == "bad":
+            raise RuntimeError("실패")
+        return user_input
+
+    results = sorted(run_batch(handler, [("u", "bad"), ("u", "good")]), key=lambda result: result.index)
+    assert not results[0].ok
+    assert results[0].error == "실패"
+    assert results[1].ok
+    assert results[1].to_dict()['output'] == "good"
+
+
+def test_empty_batch_yields_nothing():
+    assert list(run_batch(lambda user_id, user_input: None, [])) == []
@@ -0,0 +1,43 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_budget import ContextBudgeter, count_tokens, split_snippets
+
+
+def test_split_snippets_drops_headers_and_splits_lists():
+    text = "관련 메모리:\n1. 비빔밥을 좋아함\n2. 아침 운동\n\n다른 문단입니다."
+    assert split_snippets(text) == ["1. 비빔밥을 좋아함", "2. 아침 운동", "다른 문단입니다."]
+
+
+def test_long_snippet_is_split_into_sentences():
+    text = "첫 문장입니다. " * 30 + "마지막 문장!"
+    snippets = split_snippets(text, max_chars=100)
+    assert len(snippets) > 1
+    assert all(len(snippet) <= 100 for snippet in snippets)
+
+
+def test_assemble_keeps_relevant_snippets_within_budget():
+    sources = [
+        ("웹 검색", "\n\n".join([
+            "파이썬 최신 버전은 3.13 입니다",
+            "오늘 서울 날씨는 맑음 기온 높음 바람 약함 습도 낮음",
+            "점심 메뉴 추천 목록 김밥 라면 냉면 비빔밥 제육",
+        ])),
+        ("관련 기억", "1. 사용자는 파이썬 개발자\n2. 사용자는 파이썬 개발자"),
+    ]
+    budget = count_tokens("파이썬 최신 버전은 3.13 입니다") + count_tokens("1. 사용자는 파이썬 개발자")
+    context, stats = ContextBudgeter(budget=budget).assemble("파이썬 최신 버전", sources)
+
+    assert stats['tokens'] <= budget
+    assert stats['duplicates_removed'] == 1
+    assert stats['dropped_over_budget'] == 2
+    # 소스 순서와 라벨은 유지
+    assert context == "웹 검색:\n파이썬 최신 버전은 3.13 입니다\n\n관련 기억:\n1. 사용자는 파이썬 개발자\n\n"
+
+
+def test_assemble_with_no_sources_is_empty():
+    context, stats = ContextBudgeter(budget=100).assemble("질문", [])
+    assert context == ""
+    assert stats['snippets'] == 0
@@ -0,0 +1,66 @@
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from conversation_store import SQLiteConversationStore
+
+
+def make_conversation(conversation_id, title, user_id="u"):
+    now = datetime.now()
+    return {'id': conversation_id, 'user_id': user_id, 'title': title, 'model': 'gpt-4o-mini',
+            'starred': False, 'created_at': now, 'updated_at': now}
+
+
+def test_search_matches_numbers_and_mixed_terms():
+    store = SQLiteConversationStore(":memory:")
+    store.create_conversation(make_conversation("c1", "잡담"))
+    store.append_message("c1", {'role': 'user', 'content': "2024년 gpt4 출시 소식"})
+    store.create_conversation(make_conversation("c2", "다른 대화"))
+    store.append_message("c2", {'role': 'user', 'content': "점심 메뉴"})
+
+    assert store.search_conversation_ids("u", "2024") == ["c1"]
+    assert store.search_conversation_ids("u", "gpt4") == ["c1"]
+    # 접두어 검색과 사용자 구분
+    assert store.search_conversation_ids("u", "점") == ["c2"]
+    assert store.search_conversation_ids("other", "점심") == []
+    store.close()
+
+
+def test_old_index_is_rebuilt_with_current_term_rules(tmp_path):
+    db_path = str(tmp_path / "conversations.db")
+    store = SQLiteConversationStore(db_path)
+    store.create_conversation(make_conversation("c1", "버전 2024"))
+    store.close()
+
+    # 숫자를 색인하지 않던 이전 규칙의 DB 흉내
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM conversation_terms WHERE term = '2024'")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+    reopened = SQLiteConversationStore(db_path)
+    assert reopened.search_conversation_ids("u", "2024") == ["c1"]
+    reopened.close()
+
+
+def test_index_follows_title_updates_and_ranks_by_matches():
+    store = SQLiteConversationStore(":memory:")
+    store.create_conversation(make_conversation("c1", "여행 계획"))
+    store.append_message("c1", {'role': 'user', 'content': "제주 맛집"})
+    store.create_conversation(make_conversation("c2", "제주 여행"))
+    store.append_message("c2", {'role': 'user', 'content': "제주 날씨"})
+
+    # 검색어 단어를 더 많이 포함한 대화가 먼저, 같으면 제목 가중 빈도가 큰 대화가 먼저
+    assert store.search_conversation_ids("u", "제주 여행") == ["c2", "c1"]
+    assert store.search_conversation_ids("u", "제주") == ["c2", "c1"]
+
+    store.update_conversation("c1", title="일정")
+    assert store.search_conversation_ids("u", "여행") == ["c2"]
+
+    store.delete_conversation("c2")
+    assert store.search_conversation_ids("u", "제주") == ["c1"]
+    store.close()
@@ -0,0 +1,88 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_cache import DocumentCache
+from document_ingest import (DocumentIngestor, UnsupportedDocumentError, document_kind, iter_passage_spans,
+                             iter_passages, iter_text_blocks)
+from memory_cache import CachedEmbedder
+
+
+def test_passages_overlap_and_respect_size_limit():
+    text = " ".join(f"단어{i}" for i in range(400))
+    passages = list(iter_passages([text], passage_chars=200, overlap_chars=50))
+
+    assert len(passages) > 1
+    assert all(len(passage) <= 200 for passage in passages)
+    for previous, current in zip(passages, passages[1:]):
+        # 앞 구간의 끝부분이 다음 구간의 시작에 다시 나옴
+        assert current.split()[0] in previous.split()
+    assert passages[-1].endswith("단어399")
+
+
+def test_spans_index_the_concatenated_blocks_regardless_of_block_size():
+    text = "첫 문단입니다.\n\n" + "둘째 문단의 긴 문장입니다. " * 40 + "\n\n끝."
+    blocks = [text[i:i + 37] for i in range(0, len(text), 37)]
+    spans = list(iter_passage_spans(blocks, passage_chars=120, overlap_chars=30))
+
+    assert spans == list(iter_passage_spans([text], passage_chars=120, overlap_chars=30))
+    for start, end, passage in spans:
+        assert text[start:end] == passage
+
+
+def test_text_blocks_decode_multibyte_chars_split_across_reads():
+    data = ("가나다라마바사 " * 20000).encode("utf-8")
+    decoded = "".join(block for block, _ in iter_text_blocks(io.BytesIO(data), "a.txt"))
+    assert decoded == data.decode("utf-8")
+
+
+def test_document_kind_by_extension_or_mime():
+    assert document_kind("notes.md") == 'text'
+    assert document_kind("report", "application/pdf") == 'pdf'
+    assert document_kind("a.docx") == 'docx'
+    with pytest.raises(UnsupportedDocumentError):
+        document_kind("image.png", "image/png")
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = 0
+
+    def embed(self, text, memory_action=None):
+        self.calls += 1
+        return [float(len(text)), 1.0]
+
+
+class FakeMemory:
+    def __init__(self, embedder):
+        self.embedding_model = CachedEmbedder(embedder)
+        self.added = []
+
+    def add(self, messages, user_id, **kwargs):
+        self.added.extend(message['content'] for message in messages)
+        return {'results': []}
+
+
+def test_reupload_reuses_persisted_embeddings_and_still_stores(tmp_path):
+    data = ("첫 문장입니다. 두 번째 문장입니다. " * 200).encode("utf-8")
+    db_path = str(tmp_path / "documents.db")
+
+    first_embedder = CountingEmbedder()
+    first = FakeMemory(first_embedder)
+    report = DocumentIngestor(first, cache=DocumentCache(db_path=db_path)).ingest(io.BytesIO(data), "a.txt", "u")
+    assert report['passages'] > 1
+    assert report['cached_passages'] == 0
+    assert first_embedder.calls == report['passages']
+
+    # 재시작 후(새 캐시 객체, 새 임베딩 캐시) 같은 파일: 임베딩은 재사용하고 저장은 다시 함
+    second_embedder = CountingEmbedder()
+    second = FakeMemory(second_embedder)
+    again = DocumentIngestor(second, cache=DocumentCache(db_path=db_path)).ingest(io.BytesIO(data), "a.txt", "u")
+    assert again['cached_passages'] == again['passages'] == report['passages']
+    assert again['digest'] == report['digest']
+    assert second_embedder.calls == 0
+    assert second.added == first.added
@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_router import SEARCH_INTENT, IntentRouter, NaiveBayesClassifier
+
+
+def test_from_file_trains_classifier_from_examples(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({
+        SEARCH_INTENT: {"검색": 0.9},
+        "examples": [
+            ["오늘 환율 얼마야", SEARCH_INTENT],
+            ["내일 서울 날씨 어때", SEARCH_INTENT],
+            ["주식 시세 알려줘", SEARCH_INTENT],
+            ["고마워 잘 자", "chat"],
+            ["내 이름 기억해", "chat"],
+            ["안녕 반가워", "chat"],
+        ],
+    }, ensure_ascii=False), encoding="utf-8")
+
+    router = IntentRouter.from_file(str(path), threshold=0.3)
+    assert isinstance(router.classifier, NaiveBayesClassifier)
+    assert "examples" not in router.rules
+
+    # 키워드 규칙에 없는 질문도 분류기가 검색 의도로 판별
+    assert router.route("오늘 날씨 어때").wants(SEARCH_INTENT)
+    assert not router.route("안녕 고마워").wants(SEARCH_INTENT)
+
+
+def test_from_file_without_examples_has_no_classifier(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({SEARCH_INTENT: {"검색": 0.9}}), encoding="utf-8")
+
+    router = IntentRouter.from_file(str(path))
+    assert router.classifier is None
+    assert router.route("검색해줘").wants(SEARCH_INTENT)
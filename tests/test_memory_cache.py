@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_cache import CachedEmbedder, MemorySearchCache, install_cached_embedder
+
+
+def test_invalidate_bumps_generation_and_hides_old_results():
+    cache = MemorySearchCache()
+    cache.set("u", "좋아하는 음식", 5, "비빔밥")
+    assert cache.get("u", " 좋아하는  음식 ", 5) == "비빔밥"
+
+    cache.invalidate("u")
+    assert cache.generation("u") == 1
+    assert cache.get("u", "좋아하는 음식", 5) is None
+    # 다른 사용자와 다른 limit은 별개
+    cache.set("v", "좋아하는 음식", 5, "라면")
+    assert cache.get("v", "좋아하는 음식", 3) is None
+    assert cache.get("v", "좋아하는 음식", 5) == "라면"
+
+
+def test_result_from_older_generation_is_not_stored():
+    cache = MemorySearchCache()
+    generation = cache.generation("u")
+    # 검색하는 사이에 쓰기가 커밋됨
+    cache.invalidate("u")
+    cache.set("u", "q", 5, "이전 결과", generation)
+    assert cache.get("u", "q", 5) is None
+
+
+def test_entries_expire_and_are_bounded_per_user():
+    cache = MemorySearchCache(max_entries_per_user=2, ttl=0.05)
+    for query in ["a", "b", "c"]:
+        cache.set("u", query, 5, query.upper())
+    assert cache.get("u", "a", 5) is None
+    assert cache.stats()['entries'] == 2
+    time.sleep(0.1)
+    assert cache.get("u", "c", 5) is None
+
+
+class CountingModel:
+    def __init__(self):
+        self.calls = 0
+        self.config = "설정"
+
+    def embed(self, text, memory_action=None):
+        self.calls += 1
+        return [float(len(text))]
+
+
+def test_cached_embedder_reuses_embeddings_per_action():
+    model = CountingModel()
+    memory = type("Memory", (), {})()
+    memory.embedding_model = model
+    embedder = install_cached_embedder(memory, max_entries=2)
+    assert install_cached_embedder(memory) is embedder
+
+    embedder.embed("질문", "search")
+    embedder.embed("질문", "search")
+    embedder.embed("질문", "add")
+    assert model.calls == 2
+    assert embedder.config == "설정"
+
+    assert embedder.embed_many(["질문", "새 문장"], "add") == [[2.0], [4.0]]
+    assert model.calls == 3
+    assert embedder.stats()['entries'] == 2
+
+
+def test_seeded_embeddings_skip_model_calls():
+    model = CountingModel()
+    embedder = CachedEmbedder(model)
+    embedder.seed(["구간"], [[9.0]], "add")
+    assert embedder.embed("구간", "add") == [9.0]
+    assert model.calls == 0
@@ -0,0 +1,52 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_compaction import SEARCH_MEMORY_KIND, MemoryCompactor
+
+
+class OneHotEmbedder:
+    """텍스트마다 서로 직교하는 벡터 (중복으로 묶이지 않음)"""
+
+    def __init__(self):
+        self.index = {}
+
+    def embed(self, text, memory_action=None):
+        i = self.index.setdefault(text, len(self.index))
+        return [1.0 if j == i else 0.0 for j in range(8)]
+
+
+class FakeMemory:
+    def __init__(self, items):
+        self.items = items
+        self.deleted = []
+        self.embedding_model = OneHotEmbedder()
+
+    def get_all(self, user_id, **kwargs):
+        return {'results': [item for item in self.items if item['id'] not in self.deleted]}
+
+    def delete(self, memory_id):
+        self.deleted.append(memory_id)
+
+
+def test_expires_only_old_memories_tagged_as_search():
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    new = datetime.now().isoformat()
+    memory = FakeMemory([
+        # mem0 추출로 텍스트가 바뀌어도 metadata로 검색 기록을 구분
+        {'id': 'old-search', 'memory': '사용자는 환율에 관심이 있다', 'metadata': {'kind': SEARCH_MEMORY_KIND},
+         'created_at': old},
+        {'id': 'new-search', 'memory': '날씨 검색 결과', 'metadata': {'kind': SEARCH_MEMORY_KIND},
+         'created_at': new},
+        {'id': 'old-fact', 'memory': '검색: 오래된 사실', 'metadata': {}, 'created_at': old},
+    ])
+    changed = []
+    compactor = MemoryCompactor(memory, search_ttl=timedelta(days=7), on_change=changed.append)
+
+    report = compactor.compact_user('u')
+
+    assert memory.deleted == ['old-search']
+    assert report['expired'] == 1
+    assert changed == ['u']
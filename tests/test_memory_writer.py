@@ -0,0 +1,84 @@
+import atexit
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from memory_writer import MemoryWriteQueue
+
+
+class RecordingMemory:
+    def __init__(self, fail_times: int = 0):
+        self.calls = []
+        self.fail_times = fail_times
+        self.lock = threading.Lock()
+
+    def add(self, messages, user_id, **kwargs):
+        with self.lock:
+            if self.fail_times:
+                self.fail_times -= 1
+                raise RuntimeError("일시적 오류")
+            self.calls.append((user_id, [message['content'] for message in messages], kwargs))
+        return {'results': [{'event': 'ADD'}]}
+
+
+def test_flush_waits_and_batches_per_user_in_order():
+    memory = RecordingMemory()
+    commits = []
+    writes = MemoryWriteQueue(memory, flush_interval=0.2, on_commit=lambda user_id, _: commits.append(user_id))
+    try:
+        writes.submit("a1", "a")
+        writes.submit("b1", "b")
+        writes.submit("a2", "a")
+        assert writes.flush(timeout=5)
+        assert memory.calls == [("a", ["a1", "a2"], {}), ("b", ["b1"], {})]
+        assert commits == ["a", "b"]
+        assert writes.metrics()['depth'] == 0
+        assert writes.metrics()['committed'] == 3
+    finally:
+        writes.close()
+
+
+def test_tagged_writes_are_not_merged_into_inferred_batch():
+    memory = RecordingMemory()
+    writes = MemoryWriteQueue(memory, flush_interval=0.2)
+    try:
+        writes.submit("사실", "u")
+        writes.submit("검색 기록", "u", metadata={'kind': 'search'}, infer=False)
+        assert writes.flush(timeout=5)
+        assert memory.calls == [
+            ("u", ["사실"], {}),
+            ("u", ["검색 기록"], {'metadata': {'kind': 'search'}, 'infer': False}),
+        ]
+    finally:
+        writes.close()
+
+
+def test_failed_batch_is_retried():
+    memory = RecordingMemory(fail_times=1)
+    writes = MemoryWriteQueue(memory, flush_interval=0.0, retry_backoff=0.0)
+    try:
+        writes.submit("x", "u")
+        assert writes.flush(timeout=5)
+        assert writes.metrics()['retries'] == 1
+        assert memory.calls == [("u", ["x"], {})]
+    finally:
+        writes.close()
+
+
+def test_close_writes_pending_items_rejects_new_ones_and_unregisters(monkeypatch):
+    unregistered = []
+    monkeypatch.setattr(atexit, 'unregister', unregistered.append)
+    memory = RecordingMemory()
+    writes = MemoryWriteQueue(memory, flush_interval=10.0)
+    writes.submit("마지막", "u")
+    writes.close()
+
+    assert memory.calls == [("u", ["마지막"], {})]
+    assert unregistered == [writes.close]
+    with pytest.raises(RuntimeError):
+        writes.submit("늦은 항목", "u")
+    assert writes.flush(timeout=1)
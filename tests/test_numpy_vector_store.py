@@ -0,0 +1,48 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from numpy_vector_store import (NumpyVectorStore, VectorStoreLockedError, attach_numpy_vector_store,
+                                fcntl)
+
+
+def make_memory():
+    return types.SimpleNamespace(embedding_model=None, vector_store=None)
+
+
+def test_attach_same_path_shares_store_and_rows(tmp_path):
+    first, second = make_memory(), make_memory()
+    store_a = attach_numpy_vector_store(first, str(tmp_path))
+    store_b = attach_numpy_vector_store(second, str(tmp_path))
+    assert store_a is store_b
+
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((4, 8), dtype=np.float32)
+    first.vector_store.insert(vectors[:1], [{'user_id': 'u', 'data': 'a1'}], ['a1'])
+    second.vector_store.insert(vectors[1:2], [{'user_id': 'u', 'data': 'b1'}], ['b1'])
+    first.vector_store.insert(vectors[2:3], [{'user_id': 'u', 'data': 'a2'}], ['a2'])
+    store_a.close()
+
+    reopened = NumpyVectorStore(path=str(tmp_path))
+    try:
+        for i, vector_id in enumerate(['a1', 'b1', 'a2']):
+            assert reopened.get(vector_id).payload['data'] == vector_id
+            stored = reopened.get_vectors([vector_id])[vector_id]
+            assert np.allclose(stored, vectors[i] / np.linalg.norm(vectors[i]), atol=1e-6)
+    finally:
+        reopened.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="파일 잠금을 지원하지 않는 플랫폼")
+def test_second_instance_on_locked_path_fails_fast(tmp_path):
+    store = attach_numpy_vector_store(make_memory(), str(tmp_path))
+    try:
+        with pytest.raises(VectorStoreLockedError):
+            NumpyVectorStore(path=str(tmp_path))
+    finally:
+        store.close()
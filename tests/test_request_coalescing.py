@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from request_coalescing import SingleFlight, TokenBucket, build_rate_limiters
+
+
+def test_concurrent_calls_with_same_key_run_once():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        started.set()
+        release.wait(5)
+        return value * 2
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", slow, 21)))
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", slow, 21))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    # 뒤따른 호출이 대기열에 들어갈 때까지 기다린 뒤 실행을 끝냄
+    deadline = time.time() + 5
+    while flight.stats()['coalesced'] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert calls == [21]
+    assert results == [42] * 4
+    assert flight.stats()['executed'] == 1
+    assert flight.stats()['in_flight'] == 0
+    # 끝난 뒤의 호출은 다시 실행
+    assert flight.do("k", lambda: "again") == "again"
+
+
+def test_errors_propagate_and_key_is_released():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("실패")
+
+    with pytest.raises(ValueError):
+        flight.do("k", fail)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_token_bucket_burst_then_reject_within_timeout():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0)
+    # 토큰이 없으면 timeout 안에 얻을 수 없으므로 기다리지 않고 거절
+    assert not bucket.acquire(timeout=0.1)
+    stats = bucket.stats()
+    assert stats['acquired'] == 2
+    assert stats['rejected'] == 1
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=20.0, burst=1)
+    assert bucket.acquire()
+    start = time.monotonic()
+    assert bucket.acquire(timeout=1.0)
+    assert time.monotonic() - start >= 0.04
+    assert bucket.stats()['throttled'] == 1
+
+
+def test_build_rate_limiters_merges_defaults():
+    limiters = build_rate_limiters({'web': (2.0, 5)})
+    assert (limiters['web'].rate, limiters['web'].burst) == (2.0, 5)
+    assert 'wikipedia' in limiters
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_cache import SearchCache, normalize_query
+
+
+def test_normalized_query_hits_same_entry():
+    cache = SearchCache()
+    cache.set("web", "  Python   최신 버전 ", "결과")
+    assert normalize_query("  Python   최신 버전 ") == "python 최신 버전"
+    assert cache.get("web", "python 최신 버전") == "결과"
+    # 소스와 언어는 키에 포함
+    assert cache.get("wikipedia", "python 최신 버전") is None
+    assert cache.get("web", "python 최신 버전", language="en") is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 2
+
+
+def test_expired_entry_is_a_miss_and_purged():
+    cache = SearchCache(ttl=0.05)
+    cache.set("web", "q", "결과")
+    time.sleep(0.1)
+    assert cache.get("web", "q") is None
+    cache.set("web", "q2", "결과")
+    time.sleep(0.1)
+    assert cache.purge_expired() == 1
+    assert cache.stats()['size'] == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SearchCache(max_entries=2)
+    cache.set("web", "a", "A")
+    cache.set("web", "b", "B")
+    assert cache.get("web", "a") == "A"  # a를 최근 사용으로
+    cache.set("web", "c", "C")
+    assert cache.get("web", "b") is None
+    assert cache.get("web", "a") == "A"
+    assert cache.get("web", "c") == "C"
+
+
+def test_persistent_cache_survives_restart(tmp_path):
+    db_path = str(tmp_path / "search.db")
+    SearchCache(db_path=db_path).set("web", "q", "결과")
+    assert SearchCache(db_path=db_path).get("web", "q") == "결과"
@@ -0,0 +1,14 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tokenizer import index_terms, tokenize
+
+
+def test_tokenize_keeps_only_keyword_length_words():
+    assert tokenize("나 DSPy를 좋아해 ok 2024") == ["좋아해", "dspy"]
+
+
+def test_index_terms_split_scripts_and_numbers():
+    assert index_terms("GPT4 출시는 2024년") == ["gpt", "4", "출시는", "2024", "년"]
@@ -0,0 +1,22 @@
+# tokenizer.py
+# 대화 검색 색인, 키워드 추출, 컨텍스트 관련도 계산이 함께 쓰는 단어 규칙
+
+import re
+from typing import List
+
+# 키워드 토큰 규칙 (ConversationManager.extract_keywords와 동일)
+KOREAN_WORD_RE = re.compile(r'[가-힣]{2,}')
+ENGLISH_WORD_RE = re.compile(r'[a-zA-Z]{3,}')
+
+# 대화 검색 역색인 단어 규칙 (색인과 검색어에 같이 적용: 한글/영문/숫자 연속 구간, 길이 제한 없음)
+TERM_RE = re.compile(r'[가-힣]+|[a-zA-Z]+|[0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """키워드 토큰 추출 (한국어 2글자 이상, 영어 3글자 이상, 소문자)"""
+    return KOREAN_WORD_RE.findall(text) + [word.lower() for word in ENGLISH_WORD_RE.findall(text)]
+
+
+def index_terms(text: str) -> List[str]:
+    """역색인/검색어 단어 (소문자, "gpt4" → "gpt", "4")"""
+    return [term.lower() for term in TERM_RE.findall(text)]
@@ -0,0 +1,282 @@
+# tracing.py
+# 에이전트 파이프라인 단계별 지연 시간 추적과 메트릭 내보내기
+# (Prometheus 텍스트 형식 / OpenTelemetry OTLP JSON 형식)
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque, defaultdict
+from typing import List, Dict, Any, Optional
+
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """단일 단계의 시작/종료 시각과 속성"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, **attributes):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """소요 시간 (초)"""
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e9
+
+
+class Trace:
+    """한 턴(process_message 호출 등)의 span 모음"""
+
+    def __init__(self, tracer: "Tracer", name: str, **attributes):
+        self.tracer = tracer
+        self.trace_id = _new_id(16)
+        self.root = Span(name, self.trace_id, **attributes)
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes):
+        """이 trace에 하위 span 기록 (다른 스레드에서도 사용 가능)"""
+        return _SpanContext(self, name, attributes)
+
+    def record_span(self, name: str, start_ns: int, end_ns: Optional[int] = None,
+                    error: Optional[str] = None, **attributes) -> Span:
+        """이미 측정한 구간을 span으로 기록 (예: 첫 토큰까지의 시간)"""
+        span = Span(name, self.trace_id, parent_id=self.root.span_id, **attributes)
+        span.start_ns = start_ns
+        span.end_ns = end_ns if end_ns is not None else time.time_ns()
+        span.error = error
+        self._finish_span(span)
+        return span
+
+    def _finish_span(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        self.tracer._observe(span)
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """단계별 소요 시간 목록 (시작 순)"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_ns)
+        return [
+            {'name': span.name, 'duration_ms': span.duration * 1000, 'error': span.error}
+            for span in [self.root] + spans
+        ]
+
+
+class _SpanContext:
+    def __init__(self, trace: Trace, name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span = Span(name, trace.trace_id, parent_id=trace.root.span_id, **attributes)
+
+    def __enter__(self) -> Span:
+        self.span.start_ns = time.time_ns()
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end_ns = time.time_ns()
+        if exc is not None:
+            self.span.error = str(exc)
+        self.trace._finish_span(self.span)
+        return False
+
+
+class _TraceContext:
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]):
+        self.trace = Trace(tracer, name, **attributes)
+
+    def __enter__(self) -> Trace:
+        self.token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, exc_type, exc, tb):
+        root = self.trace.root
+        root.end_ns = time.time_ns()
+        if exc is not None:
+            root.error = str(exc)
+        _current_trace.reset(self.token)
+        self.trace.tracer._finish_trace(self.trace)
+        return False
+
+
+class _NullContext:
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Tracer:
+    """span 기록기 + 단계별 히스토그램
+
+    start_trace로 턴 단위 trace를 열면 같은 실행 컨텍스트의 span()이 자동으로
+    그 trace에 붙습니다. 스레드 풀 작업에는 trace.span()을 직접 사용합니다.
+    """
+
+    def __init__(self, max_traces: int = 200, buckets=DEFAULT_BUCKETS, service_name: str = "ai-agent"):
+        self.buckets = tuple(buckets)
+        self.service_name = service_name
+        self._traces = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._histograms = defaultdict(lambda: {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+        self._errors = defaultdict(int)
+
+    def start_trace(self, name: str, **attributes):
+        return _TraceContext(self, name, attributes)
+
+    def span(self, name: str, **attributes):
+        """현재 trace에 span 기록 (열린 trace가 없으면 기록하지 않음)"""
+        trace = _current_trace.get()
+        if trace is None or trace.tracer is not self:
+            return _NullContext()
+        return trace.span(name, **attributes)
+
+    def current_trace(self) -> Optional[Trace]:
+        return _current_trace.get()
+
+    def traced(self, name: Optional[str] = None):
+        """함수 호출을 span으로 기록하는 데코레이터 (서명/문서 유지)"""
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _observe(self, span: Span):
+        duration = span.duration
+        with self._lock:
+            histogram = self._histograms[span.name]
+            for i, upper in enumerate(self.buckets):
+                if duration <= upper:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += duration
+            histogram['count'] += 1
+            if span.error:
+                self._errors[span.name] += 1
+
+    def _finish_trace(self, trace: Trace):
+        self._observe(trace.root)
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent_traces(self, limit: Optional[int] = None) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces)
+        return traces[-limit:] if limit else traces
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식"""
+        lines = [
+            "# HELP agent_stage_duration_seconds Agent pipeline stage latency.",
+            "# TYPE agent_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {name: dict(h, buckets=list(h['buckets'])) for name, h in self._histograms.items()}
+            errors = dict(self._errors)
+
+        for name in sorted(histograms):
+            histogram = histograms[name]
+            for upper, count in zip(self.buckets, histogram['buckets']):
+                lines.append(f'agent_stage_duration_seconds_bucket{{stage="{name}",le="{upper}"}} {count}')
+            lines.append(f'agent_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'agent_stage_duration_seconds_sum{{stage="{name}"}} {histogram["sum"]:.6f}')
+            lines.append(f'agent_stage_duration_seconds_count{{stage="{name}"}} {histogram["count"]}')
+
+        lines.append("# HELP agent_stage_errors_total Agent pipeline stage failures.")
+        lines.append("# TYPE agent_stage_errors_total counter")
+        for name in sorted(errors):
+            lines.append(f'agent_stage_errors_total{{stage="{name}"}} {errors[name]}')
+        return "\n".join(lines) + "\n"
+
+    def export_otel(self, traces: Optional[List[Trace]] = None) -> Dict[str, Any]:
+        """OpenTelemetry OTLP/JSON 형식의 trace 묶음"""
+        traces = self.recent_traces() if traces is None else traces
+        otel_spans = []
+        for trace in traces:
+            for span in [trace.root] + list(trace.spans):
+                otel_span = {
+                    'traceId': span.trace_id,
+                    'spanId': span.span_id,
+                    'name': span.name,
+                    'kind': 1,  # SPAN_KIND_INTERNAL
+                    'startTimeUnixNano': str(span.start_ns),
+                    'endTimeUnixNano': str(span.end_ns or span.start_ns),
+                    'attributes': [
+                        {'key': key, 'value': {'stringValue': str(value)}}
+                        for key, value in span.attributes.items()
+                    ],
+                    'status': {'code': 2, 'message': span.error} if span.error else {'code': 1},
+                }
+                if span.parent_id:
+                    otel_span['parentSpanId'] = span.parent_id
+                otel_spans.append(otel_span)
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': [
+                    {'key': 'service.name', 'value': {'stringValue': self.service_name}}
+                ]},
+                'scopeSpans': [{'scope': {'name': 'tracing'}, 'spans': otel_spans}],
+            }]
+        }
+
+    def export_otel_json(self, path: str, traces: Optional[List[Trace]] = None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export_otel(traces), f, ensure_ascii=False)
+
+
+# 프로세스 전역 기본 tracer
+default_tracer = Tracer()
+
+
+def start_metrics_server(tracer: Tracer = None, port: int = 9464, host: str = "0.0.0.0") -> "ThreadingHTTPServer":
+    """/metrics (Prometheus)와 /traces (OTLP JSON)를 제공하는 HTTP 서버를 백그라운드로 시작"""
+    # http.server는 ssl/email까지 끌어오므로 서버를 켤 때만 import
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    tracer = tracer or default_tracer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/metrics"):
+                body = tracer.render_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif self.path.startswith("/traces"):
+                body = json.dumps(tracer.export_otel(), ensure_ascii=False).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,327 @@
+# ui_assets.py
+# app.py의 정적 자원 (CSS, 대화 템플릿)
+# 모듈은 프로세스당 한 번만 import되므로 Streamlit 재실행마다 다시 만들지 않습니다.
+
+# 기존 CSS 스타일 (그대로 유지)
+APP_CSS = """
+<style>
+    /* 전체 앱 스타일링 */
+    .main-header {
+        font-size: 2.2rem;
+        font-weight: 700;
+        text-align: center;
+        margin-bottom: 1.5rem;
+        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+    }
+    
+    /* 메시지 컨테이너 */
+    .message-container {
+        margin: 12px 0;
+        position: relative;
+    }
+    
+    .user-message-container {
+        display: flex;
+        justify-content: flex-end;
+        align-items: flex-start;
+        margin-left: 60px;
+    }
+    
+    .assistant-message-container {
+        display: flex;
+        justify-content: flex-start;
+        align-items: flex-start;
+        margin-right: 60px;
+    }
+    
+    /* 메시지 스타일 개선 */
+    .user-msg {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 15px 20px;
+        border-radius: 18px 18px 5px 18px;
+        box-shadow: 0 2px 10px rgba(102, 126, 234, 0.3);
+        position: relative;
+        word-wrap: break-word;
+        max-width: 80%;
+    }
+    
+    .user-msg::before {
+        content: "👤";
+        position: absolute;
+        right: -45px;
+        top: 50%;
+        transform: translateY(-50%);
+        background: #667eea;
+        width: 35px;
+        height: 35px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 16px;
+    }
+    
+    .assistant-msg {
+        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
+        color: white;
+        padding: 15px 20px;
+        border-radius: 18px 18px 18px 5px;
+        box-shadow: 0 2px 10px rgba(240, 147, 251, 0.3);
+        position: relative;
+        word-wrap: break-word;
+        max-width: 80%;
+    }
+    
+    .assistant-msg::before {
+        content: "🤖";
+        position: absolute;
+        left: -45px;
+        top: 50%;
+        transform: translateY(-50%);
+        background: #f093fb;
+        width: 35px;
+        height: 35px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 16px;
+    }
+    
+    /* 메모리 박스 개선 */
+    .memory-box {
+        background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%);
+        padding: 12px 16px;
+        border-radius: 12px;
+        margin: 8px 0;
+        border-left: 4px solid #4CAF50;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+        transition: transform 0.2s ease;
+        font-size: 0.9rem;
+    }
+    
+    .memory-box:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+    }
+    
+    /* 타임스탬프 */
+    .message-timestamp {
+        font-size: 0.75rem;
+        opacity: 0.7;
+        margin-top: 5px;
+        text-align: right;
+    }
+    
+    .user-message-container .message-timestamp {
+        text-align: right;
+    }
+    
+    .assistant-message-container .message-timestamp {
+        text-align: left;
+    }
+    
+    /* 3열 레이아웃 스타일 */
+    .three-column-container {
+        display: flex;
+        gap: 20px;
+        height: 80vh;
+        max-width: 100%;
+    }
+    
+    .left-sidebar {
+        flex: 0 0 280px;
+        background: linear-gradient(145deg, #f8f9fa, #e9ecef);
+        border-radius: 15px;
+        padding: 20px;
+        overflow-y: auto;
+        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+    }
+    
+    .main-chat-area {
+        flex: 1;
+        display: flex;
+        flex-direction: column;
+        background: #ffffff;
+        border-radius: 15px;
+        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+        overflow: hidden;
+    }
+    
+    .right-panel {
+        flex: 0 0 320px;
+        background: linear-gradient(145deg, #f1f3f4, #e8eaed);
+        border-radius: 15px;
+        padding: 20px;
+        overflow-y: auto;
+        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+    }
+    
+    /* 채팅 영역 내부 구조 */
+    .chat-header {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        padding: 20px;
+        text-align: center;
+        font-weight: 600;
+        font-size: 1.2rem;
+    }
+    
+    .chat-messages {
+        flex: 1;
+        padding: 20px;
+        overflow-y: auto;
+        background: #fafbfc;
+    }
+    
+    .chat-input-area {
+        border-top: 1px solid #e9ecef;
+        padding: 20px;
+        background: white;
+    }
+    
+    /* 사이드바 섹션 스타일 */
+    .sidebar-section {
+        margin-bottom: 25px;
+        padding-bottom: 15px;
+        border-bottom: 1px solid #dee2e6;
+    }
+    
+    .sidebar-section:last-child {
+        border-bottom: none;
+    }
+    
+    .section-title {
+        font-size: 1.1rem;
+        font-weight: 600;
+        color: #495057;
+        margin-bottom: 15px;
+        display: flex;
+        align-items: center;
+        gap: 8px;
+    }
+    
+    /* 우측 패널 스타일 */
+    .panel-section {
+        background: white;
+        border-radius: 12px;
+        padding: 16px;
+        margin-bottom: 16px;
+        box-shadow: 0 2px 8px rgba(0,0,0,0.1);
+    }
+    
+    .panel-header {
+        font-size: 1rem;
+        font-weight: 600;
+        color: #495057;
+        margin-bottom: 12px;
+        display: flex;
+        align-items: center;
+        gap: 8px;
+    }
+    
+    /* 버튼 개선 */
+    .stButton > button {
+        border-radius: 20px;
+        border: none;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        color: white;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }
+    
+    .stButton > button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+    }
+    
+    /* 스크롤바 커스터마이징 */
+    ::-webkit-scrollbar {
+        width: 8px;
+    }
+    
+    ::-webkit-scrollbar-track {
+        background: #f1f1f1;
+        border-radius: 10px;
+    }
+    
+    ::-webkit-scrollbar-thumb {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 10px;
+    }
+    
+    ::-webkit-scrollbar-thumb:hover {
+        background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
+    }
+    
+    /* 반응형 디자인 */
+    @media (max-width: 1200px) {
+        .three-column-container {
+            flex-direction: column;
+            height: auto;
+        }
+        
+        .left-sidebar, .right-panel {
+            flex: none;
+            width: 100%;
+            max-height: 300px;
+        }
+        
+        .main-chat-area {
+            min-height: 60vh;
+        }
+    }
+</style>
+"""
+
+# 대화 템플릿 정의
+CONVERSATION_TEMPLATES = {
+    "coding": {
+        "title": "💻 코딩 도움",
+        "description": "프로그래밍 질문과 코드 리뷰를 위한 대화",
+        "initial_message": "안녕하세요! 코딩 관련 질문이나 도움이 필요한 부분이 있나요? 프로그래밍 언어, 알고리즘, 디버깅, 코드 리뷰 등 무엇이든 도와드리겠습니다.",
+        "suggested_prompts": [
+            "Python 함수 작성 도움",
+            "코드 오류 디버깅", 
+            "알고리즘 최적화",
+            "코드 리뷰 요청"
+        ]
+    },
+    "writing": {
+        "title": "✍️ 글쓰기 도움",
+        "description": "창작, 에세이, 보고서 작성을 위한 대화",
+        "initial_message": "창작 활동이나 글쓰기에 도움이 필요하신가요? 소설, 에세이, 보고서, 블로그 포스트 등 어떤 종류의 글이든 함께 작업해보겠습니다.",
+        "suggested_prompts": [
+            "블로그 포스트 아이디어",
+            "소설 플롯 구성",
+            "보고서 구조 잡기", 
+            "문체 개선 요청"
+        ]
+    },
+    "learning": {
+        "title": "📚 학습 도우미",
+        "description": "새로운 주제 학습과 설명을 위한 대화",
+        "initial_message": "새로운 것을 배우고 싶으신가요? 복잡한 개념도 쉽게 설명해드리고, 단계별로 학습할 수 있도록 도와드리겠습니다.",
+        "suggested_prompts": [
+            "개념 쉽게 설명해주세요",
+            "예시와 함께 알려주세요",
+            "연습 문제 만들어주세요",
+            "심화 내용 추천"
+        ]
+    },
+    "brainstorm": {
+        "title": "💡 아이디어 브레인스토밍", 
+        "description": "창의적 아이디어 발상과 기획을 위한 대화",
+        "initial_message": "새로운 아이디어가 필요하신가요? 함께 브레인스토밍하며 창의적인 솔루션을 찾아보겠습니다!",
+        "suggested_prompts": [
+            "비즈니스 아이디어",
+            "프로젝트 기획",
+            "문제 해결 방안",
+            "창의적 접근법"
+        ]
+    }
+}